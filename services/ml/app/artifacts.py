@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    from .manifest import file_sha256
+    from .model import FlatForest, load_model, load_preprocessor
+    from .preprocessing import CreditDataPreprocessor
+except ImportError:
+    from manifest import file_sha256
+    from model import FlatForest, load_model, load_preprocessor
+    from preprocessing import CreditDataPreprocessor
+
+
+ARTIFACT_FORMAT = 'creditxai-flat-forest'
+FORMAT_VERSION = 1
+FORMAT_FILE = 'format.json'
+
+
+def is_artifact(path):
+    """Return True if path is an artifact directory."""
+    return os.path.isfile(os.path.join(path, FORMAT_FILE))
+
+
+def save_artifact(forest, preprocessor, directory):
+    """
+    Write a FlatForest and its preprocessor as an artifact directory.
+
+    Every array (tree nodes, compiled scoring tables, encoder classes) is
+    a separate .npy file, so load_artifact() can memory-map them and all
+    worker processes share one copy through the page cache. format.json
+    records the format version, scalar metadata and each file's dtype,
+    shape and SHA-256.
+
+    The directory is written next to its final location and moved into
+    place, replacing any previous artifact; processes that mapped the
+    old files keep reading them until they reload.
+
+    Args:
+        forest: FlatForest to save
+        preprocessor: Fitted CreditDataPreprocessor
+        directory: Artifact directory to create or replace
+
+    Returns:
+        The format metadata written to format.json
+    """
+    tables = preprocessor.to_tables()
+    arrays = {f'forest/{name}': getattr(forest, name) for name in FlatForest.NODE_ARRAYS}
+    arrays['forest/classes'] = np.asarray(forest.classes_)
+    if forest.cover is not None:
+        arrays['forest/cover'] = forest.cover
+    if hasattr(forest, 'feature_importances_'):
+        arrays['forest/feature_importances'] = forest.feature_importances_
+    for name, array in forest.compiled.items():
+        arrays[f'compiled/{name}'] = array
+
+    # Encoder classes by column position: column names are not file names
+    categories = {}
+    for index, col in enumerate(tables['feature_columns']):
+        if col in tables['categories']:
+            categories[col] = f'encoders/{index}'
+            arrays[categories[col]] = np.asarray(tables['categories'][col], dtype=str)
+    if tables['numerical_cols']:
+        arrays['scaler/mean'] = tables['mean']
+        arrays['scaler/scale'] = tables['scale']
+
+    metadata = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': FORMAT_VERSION,
+        'n_features': forest.n_features_in_,
+        'decision_threshold': getattr(forest, 'decision_threshold_', None),
+        'feature_columns': tables['feature_columns'],
+        'categories': categories,
+        'numerical_cols': tables['numerical_cols'],
+        'arrays': {}
+    }
+
+    directory = os.path.normpath(directory)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        path = os.path.join(staging, name + '.npy')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, array, allow_pickle=False)
+        metadata['arrays'][name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'sha256': file_sha256(path)
+        }
+    with open(os.path.join(staging, FORMAT_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    previous = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.rename(directory, previous)
+    os.rename(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return metadata
+
+
+def load_artifact(directory, mmap=True):
+    """
+    Load the FlatForest and preprocessor of an artifact directory.
+
+    Args:
+        directory: Directory written by save_artifact()
+        mmap: Memory-map the arrays read-only instead of reading them
+
+    Returns:
+        forest, preprocessor
+
+    Raises:
+        ValueError: if the directory holds another format or a newer version
+    """
+    with open(os.path.join(directory, FORMAT_FILE)) as f:
+        metadata = json.load(f)
+    if metadata.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"{directory} is not a {ARTIFACT_FORMAT} artifact")
+    if metadata.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"{directory} has format version {metadata['format_version']}, "
+            f"this service reads up to {FORMAT_VERSION}"
+        )
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in metadata['arrays']
+    }
+
+    forest = FlatForest(
+        **{name: arrays[f'forest/{name}'] for name in FlatForest.NODE_ARRAYS},
+        n_features=metadata['n_features'],
+        classes=np.asarray(arrays['forest/classes']),
+        decision_threshold=metadata['decision_threshold'],
+        cover=arrays.get('forest/cover'),
+        feature_importances=arrays.get('forest/feature_importances'),
+        compiled={
+            name.split('/', 1)[1]: array for name, array in arrays.items() if name.startswith('compiled/')
+        }
+    )
+    preprocessor = CreditDataPreprocessor.from_tables(
+        metadata['feature_columns'],
+        {col: arrays[name] for col, name in metadata['categories'].items()},
+        numerical_cols=metadata['numerical_cols'],
+        mean=arrays.get('scaler/mean'),
+        scale=arrays.get('scaler/scale')
+    )
+    return forest, preprocessor
+
+
+def convert(model_path, preprocessor_path, directory):
+    """Convert a joblib model/preprocessor pair into an artifact directory."""
+    model = load_model(model_path)
+    preprocessor = load_preprocessor(preprocessor_path)
+    return save_artifact(FlatForest.from_model(model), preprocessor, directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert joblib model files into a memory-mapped flat-array artifact"
+    )
+    parser.add_argument('--model', default='models/model.joblib')
+    parser.add_argument('--preprocessor', default='models/preprocessor.joblib')
+    parser.add_argument('--output', default='models/model.artifact')
+    args = parser.parse_args()
+
+    metadata = convert(args.model, args.preprocessor, args.output)
+    size = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(args.output) for name in names
+    )
+    print(f"✓ Wrote {args.output}: {len(metadata['arrays'])} arrays, {size / 1024:.0f} KiB")
+    print(f"  Serve it with ML_MODEL_PATH={args.output} ML_PREPROCESSOR_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item requests into batches.
+
+    Items submitted while a batch is filling are collected for at most
+    max_delay_ms milliseconds, or until max_batch_size items are waiting,
+    and then handed together to run_batch, a coroutine function taking a
+    list of items and returning one result per item in the same order.
+    Each submit() call gets back the result of its own item.
+
+    If a batch fails, its items are retried one by one so that a single bad
+    item only fails its own request. Exceptions of the types in batch_errors
+    are not about the data (e.g. the pool shedding load) and fail the whole
+    batch at once: retrying them item by item would multiply the load that
+    caused them.
+    """
+
+    def __init__(self, run_batch, max_batch_size=64, max_delay_ms=2.0, batch_errors=()):
+        self.run_batch = run_batch
+        self.batch_errors = tuple(batch_errors)
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """Queue item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay_ms / 1e3, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            # Requests cancelled while waiting (e.g. client gone) are dropped
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1 or isinstance(e, self.batch_errors):
+                for _, future in batch:
+                    _set_exception(future, e)
+                return
+            # Isolate the failure: score every item on its own
+            await asyncio.gather(*(self._run([entry]) for entry in batch))
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        """Return batch counts and the average batch size so far."""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_delay_ms': self.max_delay_ms,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': self.items / self.batches if self.batches else 0.0
+        }
+
+
+def _set_exception(future, exc):
+    if not future.done():
+        future.set_exception(exc)
+
+
+def batcher_from_env(run_batch, batch_errors=()):
+    """
+    Build a MicroBatcher configured by environment variables.
+
+    batch_errors are the exception types that fail a whole batch without
+    retrying its items one by one.
+
+    ML_BATCH_MAX_SIZE: largest batch handed to the model (default 64;
+        1 disables coalescing)
+    ML_BATCH_MAX_DELAY_MS: longest a request waits for others (default 2)
+    """
+    return MicroBatcher(
+        run_batch,
+        max_batch_size=int(os.environ.get('ML_BATCH_MAX_SIZE', '64')),
+        max_delay_ms=float(os.environ.get('ML_BATCH_MAX_DELAY_MS', '2')),
+        batch_errors=batch_errors
+    )
@@ -0,0 +1,58 @@
+# Bias thresholds and summary shared by the offline fairness report
+# (app/fairness.py) and the live monitor (app/fairness_monitor.py); kept
+# free of pandas and sklearn so the serving process can import it
+
+
+# Disparate impact (lowest / highest group approval rate) below these
+# flags likely bias (the four-fifths rule) and possible bias
+DI_HIGH_BIAS = 0.8
+DI_POSSIBLE_BIAS = 0.9
+
+# Age bins of the AgeGroup analysis, right-inclusive: (0, 25], (25, 35], ...
+AGE_BINS = [0, 25, 35, 50, 100]
+AGE_LABELS = ['18-25', '26-35', '36-50', '50+']
+
+
+def bias_level(disparate_impact):
+    """'HIGH', 'MODERATE' or 'LOW' bias for a disparate impact ratio."""
+    if disparate_impact < DI_HIGH_BIAS:
+        return "HIGH"
+    if disparate_impact < DI_POSSIBLE_BIAS:
+        return "MODERATE"
+    return "LOW"
+
+
+def bias_summary(group_analysis):
+    """
+    Summarize the bias findings of a group analysis.
+
+    Args:
+        group_analysis: feature -> analysis with a 'disparate_impact', as in
+            the fairness report
+
+    Returns:
+        Dictionary with has_bias, biased_features and recommendations
+    """
+    summary = {
+        'has_bias': False,
+        'biased_features': [],
+        'recommendations': []
+    }
+
+    for feature, analysis in group_analysis.items():
+        di = analysis.get('disparate_impact', 1.0)
+        finding = {'feature': feature, 'disparate_impact': di}
+        if 'disparate_impact_ci' in analysis:
+            finding['disparate_impact_ci'] = analysis['disparate_impact_ci']
+            finding['high_bias_probability'] = analysis['high_bias_probability']
+
+        if di < DI_HIGH_BIAS:
+            summary['has_bias'] = True
+            summary['biased_features'].append({**finding, 'severity': 'HIGH'})
+            summary['recommendations'].append(
+                f"Consider reweighting or resampling for {feature}"
+            )
+        elif di < DI_POSSIBLE_BIAS:
+            summary['biased_features'].append({**finding, 'severity': 'MODERATE'})
+
+    return summary
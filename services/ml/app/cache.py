@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(data, version):
+    """
+    Hash a validated input payload together with the model version.
+
+    Keys are sorted and separators fixed, so equal payloads always produce
+    the same key whatever their field order.
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{version}\n{payload}".encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe in-process LRU cache with a time-to-live per entry.
+
+    Holds at most maxsize entries, evicting the least recently used one
+    when full; entries older than ttl seconds are treated as misses.
+    A maxsize of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the oldest entries if needed."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return size, limits and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+def caches_from_env():
+    """
+    Build the prediction and explanation caches from environment variables.
+
+    ML_CACHE_PREDICTION_SIZE: max cached predictions (default 10000, 0 disables)
+    ML_CACHE_EXPLANATION_SIZE: max cached explanations (default 2000, 0 disables)
+    ML_CACHE_TTL_SECONDS: lifetime of an entry (default 3600)
+    """
+    ttl = float(os.environ.get('ML_CACHE_TTL_SECONDS', '3600'))
+    return (
+        ResultCache(int(os.environ.get('ML_CACHE_PREDICTION_SIZE', '10000')), ttl),
+        ResultCache(int(os.environ.get('ML_CACHE_EXPLANATION_SIZE', '2000')), ttl)
+    )
@@ -0,0 +1,140 @@
+import argparse
+import os
+
+import numpy as np
+
+try:
+    from .artifacts import save_artifact
+    from .manifest import MANIFEST_FILE, write_manifest
+    from .model import (
+        FlatForest, get_decision_threshold, load_model, load_preprocessor, sklearn_predict_proba
+    )
+except ImportError:
+    from artifacts import save_artifact
+    from manifest import MANIFEST_FILE, write_manifest
+    from model import (
+        FlatForest, get_decision_threshold, load_model, load_preprocessor, sklearn_predict_proba
+    )
+
+
+VALUE_DTYPES = {'float16': np.float16, 'float32': np.float32}
+
+
+def sklearn_nbytes(model):
+    """Bytes held by the node arrays of a fitted sklearn tree ensemble."""
+    total = 0
+    for estimator in model.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+def compact_model(model, value_dtype=np.float16, explainable=True, tables=True):
+    """
+    Compact a fitted random forest for serving.
+
+    Only what scoring (and, if explainable, TreeSHAP) reads is kept: no
+    impurities, sample counts or sklearn estimator objects. See
+    FlatForest.compact() for the precision of the result.
+
+    Args:
+        model: Fitted RandomForestClassifier or FlatForest
+        value_dtype: Storage type of the leaf probabilities
+        explainable: Keep node cover so the model can still be explained
+        tables: Keep the bitvector scoring tables (faster, but larger)
+
+    Returns:
+        Compact FlatForest
+    """
+    forest = model if isinstance(model, FlatForest) else FlatForest.from_model(model)
+    return forest.compact(value_dtype=value_dtype, explainable=explainable, tables=tables)
+
+
+def compaction_report(model, compact, X):
+    """
+    Compare a compact forest with the model it was made from.
+
+    Args:
+        model: The original model
+        compact: Its compact FlatForest
+        X: Preprocessed feature matrix to score with both
+
+    Returns:
+        Dict with memory footprints in bytes (sklearn node arrays, and node
+        arrays and scoring tables before and after), the maximum absolute
+        probability deviation, the number of rows reaching a different
+        leaf in any tree and the number of changed decisions
+    """
+    reference = FlatForest.from_model(model) if not isinstance(model, FlatForest) else model
+    expected = sklearn_predict_proba(model, X)
+    actual = compact.predict_proba(X)
+    # Decided as served: approved above the threshold (predict_with_threshold)
+    threshold = get_decision_threshold(model)
+    before, after = reference.footprint(), compact.footprint()
+    return {
+        'sklearn_bytes': sklearn_nbytes(model) if hasattr(model, 'get_params') else None,
+        'node_bytes_before': before['nodes'],
+        'node_bytes_after': after['nodes'],
+        'table_bytes_before': before['tables'],
+        'table_bytes_after': after['tables'],
+        'max_deviation': float(np.abs(actual - expected).max()),
+        'rows_changed_leaves': int(np.any(compact.apply(X) != reference.apply(X), axis=1).sum()),
+        'decisions_changed': int(((actual[:, 1] > threshold) != (expected[:, 1] > threshold)).sum())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a compact, quantized copy of the serving model as an artifact directory"
+    )
+    parser.add_argument('--model', default='models/model.joblib')
+    parser.add_argument('--preprocessor', default='models/preprocessor.joblib')
+    parser.add_argument('--output', default='models/model.compact')
+    parser.add_argument('--value-dtype', choices=sorted(VALUE_DTYPES), default='float16')
+    parser.add_argument('--no-explain', action='store_true',
+                        help='drop node cover too; the compact model cannot be explained')
+    parser.add_argument('--no-tables', action='store_true',
+                        help='drop the scoring tables; rows walk the trees instead')
+    parser.add_argument('--data', default='app/dataset.csv', help='rows to measure the deviation on')
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    model = load_model(args.model)
+    preprocessor = load_preprocessor(args.preprocessor)
+    compact = compact_model(
+        model, VALUE_DTYPES[args.value_dtype],
+        explainable=not args.no_explain, tables=not args.no_tables
+    )
+
+    df = pd.read_csv(args.data).drop(columns=['Unnamed: 0', 'target'], errors='ignore')
+    report = compaction_report(model, compact, preprocessor.transform_records(df.to_dict('records')))
+
+    print("=" * 70)
+    print(f"Model compaction ({args.value_dtype} leaf probabilities, float32 thresholds)")
+    print("=" * 70)
+    print(f"  {'':16s} {'node arrays':>14s} {'scoring tables':>16s} {'total':>12s}")
+    if report['sklearn_bytes'] is not None:
+        print(f"  {'sklearn':16s} {report['sklearn_bytes'] / 1024:10.1f} KiB {'-':>16s} "
+              f"{report['sklearn_bytes'] / 1024:8.1f} KiB")
+    for name, when in (('flat (float64)', 'before'), ('compact', 'after')):
+        nodes, tables = report[f'node_bytes_{when}'], report[f'table_bytes_{when}']
+        print(f"  {name:16s} {nodes / 1024:10.1f} KiB {tables / 1024:12.1f} KiB "
+              f"{(nodes + tables) / 1024:8.1f} KiB")
+    print(f"\n  On {len(df)} rows of {args.data}:")
+    print(f"  max |probability deviation|  {report['max_deviation']:.2e}")
+    print(f"  rows reaching another leaf   {report['rows_changed_leaves']}")
+    print(f"  changed decisions            {report['decisions_changed']}")
+
+    save_artifact(compact, preprocessor, args.output)
+    # The artifact directory holds both halves of the pair
+    write_manifest(
+        args.output, {'model': '.', 'preprocessor': '.'}, preprocessor,
+        metrics={name: value for name, value in report.items() if value is not None}
+    )
+    print(f"\n✓ Wrote {args.output}")
+    print(f"  Serve it with ML_MODEL_MANIFEST={os.path.join(args.output, MANIFEST_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
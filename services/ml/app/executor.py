@@ -0,0 +1,207 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from .metrics import STAGE_SECONDS
+    from .registry import load_pair
+except ImportError:
+    from metrics import STAGE_SECONDS
+    from registry import load_pair
+
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+# Model pair of a process-pool worker and its version, loaded once by _init_worker
+_worker_models = None
+_worker_version = None
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the inference pool has no room left for another job."""
+
+
+class ModelVersionMismatchError(RuntimeError):
+    """Raised when a process worker loaded another model version than the one served."""
+
+
+class InferencePool:
+    """
+    Bounded executor for CPU-bound inference jobs.
+
+    Jobs are functions called as fn(model, preprocessor, *args). With
+    kind='thread' they run on a thread pool with the model pair given to
+    run(); with kind='process' every worker process loads its own pair once
+    at start-up, and jobs use that copy. The stage timings a worker records
+    for a job (STAGE_SECONDS) are sent back with its result and merged into
+    this process's metrics. model_paths is (model_path,
+    preprocessor_path) or (model_path, preprocessor_path, manifest_path),
+    loaded as ModelRegistry loads them (see load_pair in app/registry.py).
+    Once restart_workers() has been given the served version, a job that
+    lands on a worker holding any other version fails with
+    ModelVersionMismatchError rather than answering from the wrong model.
+
+    At most max_workers jobs run at a time and at most max_queue more wait
+    for a worker; beyond that run() fails fast with PoolSaturatedError so
+    callers can shed load instead of letting latency grow without bound.
+    """
+
+    def __init__(self, kind='thread', max_workers=None, max_queue=64, model_paths=None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind} (expected one of {EXECUTOR_KINDS})")
+        if kind == 'process' and model_paths is None:
+            raise ValueError("model_paths is required for a process pool")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.model_paths = model_paths
+        self.model_version = None
+
+        self._executor = self._new_executor()
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _new_executor(self):
+        if self.kind == 'thread':
+            return ThreadPoolExecutor(self.max_workers, thread_name_prefix='inference')
+        return ProcessPoolExecutor(
+            self.max_workers, initializer=_init_worker, initargs=tuple(self.model_paths)
+        )
+
+    def restart_workers(self, version=None):
+        """
+        Start fresh process workers so they load the current model files.
+
+        Jobs already submitted finish on the old workers, which then exit.
+        Thread pools share the caller's model pair and need no restart.
+
+        Args:
+            version: Version the new workers must load (the registry's
+                bundle version); None accepts whatever is on disk
+        """
+        if self.kind != 'process':
+            return
+        self.model_version = version
+        previous = self._executor
+        self._executor = self._new_executor()
+        previous.shutdown(wait=False)
+
+    @property
+    def capacity(self):
+        """Maximum number of jobs running or waiting at once."""
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn, model, preprocessor, *args):
+        """
+        Run fn(model, preprocessor, *args) on the pool and await its result.
+
+        Raises:
+            PoolSaturatedError: if capacity jobs are already in flight
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise PoolSaturatedError(
+                    f"Inference queue full ({self._in_flight} jobs in flight)"
+                )
+            self._in_flight += 1
+
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == 'thread':
+                job = loop.run_in_executor(
+                    self._executor, self._run_job, submitted, fn, (model, preprocessor) + args
+                )
+            else:
+                job = loop.run_in_executor(self._executor, _run_in_worker, fn, args)
+            started, version, result, stages = await job
+            if stages:
+                STAGE_SECONDS.merge(stages)
+            if self.kind == 'process' and self.model_version not in (None, version):
+                raise ModelVersionMismatchError(
+                    f"Inference worker holds model version {version}, expected {self.model_version}"
+                )
+            self._record_wait(started - submitted)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _run_job(self, submitted, fn, args):
+        started = time.monotonic()
+        with self._lock:
+            self._running += 1
+        try:
+            return started, None, fn(*args), None
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _record_wait(self, wait):
+        with self._lock:
+            self.completed += 1
+            self.wait_time_total += wait
+            self.wait_time_max = max(self.wait_time_max, wait)
+
+    def stats(self):
+        """Return queue depth, wait-time and throughput counters."""
+        with self._lock:
+            in_flight = self._in_flight
+            # Process workers do not report back, so estimate from capacity
+            running = self._running if self.kind == 'thread' else min(in_flight, self.max_workers)
+            return {
+                'kind': self.kind,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': in_flight,
+                'queue_depth': max(0, in_flight - running),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'wait_time_avg_ms': 1e3 * self.wait_time_total / self.completed if self.completed else 0.0,
+                'wait_time_max_ms': 1e3 * self.wait_time_max
+            }
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and release the workers."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _init_worker(model_path, preprocessor_path, manifest_path=None):
+    """Load the model pair once in a process-pool worker."""
+    global _worker_models, _worker_version
+    model, preprocessor, _worker_version = load_pair(model_path, preprocessor_path, manifest_path)
+    _worker_models = (model, preprocessor)
+    # Drop timings inherited from the parent (fork) or recorded while loading
+    STAGE_SECONDS.collect()
+
+
+def _run_in_worker(fn, args):
+    started = time.monotonic()
+    result = fn(*_worker_models, *args)
+    return started, _worker_version, result, STAGE_SECONDS.collect()
+
+
+def pool_from_env(model_paths):
+    """
+    Build the inference pool configured by environment variables.
+
+    ML_INFERENCE_EXECUTOR: 'thread' (default) or 'process'
+    ML_INFERENCE_WORKERS: number of workers (default: CPU count)
+    ML_INFERENCE_QUEUE_SIZE: jobs allowed to wait for a worker (default 64)
+    """
+    return InferencePool(
+        kind=os.environ.get('ML_INFERENCE_EXECUTOR', 'thread'),
+        max_workers=int(os.environ.get('ML_INFERENCE_WORKERS', '0')) or None,
+        max_queue=int(os.environ.get('ML_INFERENCE_QUEUE_SIZE', '64')),
+        model_paths=model_paths
+    )
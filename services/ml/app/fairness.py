@@ -1,109 +1,298 @@
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-from sklearn.metrics import accuracy_score, precision_score, recall_score, confusion_matrix
 import joblib
 
+try:
+    from .bias import AGE_BINS, AGE_LABELS, DI_HIGH_BIAS, DI_POSSIBLE_BIAS, bias_summary
+    from .bulk import DEFAULT_CHUNK_ROWS, read_chunks
+    from .model import predict_with_threshold
+except ImportError:
+    from bias import AGE_BINS, AGE_LABELS, DI_HIGH_BIAS, DI_POSSIBLE_BIAS, bias_summary
+    from bulk import DEFAULT_CHUNK_ROWS, read_chunks
+    from model import predict_with_threshold
+
+
+# Analyzer and model pair of a worker process, set once by _init_worker
+_worker_state = None
+
+def binary_labels(y, name='labels'):
+    """
+    Return 0/1 labels as an int8 array.
+
+    Raises:
+        ValueError: if y holds anything other than 0 and 1
+    """
+    values = np.asarray(y)
+    if values.dtype != bool and ((values != 0) & (values != 1)).any():
+        raise ValueError(f"{name} must be binary 0/1 labels")
+    return values.astype(np.int8)
+
+
+def group_confusion_counts(codes, outcomes, n_groups):
+    """
+    Confusion counts of every group, from one bincount over the rows.
+
+    Args:
+        codes: Group index of each row, -1 for rows in no group
+        outcomes: Confusion cell of each row, 2 * y_true + y_pred
+            (0 = TN, 1 = FP, 2 = FN, 3 = TP)
+        n_groups: Number of groups
+
+    Returns:
+        Array of shape (n_groups, 4) with the TN, FP, FN, TP counts per group
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    in_group = codes >= 0
+    if not in_group.all():
+        codes, outcomes = codes[in_group], outcomes[in_group]
+    return np.bincount(codes * 4 + outcomes, minlength=4 * n_groups).reshape(n_groups, 4)
+
+
+class FairnessCounts:
+    """
+    TN, FP, FN, TP counts of a model's decisions on a dataset.
+
+    Kept overall, for every group of each sensitive feature (in order of
+    first appearance) and for every age group. Counts of separate chunks
+    add up with update(), which is what lets a dataset be audited piece
+    by piece.
+    """
+
+    def __init__(self):
+        self.overall = np.zeros(4, dtype=np.int64)
+        # feature -> {group value: counts}
+        self.groups = {}
+        # (len(AGE_LABELS), 4) counts, None without an Age column
+        self.age_groups = None
+
+    def update(self, other):
+        """Add the counts of other (a later chunk) to these."""
+        self.overall = self.overall + other.overall
+        for feature, groups in other.groups.items():
+            totals = self.groups.setdefault(feature, {})
+            for group, group_counts in groups.items():
+                totals[group] = totals[group] + group_counts if group in totals else group_counts
+        if other.age_groups is not None:
+            if self.age_groups is None:
+                self.age_groups = other.age_groups
+            else:
+                self.age_groups = self.age_groups + other.age_groups
+        return self
+
 
 class FairnessAnalyzer:
     """Analyze model fairness and detect bias across demographic groups."""
-    
-    def __init__(self, sensitive_features=None):
+
+    def __init__(self, sensitive_features=None, n_bootstrap=0, confidence=0.95,
+                 bootstrap_workers=1, random_state=None):
         """
         Initialize fairness analyzer.
-        
+
         Args:
             sensitive_features: List of feature names to check for bias (e.g., ['Sex', 'Age'])
+            n_bootstrap: Bootstrap resamples for confidence intervals of the
+                group approval rates and disparate impact (0: none)
+            confidence: Level of the confidence intervals
+            bootstrap_workers: Worker processes drawing the resamples
+            random_state: Seed of the resamples
         """
         self.sensitive_features = sensitive_features or ['Sex', 'Age']
         self.fairness_metrics = {}
-    
-    def calculate_group_metrics(self, y_true, y_pred, group_labels):
-        """Calculate performance metrics for a specific group."""
-        if len(y_true) == 0:
+        self.n_bootstrap = n_bootstrap
+        self.confidence = confidence
+        self.bootstrap_workers = bootstrap_workers
+        self.random_state = random_state
+
+    @staticmethod
+    def metrics_from_counts(counts):
+        """
+        Performance metrics of a group from its TN, FP, FN, TP counts.
+
+        Same values as the sklearn scorers (precision and recall are 0 when
+        undefined), without a pass over the rows per metric.
+        """
+        tn, fp, fn, tp = counts
+        count = tn + fp + fn + tp
+        if count == 0:
             return None
-        
+
         return {
-            'count': len(y_true),
-            'accuracy': accuracy_score(y_true, y_pred),
-            'precision': precision_score(y_true, y_pred, zero_division=0),
-            'recall': recall_score(y_true, y_pred, zero_division=0),
-            'approval_rate': np.mean(y_pred),
-            'true_approval_rate': np.mean(y_true)
+            'count': int(count),
+            'accuracy': float((tp + tn) / count),
+            'precision': float(tp / (tp + fp)) if tp + fp else 0.0,
+            'recall': float(tp / (tp + fn)) if tp + fn else 0.0,
+            'approval_rate': np.float64((tp + fp) / count),
+            'true_approval_rate': np.float64((tp + fn) / count)
         }
-    
+
+    def calculate_group_metrics(self, y_true, y_pred, group_labels):
+        """Calculate performance metrics for a specific group."""
+        outcomes = 2 * binary_labels(y_true, 'y_true') + binary_labels(y_pred, 'y_pred')
+        return self.metrics_from_counts(np.bincount(outcomes, minlength=4))
+
     def analyze_fairness(self, model, preprocessor, df):
         """
         Analyze model fairness across sensitive groups.
-        
+
+        Confusion counts of all groups of a feature come from one bincount
+        over the rows, and every metric is derived from those counts, so
+        the cost is one pass per feature whatever the number of groups.
+
+        The decisions audited are the ones the service makes: approved when
+        P(approved) exceeds the model's decision threshold
+        (predict_with_threshold), not model.predict()'s fixed 0.5 cutoff.
+
         Args:
             model: Trained ML model
             preprocessor: Fitted preprocessor
             df: DataFrame with features and target
-        
+
         Returns:
             Dictionary with fairness metrics and analysis
+
+        Raises:
+            ValueError: without a target column, or if the target holds
+                anything other than 0/1 labels
         """
         print("\n" + "=" * 60)
         print("FAIRNESS ANALYSIS")
         print("=" * 60)
-        
-        # Make a copy to avoid modifying original
-        df_copy = df.copy()
-        
-        # Get predictions
-        X_transformed = preprocessor.transform(df_copy)
+
+        return self.report_from_counts(self.count_outcomes(model, preprocessor, df))
+
+    def analyze_fairness_chunks(self, model, preprocessor, chunks, workers=1):
+        """
+        Analyze model fairness over a dataset read in chunks.
+
+        Only the confusion counts of each chunk are kept, so memory is
+        bounded by the chunk size whatever the size of the dataset. The
+        report is the one analyze_fairness gives for all chunks
+        concatenated (as long as each column has the same dtype in every
+        chunk).
+
+        With workers > 1, chunks are counted by a process pool; at most two
+        chunks per worker are in flight, and counts are merged in input
+        order so groups are reported in the same order.
+
+        Args:
+            model: Trained ML model
+            preprocessor: Fitted preprocessor
+            chunks: Iterable of DataFrames with features and target, e.g.
+                read_chunks() of a CSV or Parquet file
+            workers: Number of worker processes (1: count in this process)
+
+        Returns:
+            Dictionary with fairness metrics and analysis
+        """
+        print("\n" + "=" * 60)
+        print("FAIRNESS ANALYSIS")
+        print("=" * 60)
+
+        counts = FairnessCounts()
+        if workers <= 1:
+            for chunk in chunks:
+                counts.update(self.count_outcomes(model, preprocessor, chunk))
+        else:
+            with ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(self, model, preprocessor)
+            ) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    if len(pending) >= 2 * workers:
+                        counts.update(pending.popleft().result())
+                    pending.append(pool.submit(_count_in_worker, chunk))
+                while pending:
+                    counts.update(pending.popleft().result())
+
+        return self.report_from_counts(counts)
+
+    def count_outcomes(self, model, preprocessor, df):
+        """
+        Confusion counts of the model's decisions on df.
+
+        Returns:
+            FairnessCounts overall, per group of each sensitive feature in
+            df and, if df has an Age column, per age group
+        """
+        X_transformed = preprocessor.transform(df)
         # Handle both tuple and single return
         if isinstance(X_transformed, tuple):
             X, y_true = X_transformed
         else:
             X = X_transformed
-            y_true = df_copy['target'] if 'target' in df_copy.columns else None
-        
+            y_true = df['target'] if 'target' in df.columns else None
+
         if y_true is None:
             raise ValueError("Target column required for fairness analysis")
-            
-        y_pred = model.predict(X)
-        
+
+        y_true = binary_labels(y_true, 'y_true')
+        # Decided as served, at the model's own threshold
+        y_pred, _ = predict_with_threshold(model, X)
+        y_pred = y_pred.astype(np.int8)
+        # Confusion cell of every row, computed once for all features
+        outcomes = 2 * y_true + y_pred
+
+        counts = FairnessCounts()
+        counts.overall = np.bincount(outcomes, minlength=4)
+        for feature in self.sensitive_features:
+            if feature in df.columns:
+                # Groups in order of appearance; NA rows get code -1 and are skipped
+                codes, groups = pd.factorize(df[feature])
+                per_group = group_confusion_counts(codes, outcomes, len(groups))
+                counts.groups[feature] = dict(zip(groups, per_group))
+
+        if 'Age' in df.columns:
+            # Ages outside the bins get code -1 and are skipped
+            age_groups = pd.cut(df['Age'].values, bins=AGE_BINS, labels=AGE_LABELS)
+            counts.age_groups = group_confusion_counts(age_groups.codes, outcomes, len(AGE_LABELS))
+        return counts
+
+    def report_from_counts(self, counts):
+        """
+        Build (and print) the fairness report from confusion counts.
+
+        Args:
+            counts: FairnessCounts of the analyzed data
+
+        Returns:
+            Dictionary with fairness metrics and analysis
+        """
+        overall = self.metrics_from_counts(counts.overall)
+        if overall is None:
+            raise ValueError("No rows to analyze")
         fairness_report = {
             'overall_metrics': {
-                'accuracy': accuracy_score(y_true, y_pred),
-                'approval_rate': np.mean(y_pred),
-                'total_samples': len(y_true)
+                'accuracy': overall['accuracy'],
+                'approval_rate': overall['approval_rate'],
+                'total_samples': overall['count']
             },
             'group_analysis': {}
         }
-        
+
         # Analyze each sensitive feature
         for feature in self.sensitive_features:
-            if feature not in df_copy.columns:
+            if feature not in counts.groups:
                 print(f"WARNING: {feature} not found in data")
                 continue
-            
+
             print(f"\n{'-' * 60}")
             print(f"Analyzing: {feature}")
             print(f"{'-' * 60}")
-            
-            groups = df_copy[feature].unique()
+
             group_metrics = {}
-            
-            for group in groups:
-                # Skip NA groups
-                if pd.isna(group):
-                    continue
-                
-                # Filter data for this group
-                mask = df_copy[feature] == group
-                group_y_true = y_true[mask]
-                group_y_pred = y_pred[mask]
-                
-                # Calculate metrics
-                metrics = self.calculate_group_metrics(
-                    group_y_true, group_y_pred, group
-                )
-                
+            reported_counts = []
+
+            for group, group_counts in counts.groups[feature].items():
+                metrics = self.metrics_from_counts(group_counts)
+
                 if metrics:
                     group_metrics[str(group)] = metrics
-                    
+                    reported_counts.append(group_counts)
+
                     print(f"\nGroup: {group}")
                     print(f"  Samples: {metrics['count']}")
                     print(f"  Accuracy: {metrics['accuracy']:.4f}")
@@ -111,28 +300,28 @@ class FairnessAnalyzer:
                     print(f"  Recall: {metrics['recall']:.4f}")
                     print(f"  Approval Rate: {metrics['approval_rate']:.4f}")
                     print(f"  True Approval Rate: {metrics['true_approval_rate']:.4f}")
-            
+
             # Calculate disparate impact
             if len(group_metrics) >= 2:
                 approval_rates = [m['approval_rate'] for m in group_metrics.values()]
                 max_rate = max(approval_rates)
                 min_rate = min(approval_rates)
-                
+
                 disparate_impact = min_rate / max_rate if max_rate > 0 else 0
-                
+
                 print(f"\n{'-' * 40}")
                 print(f"Disparate Impact Ratio: {disparate_impact:.4f}")
-                
-                if disparate_impact < 0.8:
+
+                if disparate_impact < DI_HIGH_BIAS:
                     print("WARNING: Potential bias detected (DI < 0.8)")
                     bias_level = "HIGH"
-                elif disparate_impact < 0.9:
+                elif disparate_impact < DI_POSSIBLE_BIAS:
                     print("CAUTION: Possible bias (0.8 <= DI < 0.9)")
                     bias_level = "MODERATE"
                 else:
                     print("OK: Fairness check passed (DI >= 0.9)")
                     bias_level = "LOW"
-                
+
                 fairness_report['group_analysis'][feature] = {
                     'groups': group_metrics,
                     'disparate_impact': disparate_impact,
@@ -140,139 +329,239 @@ class FairnessAnalyzer:
                     'max_approval_rate': max_rate,
                     'min_approval_rate': min_rate
                 }
-        
+                if self.n_bootstrap:
+                    self.add_confidence_intervals(
+                        fairness_report['group_analysis'][feature], reported_counts
+                    )
+
         # Age-based analysis (if Age exists)
-        if 'Age' in df_copy.columns:
+        if counts.age_groups is not None:
             print(f"\n{'-' * 60}")
             print("Age Group Analysis")
             print(f"{'-' * 60}")
-            
-            # Create age groups - convert to numpy array first to avoid issues
-            age_values = df_copy['Age'].values
-            df_copy['AgeGroup'] = pd.cut(
-                age_values,
-                bins=[0, 25, 35, 50, 100],
-                labels=['18-25', '26-35', '36-50', '50+']
-            )
-            
+
             age_group_metrics = {}
-            
-            for age_group in ['18-25', '26-35', '36-50', '50+']:
-                mask = df_copy['AgeGroup'].astype(str) == age_group
-                if mask.sum() > 0:
-                    group_y_true = y_true[mask]
-                    group_y_pred = y_pred[mask]
-                    
-                    metrics = self.calculate_group_metrics(
-                        group_y_true, group_y_pred, age_group
-                    )
-                    
-                    if metrics:
-                        age_group_metrics[age_group] = metrics
-                        print(f"\n{age_group}: {metrics['count']} samples, "
-                              f"Approval: {metrics['approval_rate']:.4f}")
-            
+            reported_counts = []
+
+            for age_group, group_counts in zip(AGE_LABELS, counts.age_groups):
+                metrics = self.metrics_from_counts(group_counts)
+
+                if metrics:
+                    age_group_metrics[age_group] = metrics
+                    reported_counts.append(group_counts)
+                    print(f"\n{age_group}: {metrics['count']} samples, "
+                          f"Approval: {metrics['approval_rate']:.4f}")
+
             # Calculate age-based disparate impact
             if len(age_group_metrics) >= 2:
                 approval_rates = [m['approval_rate'] for m in age_group_metrics.values()]
                 max_rate = max(approval_rates)
                 min_rate = min(approval_rates)
                 age_di = min_rate / max_rate if max_rate > 0 else 0
-                
+
                 print(f"\nAge Disparate Impact: {age_di:.4f}")
-                
+
                 fairness_report['group_analysis']['AgeGroup'] = {
                     'groups': age_group_metrics,
                     'disparate_impact': age_di,
                     'max_approval_rate': max_rate,
                     'min_approval_rate': min_rate
                 }
-        
+                if self.n_bootstrap:
+                    self.add_confidence_intervals(
+                        fairness_report['group_analysis']['AgeGroup'], reported_counts
+                    )
+
         print("\n" + "=" * 60)
         print("FAIRNESS ANALYSIS COMPLETE")
         print("=" * 60)
-        
+
         return fairness_report
-    
+
+    def add_confidence_intervals(self, analysis, group_counts):
+        """
+        Add bootstrap confidence intervals to the analysis of one feature.
+
+        Each group gets an approval_rate_ci, and the feature a
+        disparate_impact_ci and the share of resamples whose disparate
+        impact is below the HIGH bias threshold (high_bias_probability): a
+        HIGH point estimate with a low probability comes from small-group
+        noise rather than a consistent gap.
+
+        Args:
+            analysis: Analysis of the feature, as in the fairness report
+            group_counts: TN, FP, FN, TP counts of its groups, in the order
+                of analysis['groups']
+        """
+        groups = list(analysis['groups'].values())
+        group_counts = np.asarray(group_counts)
+        sizes = group_counts.sum(axis=1)
+        # Approved rows: false and true positives
+        approvals = group_counts[:, 1] + group_counts[:, 3]
+        rates, disparate_impact = bootstrap_approval_rates(
+            sizes, approvals, self.n_bootstrap, self.random_state, self.bootstrap_workers
+        )
+
+        tail = (1 - self.confidence) / 2 * 100
+        low, high = np.percentile(rates, [tail, 100 - tail], axis=0)
+        for group, lo, hi in zip(groups, low, high):
+            group['approval_rate_ci'] = [float(lo), float(hi)]
+        di_low, di_high = np.percentile(disparate_impact, [tail, 100 - tail])
+        analysis['disparate_impact_ci'] = [float(di_low), float(di_high)]
+        analysis['high_bias_probability'] = float(np.mean(disparate_impact < DI_HIGH_BIAS))
+        analysis['n_bootstrap'] = self.n_bootstrap
+
+        print(f"{self.confidence:.0%} CI ({self.n_bootstrap} resamples): "
+              f"[{di_low:.4f}, {di_high:.4f}], P(DI < {DI_HIGH_BIAS}) = "
+              f"{analysis['high_bias_probability']:.3f}")
+
     def get_bias_summary(self, fairness_report):
         """Generate a summary of bias findings."""
-        summary = {
-            'has_bias': False,
-            'biased_features': [],
-            'recommendations': []
-        }
-        
-        for feature, analysis in fairness_report.get('group_analysis', {}).items():
-            di = analysis.get('disparate_impact', 1.0)
-            
-            if di < 0.8:
-                summary['has_bias'] = True
-                summary['biased_features'].append({
-                    'feature': feature,
-                    'disparate_impact': di,
-                    'severity': 'HIGH'
-                })
-                summary['recommendations'].append(
-                    f"Consider reweighting or resampling for {feature}"
-                )
-            elif di < 0.9:
-                summary['biased_features'].append({
-                    'feature': feature,
-                    'disparate_impact': di,
-                    'severity': 'MODERATE'
-                })
-        
-        return summary
+        return bias_summary(fairness_report.get('group_analysis', {}))
+
+
+def bootstrap_approval_rates(sizes, approvals, n_resamples, seed=None, workers=1):
+    """
+    Bootstrap distribution of group approval rates and their disparate impact.
+
+    Groups are resampled independently (a stratified bootstrap: group sizes
+    stay fixed). Resampling a group's predictions with replacement only
+    changes its number of approvals, which is Binomial(size, approval
+    rate); drawing those counts directly gives the same distribution as
+    resampling the per-group prediction arrays, in time independent of the
+    number of rows.
+
+    Args:
+        sizes: Number of rows of each group
+        approvals: Number of approved rows of each group
+        n_resamples: Number of bootstrap resamples
+        seed: Seed of the resamples (None: random); results depend on the
+            number of workers too
+        workers: Worker processes drawing resamples (1: draw in this process)
+
+    Returns:
+        (rates, disparate_impact): arrays of shape (n_resamples, n_groups)
+        and (n_resamples,)
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    rates = np.asarray(approvals, dtype=np.int64) / sizes
+    workers = max(1, min(workers, n_resamples))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    parts = [len(part) for part in np.array_split(np.arange(n_resamples), workers)]
+
+    if workers == 1:
+        resampled = _draw_approval_rates(sizes, rates, n_resamples, seeds[0])
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            resampled = np.concatenate(list(pool.map(
+                _draw_approval_rates, [sizes] * workers, [rates] * workers, parts, seeds
+            )))
+
+    max_rates = resampled.max(axis=1)
+    disparate_impact = np.divide(
+        resampled.min(axis=1), max_rates, out=np.zeros(n_resamples), where=max_rates > 0
+    )
+    return resampled, disparate_impact
+
+
+def _draw_approval_rates(sizes, rates, n_resamples, seed):
+    rng = np.random.default_rng(seed)
+    return rng.binomial(sizes, rates, size=(n_resamples, len(sizes))) / sizes
+
+
+def _init_worker(analyzer, model, preprocessor):
+    """Keep the analyzer and model pair of a worker process."""
+    global _worker_state
+    _worker_state = (analyzer, model, preprocessor)
+
+
+def _count_in_worker(chunk):
+    analyzer, model, preprocessor = _worker_state
+    return analyzer.count_outcomes(model, preprocessor, chunk)
 
 
 def evaluate_model_fairness(
     model_path='../models/model.joblib',
     preprocessor_path='../models/preprocessor.joblib',
-    data_path='dataset.csv'
+    data_path='dataset.csv',
+    chunk_rows=None,
+    workers=1,
+    n_bootstrap=0
 ):
     """
     Load model and evaluate fairness.
-    
+
     Args:
         model_path: Path to saved model
         preprocessor_path: Path to saved preprocessor
-        data_path: Path to dataset
-    
+        data_path: Path to dataset (CSV, or Parquet when streaming)
+        chunk_rows: Stream the dataset in chunks of this many rows instead
+            of loading it whole (see analyze_fairness_chunks)
+        workers: Worker processes counting chunks (implies streaming) and
+            drawing bootstrap resamples
+        n_bootstrap: Bootstrap resamples for confidence intervals (0: none)
+
     Returns:
         fairness_report
     """
     # Load model and preprocessor
     model = joblib.load(model_path)
     preprocessor = joblib.load(preprocessor_path)
-    
-    # Load data
-    df = pd.read_csv(data_path)
-    
+
     # Analyze fairness
-    analyzer = FairnessAnalyzer(sensitive_features=['Sex', 'Age'])
-    fairness_report = analyzer.analyze_fairness(model, preprocessor, df)
-    
+    analyzer = FairnessAnalyzer(
+        sensitive_features=['Sex', 'Age'], n_bootstrap=n_bootstrap, bootstrap_workers=workers
+    )
+    if chunk_rows or workers > 1:
+        chunks = read_chunks(data_path, chunk_rows or DEFAULT_CHUNK_ROWS)
+        fairness_report = analyzer.analyze_fairness_chunks(model, preprocessor, chunks, workers)
+    else:
+        df = pd.read_csv(data_path)
+        fairness_report = analyzer.analyze_fairness(model, preprocessor, df)
+
     # Get bias summary
     bias_summary = analyzer.get_bias_summary(fairness_report)
-    
+
     print("\n" + "=" * 60)
     print("BIAS SUMMARY")
     print("=" * 60)
     print(f"Has Bias: {bias_summary['has_bias']}")
     print(f"Biased Features: {len(bias_summary['biased_features'])}")
-    
+
     for feature in bias_summary['biased_features']:
         print(f"\n  • {feature['feature']}: {feature['severity']} severity")
         print(f"    Disparate Impact: {feature['disparate_impact']:.4f}")
-    
+        if 'disparate_impact_ci' in feature:
+            low, high = feature['disparate_impact_ci']
+            print(f"    Confidence Interval: [{low:.4f}, {high:.4f}]")
+
     if bias_summary['recommendations']:
         print("\nRecommendations:")
         for rec in bias_summary['recommendations']:
             print(f"  • {rec}")
-    
+
     return fairness_report
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Audit model fairness on a labelled dataset")
+    parser.add_argument('data', nargs='?', default='dataset.csv', help='CSV or Parquet file with a target column')
+    parser.add_argument('--model', default='../models/model.joblib')
+    parser.add_argument('--preprocessor', default='../models/preprocessor.joblib')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='stream the file in chunks of this many rows (bounded memory)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes counting chunks and drawing bootstrap resamples')
+    parser.add_argument('--bootstrap', type=int, default=0,
+                        help='bootstrap resamples for confidence intervals (default: none)')
+    args = parser.parse_args()
+
+    evaluate_model_fairness(
+        args.model, args.preprocessor, args.data, chunk_rows=args.chunk_rows,
+        workers=args.workers, n_bootstrap=args.bootstrap
+    )
+
+
 if __name__ == "__main__":
     # Run fairness evaluation
-    fairness_report = evaluate_model_fairness()
+    main()
@@ -0,0 +1,219 @@
+import bisect
+import os
+import threading
+import time
+from collections import Counter, deque
+
+try:
+    from .bias import AGE_BINS, AGE_LABELS, bias_level, bias_summary
+except ImportError:
+    from bias import AGE_BINS, AGE_LABELS, bias_level, bias_summary
+
+
+DEFAULT_WINDOWS = (300, 3600, 86400)
+
+# Values of an attribute beyond this many distinct groups are counted as OTHER_GROUP
+MAX_GROUPS = 16
+OTHER_GROUP = 'other'
+
+# Recorded decisions waiting to be folded; beyond this the oldest are dropped
+MAX_PENDING = 100_000
+
+
+def age_group(age):
+    """The AGE_LABELS bin of an age, or None outside the bins."""
+    if age is None or not AGE_BINS[0] < age <= AGE_BINS[-1]:
+        return None
+    return AGE_LABELS[bisect.bisect_left(AGE_BINS, age, 1) - 1]
+
+
+class LiveFairnessMonitor:
+    """
+    Rolling approval rates per sensitive group, fed by served decisions.
+
+    record() is called on the serving path: it appends one tuple to a deque,
+    which is atomic and takes no lock, so it adds well under a microsecond
+    to a request. Decisions are folded into per-bucket counts of
+    (attribute, group, approved) by a background thread every
+    fold_interval seconds, and before every report. Buckets are
+    bucket_seconds long and kept as long as the longest window, so the
+    windows are exact to within one bucket. At most max_pending decisions
+    wait to be folded: if the fold thread is not running or falls behind,
+    the oldest are dropped (and counted in the report) rather than kept
+    without bound.
+
+    Reports follow the group_analysis of FairnessAnalyzer.analyze_fairness
+    per window (Sex and AgeGroup approval rates, disparate impact and bias
+    level), with the same thresholds (app/bias.py) and bias summary. Groups
+    with fewer than min_group_size decisions in a window are reported but
+    left out of its disparate impact, so a handful of requests cannot
+    raise an alert.
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, bucket_seconds=60, min_group_size=30,
+                 fold_interval=1.0, clock=time.time, max_pending=MAX_PENDING):
+        if not windows or min(windows) <= 0 or bucket_seconds <= 0:
+            raise ValueError("windows and bucket_seconds must be positive")
+        self.windows = tuple(sorted(windows))
+        self.bucket_seconds = bucket_seconds
+        self.min_group_size = min_group_size
+        self.fold_interval = fold_interval
+        self.clock = clock
+
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending = deque(maxlen=max_pending)
+        # bucket index -> Counter of (attribute, group, approved)
+        self._buckets = {}
+        self._groups = {'Sex': set(), 'AgeGroup': set(AGE_LABELS)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, application, prediction):
+        """Record the decision on one application (input dict, format_prediction() dict)."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+        self._pending.append(
+            (self.clock(), application.get('Sex'), application.get('Age'), prediction['prediction'] == 1)
+        )
+
+    def record_many(self, applications, predictions):
+        now = self.clock()
+        self.dropped += max(0, len(self._pending) + len(applications) - self.max_pending)
+        self._pending.extend(
+            (now, application.get('Sex'), application.get('Age'), prediction['prediction'] == 1)
+            for application, prediction in zip(applications, predictions)
+        )
+
+    def fold(self):
+        """Move the recorded decisions into their buckets and drop expired buckets."""
+        with self._lock:
+            pending = self._pending
+            while pending:
+                timestamp, sex, age, approved = pending.popleft()
+                index = int(timestamp // self.bucket_seconds)
+                bucket = self._buckets.get(index)
+                if bucket is None:
+                    bucket = self._buckets[index] = Counter()
+                bucket[('', '', approved)] += 1
+                if sex is not None:
+                    bucket[('Sex', self._group('Sex', sex), approved)] += 1
+                group = age_group(age)
+                if group is not None:
+                    bucket[('AgeGroup', group, approved)] += 1
+
+            oldest = int(self.clock() // self.bucket_seconds) - self._window_buckets(self.windows[-1])
+            for index in [index for index in self._buckets if index <= oldest]:
+                del self._buckets[index]
+
+    def _group(self, attribute, value):
+        known = self._groups[attribute]
+        if value not in known:
+            if len(known) >= MAX_GROUPS:
+                return OTHER_GROUP
+            known.add(value)
+        return value
+
+    def _window_buckets(self, window):
+        return max(1, -(-window // self.bucket_seconds))
+
+    def report(self):
+        """Approval rates, disparate impact and bias summary for every window."""
+        self.fold()
+        current = int(self.clock() // self.bucket_seconds)
+        with self._lock:
+            buckets = [(index, Counter(bucket)) for index, bucket in self._buckets.items()]
+
+        windows = []
+        for window in self.windows:
+            first = current - self._window_buckets(window) + 1
+            counts = Counter()
+            for index, bucket in buckets:
+                if index >= first:
+                    counts.update(bucket)
+
+            decisions = counts[('', '', True)] + counts[('', '', False)]
+            group_analysis = {}
+            for attribute in ('Sex', 'AgeGroup'):
+                analysis = self._analyze(attribute, counts)
+                if analysis is not None:
+                    group_analysis[attribute] = analysis
+            windows.append({
+                'window_seconds': window,
+                'decisions': decisions,
+                'approval_rate': counts[('', '', True)] / decisions if decisions else None,
+                'group_analysis': group_analysis,
+                'bias_summary': bias_summary(group_analysis)
+            })
+        return {'bucket_seconds': self.bucket_seconds, 'dropped': self.dropped, 'windows': windows}
+
+    def _analyze(self, attribute, counts):
+        approved = Counter()
+        total = Counter()
+        for (name, group, is_approved), n in counts.items():
+            if name == attribute:
+                total[group] += n
+                if is_approved:
+                    approved[group] += n
+        if not total:
+            return None
+
+        groups = {
+            str(group): {
+                'count': total[group],
+                'approved': approved[group],
+                'approval_rate': approved[group] / total[group]
+            }
+            for group in sorted(total, key=str)
+        }
+        analysis = {'groups': groups}
+        rates = [g['approval_rate'] for g in groups.values() if g['count'] >= self.min_group_size]
+        if len(rates) >= 2:
+            max_rate, min_rate = max(rates), min(rates)
+            disparate_impact = min_rate / max_rate if max_rate > 0 else 0
+            analysis.update({
+                'disparate_impact': disparate_impact,
+                'bias_level': bias_level(disparate_impact),
+                'max_approval_rate': max_rate,
+                'min_approval_rate': min_rate
+            })
+        return analysis
+
+    def start(self):
+        """Start folding recorded decisions in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='fairness-monitor', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.fold_interval):
+            self.fold()
+
+    def stop(self):
+        """Stop folding."""
+        self._stop.set()
+
+
+def monitor_from_env():
+    """
+    Build the live fairness monitor configured by environment variables.
+
+    ML_FAIRNESS_WINDOWS: comma-separated window lengths in seconds
+        (default 300,3600,86400)
+    ML_FAIRNESS_BUCKET_SECONDS: granularity of the windows (default 60)
+    ML_FAIRNESS_MIN_GROUP_SIZE: decisions a group needs in a window to count
+        towards its disparate impact (default 30)
+    ML_FAIRNESS_MAX_PENDING: decisions kept waiting to be folded (default 100000)
+    ML_FAIRNESS_MONITOR: set to 0 to disable the monitor
+
+    Returns None when the monitor is disabled.
+    """
+    if os.environ.get('ML_FAIRNESS_MONITOR', '1') == '0':
+        return None
+    windows = os.environ.get('ML_FAIRNESS_WINDOWS')
+    return LiveFairnessMonitor(
+        windows=tuple(int(w) for w in windows.split(',')) if windows else DEFAULT_WINDOWS,
+        bucket_seconds=int(os.environ.get('ML_FAIRNESS_BUCKET_SECONDS', '60')),
+        min_group_size=int(os.environ.get('ML_FAIRNESS_MIN_GROUP_SIZE', '30')),
+        max_pending=int(os.environ.get('ML_FAIRNESS_MAX_PENDING', str(MAX_PENDING)))
+    )
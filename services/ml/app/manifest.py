@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+try:
+    from .model import load_model, load_preprocessor, single_threaded
+except ImportError:
+    from model import load_model, load_preprocessor, single_threaded
+
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Artifacts every manifest must list; others (e.g. 'encoder') are optional
+REQUIRED_ARTIFACTS = ('model', 'preprocessor')
+
+
+class ManifestError(ValueError):
+    """Raised when a manifest is malformed or its artifacts do not match it."""
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _artifact_sha256(path):
+    # An artifact directory is identified by its format file, which lists
+    # the SHA-256 of every array in it
+    if os.path.isdir(path):
+        try:
+            from .artifacts import FORMAT_FILE
+        except ImportError:
+            from artifacts import FORMAT_FILE
+        path = os.path.join(path, FORMAT_FILE)
+    return file_sha256(path)
+
+
+def feature_schema(preprocessor):
+    """Input columns the model pair expects, in order, with their categories."""
+    tables = preprocessor.to_tables()
+    columns = []
+    for col in tables['feature_columns']:
+        if col in tables['categories']:
+            columns.append({
+                'name': col,
+                'type': 'categorical',
+                'categories': [str(c) for c in tables['categories'][col]]
+            })
+        else:
+            columns.append({'name': col, 'type': 'numeric'})
+    return {'columns': columns, 'n_features': len(columns)}
+
+
+def write_manifest(directory, artifacts, preprocessor, model=None, metrics=None):
+    """
+    Write manifest.json describing a trained model pair.
+
+    Args:
+        directory: Directory holding the artifacts; the manifest goes there too
+        artifacts: Dict role -> file (or artifact directory) name relative to
+            directory; must include 'model' and 'preprocessor'
+        preprocessor: The fitted preprocessor, for the feature schema
+        model: The trained model, for its class and parameters (optional)
+        metrics: Training/evaluation metrics (optional)
+
+    Returns:
+        The manifest as written
+    """
+    missing = [role for role in REQUIRED_ARTIFACTS if role not in artifacts]
+    if missing:
+        raise ManifestError(f"Manifest needs artifacts {missing}")
+
+    entries = {}
+    for role, name in artifacts.items():
+        path = os.path.join(directory, name)
+        entries[role] = {'path': name, 'sha256': _artifact_sha256(path)}
+        if os.path.isfile(path):
+            entries[role]['bytes'] = os.path.getsize(path)
+
+    # The versions of the environment writing the manifest, i.e. the
+    # training environment when written by app.train
+    import joblib
+    import sklearn
+
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'artifacts': entries,
+        'feature_schema': feature_schema(preprocessor),
+        'model': None,
+        'environment': {
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__,
+            'joblib': joblib.__version__
+        },
+        'metrics': {name: float(value) for name, value in (metrics or {}).items()}
+    }
+    if model is not None:
+        manifest['model'] = {
+            'class': type(model).__name__,
+            'params': {
+                name: value for name, value in model.get_params().items()
+                if value is None or isinstance(value, (bool, int, float, str))
+            },
+            'decision_threshold': getattr(model, 'decision_threshold_', None)
+        }
+
+    path = os.path.join(directory, MANIFEST_FILE)
+    staging = f"{path}.tmp-{os.getpid()}"
+    with open(staging, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(staging, path)
+    return manifest
+
+
+def load_manifest_pair(manifest_path):
+    """
+    Verify a manifest and load the model pair it lists, as a unit.
+
+    Each joblib file is read once: the bytes that are hashed are the bytes
+    that are unpickled, so a file replaced in between cannot slip through.
+
+    Args:
+        manifest_path: Path to manifest.json
+
+    Returns:
+        model, preprocessor, manifest hash (first 12 hex digits of the
+        SHA-256 of manifest.json), manifest dict
+
+    Raises:
+        ManifestError: if the manifest is malformed, an artifact's hash
+            differs from the manifest or the pair does not fit its schema
+    """
+    with open(manifest_path, 'rb') as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    try:
+        manifest = json.loads(raw)
+        entries = {role: manifest['artifacts'][role] for role in REQUIRED_ARTIFACTS}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ManifestError(f"Malformed manifest {manifest_path}: {e}") from e
+    if manifest.get('manifest_version', 0) > MANIFEST_VERSION:
+        raise ManifestError(
+            f"Manifest version {manifest['manifest_version']} is newer than "
+            f"supported ({MANIFEST_VERSION})"
+        )
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    loaded = {}
+    for role, entry in entries.items():
+        path = os.path.join(base, entry['path'])
+        if os.path.isdir(path):
+            digest = _artifact_sha256(path)
+            obj = load_model(path) if role == 'model' else load_preprocessor(path)
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            obj = None
+        if digest != entry['sha256']:
+            raise ManifestError(f"{role} artifact {entry['path']} does not match the manifest hash")
+        if obj is None:
+            import joblib
+            obj = joblib.load(io.BytesIO(data))
+        loaded[role] = obj
+
+    model, preprocessor = single_threaded(loaded['model']), loaded['preprocessor']
+    expected = [column['name'] for column in manifest['feature_schema']['columns']]
+    if list(preprocessor.feature_columns) != expected:
+        raise ManifestError("Preprocessor feature columns differ from the manifest schema")
+    if getattr(model, 'n_features_in_', len(expected)) != len(expected):
+        raise ManifestError(
+            f"Model expects {model.n_features_in_} features, the manifest schema has {len(expected)}"
+        )
+    return model, preprocessor, version, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write or verify the manifest of an existing model pair"
+    )
+    parser.add_argument('--dir', default='models', help='directory holding the artifacts')
+    parser.add_argument('--model', default='model.joblib')
+    parser.add_argument('--preprocessor', default='preprocessor.joblib')
+    parser.add_argument('--verify', action='store_true', help='only verify the existing manifest')
+    args = parser.parse_args()
+
+    manifest_path = os.path.join(args.dir, MANIFEST_FILE)
+    if not args.verify:
+        preprocessor = load_preprocessor(os.path.join(args.dir, args.preprocessor))
+        model = load_model(os.path.join(args.dir, args.model))
+        write_manifest(
+            args.dir, {'model': args.model, 'preprocessor': args.preprocessor},
+            preprocessor, model=model
+        )
+        print(f"✓ Wrote {manifest_path}")
+
+    _, _, version, manifest = load_manifest_pair(manifest_path)
+    print(f"✓ Verified {manifest_path} (version {version}, "
+          f"{len(manifest['artifacts'])} artifacts, sklearn {manifest['environment']['sklearn']})")
+
+
+if __name__ == "__main__":
+    main()
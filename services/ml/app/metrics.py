@@ -0,0 +1,265 @@
+import bisect
+import threading
+import time
+
+
+# Upper bounds in seconds: 50 us to 10 s, for stages from a cached lookup
+# to a large batch explanation
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsRegistry:
+    """Metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics.append(metric)
+        return metric
+
+    def unregister(self, metric):
+        with self._lock:
+            self._metrics.remove(metric)
+
+    def render(self):
+        """Return all metrics as Prometheus text (format 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# Metrics of this process, served by /metrics
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, per label values."""
+
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(self._key(labelvalues), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed buckets, per label values.
+
+    observe() is one bisect and a few increments under a lock, cheap enough
+    to time every stage of every request.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, *labelvalues):
+        key = self._key(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not yet cumulative) counts, then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, *labelvalues):
+        """Context manager observing the time spent in its block."""
+        return _Timer(self, self._key(labelvalues))
+
+    def collect(self):
+        """Return the observations so far and start over (see merge())."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        """Add observations collect()ed elsewhere, e.g. in a worker process."""
+        with self._lock:
+            for key, (counts, total) in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+                for index, count in enumerate(counts):
+                    state[0][index] += count
+                state[1] += total
+
+    def count(self, *labelvalues):
+        state = self._values.get(self._key(labelvalues))
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'key', 'started')
+
+    def __init__(self, histogram, key):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.key)
+        return False
+
+
+class CallbackMetric(_Metric):
+    """
+    Gauge or counter read from existing state when scraped.
+
+    fn returns a number, or for labelled metrics a dict mapping tuples of
+    label values to numbers; stats the service already keeps (cache
+    counters, queue depth) are exported without double bookkeeping.
+    """
+
+    def __init__(self, name, documentation, kind, fn, labelnames=(), registry=REGISTRY):
+        if kind not in ('gauge', 'counter'):
+            raise ValueError(f"Unsupported callback metric kind: {kind}")
+        self.kind = kind
+        self.fn = fn
+        super().__init__(name, documentation, labelnames, registry)
+
+    def samples(self):
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            f"{self.name}{self._labels(self._key(key))} {_number(value)}"
+            for key, value in values.items()
+        ]
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape_help(text):
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting and timing requests per route.
+
+    Requests are labelled with the route's path template (not the raw
+    path, so label cardinality stays bounded) and response status.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+            REQUESTS.inc(endpoint, status[0])
+            if status[0] >= 400:
+                REQUEST_ERRORS.inc(endpoint, f"{status[0] // 100}xx")
+
+
+REQUESTS = Counter(
+    'ml_requests_total', 'HTTP requests by route and response status', ('endpoint', 'status')
+)
+REQUEST_ERRORS = Counter(
+    'ml_request_errors_total', 'HTTP requests answered with an error status', ('endpoint', 'status_class')
+)
+REQUEST_SECONDS = Histogram(
+    'ml_request_duration_seconds', 'End-to-end request latency by route', ('endpoint',)
+)
+# validation, preprocessing, predict_proba, explanation, serialization
+STAGE_SECONDS = Histogram(
+    'ml_stage_duration_seconds', 'Time spent per request-processing stage', ('stage',)
+)
+BATCH_SIZE = Histogram(
+    'ml_batch_size', 'Applications scored per model call, by source', ('source',),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 10000)
+)
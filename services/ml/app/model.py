@@ -1,55 +1,709 @@
-import joblib
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+from functools import cached_property
+from types import SimpleNamespace
 import numpy as np
-import pandas as pd
-from preprocessing import CreditDataPreprocessor
-
-# Try to import SHAP, but make it optional
 try:
-    import shap
-    SHAP_AVAILABLE = True
+    from .metrics import STAGE_SECONDS
+    from .preprocessing import CreditDataPreprocessor
+    from .treeshap import TreeShapExplainer, is_supported as treeshap_supported
 except ImportError:
-    SHAP_AVAILABLE = False
-    print("⚠ SHAP not available. Install with: pip install shap")
+    from metrics import STAGE_SECONDS
+    from preprocessing import CreditDataPreprocessor
+    from treeshap import TreeShapExplainer, is_supported as treeshap_supported
+
+# SHAP is optional, and imported only when the first explainer is built:
+# it pulls in numba and scipy, which scoring does not need
+SHAP_AVAILABLE = importlib.util.find_spec('shap') is not None
+if not SHAP_AVAILABLE:
+    print("⚠ SHAP not available, using built-in TreeSHAP for tree models")
+
+# Applicants are approved when P(approved) exceeds the model's decision
+# threshold; this default reproduces model.predict() for binary models.
+DEFAULT_DECISION_THRESHOLD = 0.5
+
+
+def sklearn_predict_proba(model, X):
+    """
+    The model's own predict_proba, with array features named as in training.
+
+    Models are fitted on DataFrames but served plain arrays from
+    transform_records, whose columns are already in training order;
+    naming them keeps sklearn from warning about missing feature names.
+    """
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None and isinstance(X, np.ndarray):
+        # Imported here: only the sklearn fallback needs pandas
+        import pandas as pd
+        X = pd.DataFrame(X, columns=names)
+    return model.predict_proba(X)
+
+class ModelCache:
+    """
+    Thread-safe cache of objects derived from a model, one per model object.
+
+    build(model) is called once per model (eagerly via get() at startup, or
+    lazily on first use) and its result reused across requests. Call
+    invalidate() when a model is replaced.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._lock = threading.Lock()
+        self._entries = {}  # id(model) -> (model, derived object)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model):
+        """Return the object derived from model, building it on first use."""
+        key = id(model)
+        with self._lock:
+            entry = self._entries.get(key)
+            # The model is kept in the entry, so its id cannot be reused
+            if entry is not None and entry[0] is model:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            derived = self.build(model)
+            self._entries[key] = (model, derived)
+            return derived
+
+    def invalidate(self, model=None):
+        """Drop the object derived from model, or from every model when None."""
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(id(model), None)
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached objects."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class ExplainerCache(ModelCache):
+    """
+    Cache of SHAP explainers, one per loaded model object.
+
+    Building an explainer walks every tree of the forest, so it is done
+    once per model. Explainers are shap.TreeExplainer when shap is
+    installed, the built-in TreeShapExplainer otherwise and for FlatForest
+    models, which shap does not know.
+    """
+
+    def __init__(self):
+        super().__init__(_build_explainer)
+
+
+def _build_explainer(model):
+    if SHAP_AVAILABLE and not isinstance(model, FlatForest):
+        import shap
+        return shap.TreeExplainer(model)
+    return TreeShapExplainer(model)
+
+
+class FlatForest:
+    """
+    Random forest classifier flattened into contiguous NumPy arrays.
+
+    The nodes of all trees are numbered consecutively, tree after tree, in
+    per-node arrays: split feature, threshold, NaN direction, left and right
+    child (-1 for leaves) and class probabilities. These arrays are all
+    that is needed to score; sklearn estimators are not kept.
+
+    Scoring compiles them into bitvector tables (the QuickScorer scheme):
+    leaves of each tree are numbered left to right, and every split gets a
+    mask with the leaves of its left subtree cleared. A row leaves a tree
+    at the leftmost leaf not cleared by any split it fails (x > threshold),
+    and for each feature the splits a row fails are a prefix of that
+    feature's splits sorted by threshold, so one searchsorted and one
+    lookup of a prefix-AND table per feature find the exit leaf of every
+    tree. If the tables would exceed TABLE_BUDGET_BYTES, rows walk the
+    trees level by level instead (apply()).
+
+    Missing values follow sklearn's missing_go_to_left without a per-node
+    NaN test: X is widened to [X with NaN -> -inf, X] and each split reads
+    the copy that sends NaN its way (NaN fails every x <= threshold test,
+    and sorts after every threshold, +inf included). Inputs are compared
+    as float32 values against float64 thresholds, as in sklearn, so
+    decisions are identical and probabilities match
+    RandomForestClassifier.predict_proba to rounding (< 1e-12).
+    """
+
+    # Rows scored per vectorized step
+    CHUNK_ROWS = 4096
+    # Largest prefix-AND tables built before falling back to apply()
+    TABLE_BUDGET_BYTES = 64 * 1024 * 1024
+
+    # Arrays defining the forest, as saved by app.artifacts
+    NODE_ARRAYS = ('feature', 'threshold', 'missing_left', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, missing_left, left, right, value, roots,
+                 n_features, classes, decision_threshold=None, cover=None,
+                 feature_importances=None, compiled=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.n_features_in_ = int(n_features)
+        self.classes_ = classes
+        if decision_threshold is not None:
+            self.decision_threshold_ = float(decision_threshold)
+        # Training weight reaching each node; only needed to explain
+        self.cover = cover
+        if feature_importances is not None:
+            self.feature_importances_ = feature_importances
+
+        # Level-by-level traversal: split column in the widened X, and
+        # children interleaved as [left, right], leaves pointing to themselves
+        is_leaf = self.left < 0
+        nodes = np.arange(len(self.feature))
+        self._column = np.where(
+            is_leaf, 0, self.feature + np.where(self.missing_left, 0, self.n_features_in_)
+        ).astype(np.intp)
+        self._children = np.stack([
+            np.where(is_leaf, nodes, self.left), np.where(is_leaf, nodes, self.right)
+        ], axis=1).astype(np.intp).ravel()
+        self._class_value = [np.ascontiguousarray(self.value[:, c]) for c in range(self.value.shape[1])]
+
+        self.compiled = self._compile() if compiled is None else compiled
+        self._bind(self.compiled)
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Export a fitted RandomForestClassifier (or ExtraTreesClassifier).
+
+        Raises:
+            TypeError: if the model is not a single-output tree ensemble classifier
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if (not isinstance(estimators, list) or not estimators
+                or not hasattr(model, 'classes_') or not all(hasattr(e, 'tree_') for e in estimators)
+                or getattr(model, 'n_outputs_', 1) != 1):
+            raise TypeError(f"Cannot flatten {type(model).__name__}: not a tree ensemble classifier")
+
+        n_classes = len(model.classes_)
+        trees = [estimator.tree_ for estimator in estimators]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        def children(tree, offset, side):
+            return np.where(side == -1, -1, side + offset)
+
+        values = []
+        for tree in trees:
+            # Per-tree class probabilities, normalized as DecisionTreeClassifier does
+            value = tree.value[:, 0, :n_classes].copy()
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+        return cls(
+            feature=np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+            threshold=np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+            missing_left=np.concatenate([tree.missing_go_to_left for tree in trees]).astype(bool),
+            left=np.concatenate([
+                children(tree, offset, tree.children_left) for tree, offset in zip(trees, offsets)
+            ]).astype(np.int32),
+            right=np.concatenate([
+                children(tree, offset, tree.children_right) for tree, offset in zip(trees, offsets)
+            ]).astype(np.int32),
+            value=np.concatenate(values),
+            roots=offsets[:-1].astype(np.int32),
+            n_features=model.n_features_in_,
+            classes=model.classes_,
+            decision_threshold=getattr(model, 'decision_threshold_', None),
+            cover=np.concatenate([tree.weighted_n_node_samples for tree in trees]),
+            feature_importances=getattr(model, 'feature_importances_', None)
+        )
+
+    def compact(self, value_dtype=np.float32, explainable=True, tables=True):
+        """
+        Return a smaller copy of the forest for serving.
+
+        Thresholds are stored as float32, each rounded down to the largest
+        float32 not above it: inputs are compared as float32, and for any
+        float32 x, x <= t exactly when x <= that value, so every row still
+        reaches the same leaves. Class probabilities (and node cover) are
+        stored as value_dtype, which is where the compact forest differs
+        from the original: by up to about 2.5e-4 for float16, and 3e-8 for
+        float32.
+
+        Args:
+            value_dtype: np.float32 or np.float16
+            explainable: Keep node cover (as float32) for TreeSHAP; without
+                it the compact forest cannot be explained
+            tables: Keep the bitvector scoring tables; without them rows
+                walk the trees (apply()), which is slower on large batches
+                but needs only the node arrays
+
+        Returns:
+            A new FlatForest
+        """
+        threshold = self.threshold.astype(np.float32)
+        above = threshold > self.threshold
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        return FlatForest(
+            feature=self.feature,
+            threshold=threshold,
+            missing_left=self.missing_left,
+            left=self.left,
+            right=self.right,
+            value=self.value.astype(value_dtype),
+            roots=self.roots,
+            n_features=self.n_features_in_,
+            classes=self.classes_,
+            decision_threshold=getattr(self, 'decision_threshold_', None),
+            cover=self.cover.astype(np.float32) if explainable and self.cover is not None else None,
+            feature_importances=getattr(self, 'feature_importances_', None),
+            compiled=None if tables else {'max_depth': np.array(self.max_depth), 'words': np.array(0)}
+        )
+
+    def footprint(self):
+        """Bytes held by the node arrays and by the compiled scoring tables."""
+        nodes = [getattr(self, name) for name in self.NODE_ARRAYS]
+        if self.cover is not None:
+            nodes.append(self.cover)
+        return {
+            'nodes': sum(array.nbytes for array in nodes),
+            'tables': sum(array.nbytes for array in self.compiled.values())
+        }
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @cached_property
+    def estimators_(self):
+        """
+        Per-tree views exposing the tree_ attributes TreeShapExplainer reads.
+
+        Empty when the forest was saved without node cover, which makes the
+        forest unexplainable rather than wrongly explained. Built on first
+        access and kept: can_explain() reads it on every scoring request.
+        """
+        if self.cover is None:
+            return []
+        estimators = []
+        bounds = list(self.roots) + [len(self.feature)]
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            left = self.left[begin:end]
+            right = self.right[begin:end]
+            tree = SimpleNamespace(
+                node_count=end - begin,
+                n_features=self.n_features_in_,
+                feature=np.asarray(self.feature[begin:end]),
+                threshold=np.asarray(self.threshold[begin:end]),
+                missing_go_to_left=np.asarray(self.missing_left[begin:end]),
+                children_left=np.where(left < 0, -1, left - begin),
+                children_right=np.where(right < 0, -1, right - begin),
+                weighted_n_node_samples=np.asarray(self.cover[begin:end], dtype=np.float64),
+                value=np.asarray(self.value[begin:end], dtype=np.float64)[:, None, :]
+            )
+            estimators.append(SimpleNamespace(tree_=tree))
+        return estimators
+
+    def _compile(self):
+        """
+        Build the bitvector tables from the node arrays.
+
+        Returns:
+            Dict of arrays (saved with the forest by app.artifacts); words
+            is 0 when the tables would exceed TABLE_BUDGET_BYTES
+        """
+        n_nodes = len(self.feature)
+        n_trees = self.n_estimators
+        is_leaf = self.left < 0
+
+        # Number leaves left to right in a depth-first walk (left child
+        # first); a split's left subtree holds leaf ranks [start[node],
+        # start[right child])
+        start = np.zeros(n_nodes, dtype=np.int64)
+        tree_of = np.zeros(n_nodes, dtype=np.int64)
+        max_depth = 0
+        max_leaves = 1
+        for tree, root in enumerate(self.roots):
+            rank = 0
+            stack = [(int(root), 0)]
+            while stack:
+                node, depth = stack.pop()
+                start[node] = rank
+                tree_of[node] = tree
+                if is_leaf[node]:
+                    rank += 1
+                    max_depth = max(max_depth, depth)
+                    continue
+                stack.append((int(self.right[node]), depth + 1))
+                stack.append((int(self.left[node]), depth + 1))
+            max_leaves = max(max_leaves, rank)
+
+        words = -(-max_leaves // 64)
+        splits = np.flatnonzero(~is_leaf)
+        n_columns = 2 * self.n_features_in_
+        table_bytes = (len(splits) + n_columns) * n_trees * words * 8
+        if table_bytes > self.TABLE_BUDGET_BYTES:
+            return {'max_depth': np.array(max_depth), 'words': np.array(0)}
 
+        # Leaf probabilities by (tree, word, bit), one row per class
+        leaves = np.flatnonzero(is_leaf)
+        leaf_value = np.zeros((self.value.shape[1], n_trees * words * 64), dtype=self.value.dtype)
+        leaf_value[:, tree_of[leaves] * words * 64 + start[leaves]] = self.value[leaves].T
+
+        # Per split: all-ones words of width n_trees * words, except the
+        # left-subtree leaves cleared in the split's own tree
+        full = (1 << (64 * words)) - 1
+        word_mask = (1 << 64) - 1
+        masks = np.empty((len(splits), words), dtype=np.uint64)
+        for i, node in enumerate(splits):
+            low, high = int(start[node]), int(start[self.right[node]])
+            mask = full ^ ((1 << high) - (1 << low))
+            masks[i] = [(mask >> (64 * w)) & word_mask for w in range(words)]
+
+        # Splits grouped by widened column, by increasing threshold within
+        # a column; the table of column c has one row more than its splits,
+        # row k being the AND of the masks of its first k splits
+        order = np.lexsort((self.threshold[splits], self._column[splits]))
+        members = splits[order]
+        table_start = np.searchsorted(self._column[members], np.arange(n_columns + 1))
+        table = np.full((len(members) + n_columns, n_trees * words), np.uint64(word_mask), dtype=np.uint64)
+        rows = np.arange(len(members)) + np.searchsorted(table_start, np.arange(len(members)), side='right')
+        table[rows[:, None], (tree_of[members] * words)[:, None] + np.arange(words)] = masks[order]
+        for column in range(n_columns):
+            segment = table[table_start[column] + column:table_start[column + 1] + column + 1]
+            np.bitwise_and.accumulate(segment, axis=0, out=segment)
+
+        return {
+            'max_depth': np.array(max_depth),
+            'words': np.array(words),
+            'leaf_value': leaf_value,
+            'split_threshold': self.threshold[members],
+            'table_start': table_start,
+            'table': table
+        }
+
+    def _bind(self, compiled):
+        """Point the scoring code at the arrays of compiled (possibly memory-mapped)."""
+        self.max_depth = int(compiled['max_depth'])
+        self._words = int(compiled['words'])
+        if self._words == 0:
+            self._tables = None
+            return
+
+        self._leaf_value = list(compiled['leaf_value'])
+        self._tree_base = np.arange(self.n_estimators) * self._words * 64
+        table_start = compiled['table_start']
+        self._tables = []
+        for column in range(2 * self.n_features_in_):
+            begin, end = int(table_start[column]), int(table_start[column + 1])
+            if begin == end:
+                self._tables.append(None)
+                continue
+            self._tables.append((
+                compiled['split_threshold'][begin:end],
+                compiled['table'][begin + column:end + column + 1]
+            ))
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, the forest expects {self.n_features_in_}")
+        return X
+
+    @staticmethod
+    def _widen(X):
+        return np.concatenate([np.where(np.isnan(X), -np.inf, X), X], axis=1)
+
+    def apply(self, X):
+        """Return the leaf reached in every tree, as node indices (n_samples, n_trees)."""
+        widened = self._widen(self._check(X))
+        width = widened.shape[1]
+        flat = widened.ravel()
+
+        nodes = np.empty((widened.shape[0], self.n_estimators), dtype=np.intp)
+        for start in range(0, widened.shape[0], self.CHUNK_ROWS):
+            stop = min(start + self.CHUNK_ROWS, widened.shape[0])
+            row_base = (np.arange(start, stop) * width)[:, None]
+            node = np.broadcast_to(self.roots.astype(np.intp), (stop - start, self.n_estimators)).copy()
+            for _ in range(self.max_depth):
+                x = flat[row_base + self._column[node]]
+                goes_left = x <= self.threshold[node]
+                node = self._children[2 * node + 1 - goes_left]
+            nodes[start:stop] = node
+        return nodes
+
+    def _exit_leaves(self, widened):
+        """Slot of the leaf reached in every tree, from the bitvector tables."""
+        mask = None
+        for column, entry in enumerate(self._tables):
+            if entry is None:
+                continue
+            thresholds, table = entry
+            # Rows fail (go right at) every split with threshold < x,
+            # and every split when x is NaN
+            rows = table[np.searchsorted(thresholds, widened[:, column].astype(thresholds.dtype))]
+            if mask is None:
+                mask = rows
+            else:
+                mask &= rows
+        if mask is None:
+            return np.broadcast_to(self._tree_base, (widened.shape[0], self.n_estimators))
+
+        mask = mask.reshape(widened.shape[0], self.n_estimators, self._words)
+        if self._words == 1:
+            word_index = 0
+            word = mask[:, :, 0]
+        else:
+            word_index = np.argmax(mask != 0, axis=2)
+            word = np.take_along_axis(mask, word_index[:, :, None], axis=2)[:, :, 0]
+        # Index of the lowest set bit: isolate it, then read its exponent
+        lowest = word & (~word + np.uint64(1))
+        bit = np.frexp(lowest.astype(np.float64))[1] - 1
+        return self._tree_base + 64 * word_index + bit
+
+    def predict_proba(self, X):
+        """Class probabilities, averaged over trees like RandomForestClassifier."""
+        X = self._check(X)
+        proba = np.empty((X.shape[0], len(self._class_value)))
+        for start in range(0, X.shape[0], self.CHUNK_ROWS):
+            rows = X[start:start + self.CHUNK_ROWS]
+            if self._tables is None:
+                slots, values = self.apply(rows), self._class_value
+            else:
+                slots, values = self._exit_leaves(self._widen(rows)), self._leaf_value
+            for c, value in enumerate(values):
+                proba[start:start + len(rows), c] = value.take(slots).sum(axis=1, dtype=np.float64)
+        if self.value.dtype == np.float64:
+            proba /= self.n_estimators
+        else:
+            # Rounded leaf probabilities (see compact()) need not sum to 1
+            proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        """Predicted class labels (argmax of predict_proba)."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compile_forest(model):
+    """Return a FlatForest for model, or None if it cannot be flattened."""
+    if isinstance(model, FlatForest):
+        return model
+    try:
+        return FlatForest.from_model(model)
+    except TypeError:
+        return None
+
+
+def predict_proba(model, X):
+    """
+    Class probabilities for preprocessed features.
+
+    Tree ensemble classifiers are scored by their cached FlatForest, which
+    avoids sklearn's per-estimator dispatch and joblib overhead; other
+    models use their own predict_proba.
+    """
+    forest = forest_cache.get(model)
+    with STAGE_SECONDS.time('predict_proba'):
+        if forest is None:
+            return sklearn_predict_proba(model, X)
+        return forest.predict_proba(X)
+
+
+explainer_cache = ExplainerCache()
+forest_cache = ModelCache(compile_forest)
 
 
 def load_model(model_path='../models/model.joblib'):
-    """Load trained credit scoring model."""
-    return joblib.load(model_path)
+    """
+    Load trained credit scoring model.
+
+    A directory is read as a memory-mapped flat-array artifact (see
+    app/artifacts.py) and gives a FlatForest; a joblib model is set to
+    n_jobs=1 (see single_threaded()).
+    """
+    if os.path.isdir(model_path):
+        return _artifacts().load_artifact(model_path)[0]
+    import joblib
+    return single_threaded(joblib.load(model_path))
+
+
+def single_threaded(model):
+    """
+    Set n_jobs=1 on a model loaded for serving.
+
+    Training stores n_jobs=-1, which makes every sklearn predict_proba
+    fan out to a thread per core; when serving, concurrent requests and
+    worker processes already use the cores.
+    """
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    return model
 
 
 def load_preprocessor(preprocessor_path='../models/preprocessor.joblib'):
-    """Load fitted preprocessor."""
+    """Load fitted preprocessor, from a joblib file or an artifact directory."""
+    if os.path.isdir(preprocessor_path):
+        return _artifacts().load_artifact(preprocessor_path)[1]
+    import joblib
     return joblib.load(preprocessor_path)
 
 
-def predict_score(model, preprocessor, data):
+def _artifacts():
+    # Imported on demand: app.artifacts itself imports this module
+    try:
+        from . import artifacts
+    except ImportError:
+        import artifacts
+    return artifacts
+
+
+def artifact_version(*paths):
+    """
+    Short content hash identifying a set of model artifact files.
+
+    An artifact directory is identified by its format file, which lists
+    the SHA-256 of every array in it.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            path = os.path.join(path, _artifacts().FORMAT_FILE)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def prepare_features(preprocessor, data):
+    """
+    Preprocess input data into the model's feature matrix.
+
+    Dicts and lists of dicts take the pandas-free transform_records path;
+    DataFrames go through the regular transform.
+
+    Args:
+        preprocessor: Fitted preprocessor
+        data: Dict, list of dicts or DataFrame with feature values
+
+    Returns:
+        Feature matrix (numpy array or DataFrame) in feature_columns order
+    """
+    with STAGE_SECONDS.time('preprocessing'):
+        if _is_dataframe(data):
+            X = preprocessor.transform(data)
+            if isinstance(X, tuple):
+                X = X[0]  # Handle tuple return from transform
+            return X
+
+        if isinstance(data, dict):
+            data = [data]
+        return preprocessor.transform_records(list(data))
+
+
+def _is_dataframe(data):
+    # pandas is not imported for serving; a DataFrame implies it was loaded
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(data, pandas.DataFrame)
+
+
+def get_decision_threshold(model):
+    """Return the approval threshold stored with the model (decision_threshold_)."""
+    return float(getattr(model, 'decision_threshold_', DEFAULT_DECISION_THRESHOLD))
+
+
+def predict_with_threshold(model, X, threshold=None):
+    """
+    Score preprocessed features with a single predict_proba pass.
+
+    Args:
+        model: Trained ML model
+        X: Preprocessed feature matrix
+        threshold: Approval threshold, defaults to the model's own
+
+    Returns:
+        predictions (0/1 array), probabilities (n_samples x 2 array)
+    """
+    if threshold is None:
+        threshold = get_decision_threshold(model)
+
+    probabilities = predict_proba(model, X)
+    predictions = (probabilities[:, 1] > threshold).astype(int)
+
+    return predictions, probabilities
+
+
+def predict_score(model, preprocessor, data, threshold=None):
     """
     Predict credit score for input data.
-    
+
     Args:
         model: Trained ML model
         preprocessor: Fitted preprocessor
         data: Dict or DataFrame with feature values
-    
+        threshold: Approval threshold, defaults to the model's own
+
     Returns:
         Dictionary with prediction results
     """
-    # Convert dict to DataFrame if needed
-    if isinstance(data, dict):
-        df = pd.DataFrame([data])
-    else:
-        df = data
-    
     # Preprocess data
-    X = preprocessor.transform(df)
-    if isinstance(X, tuple):
-        X = X[0]  # Handle tuple return from transform
-    
+    X = prepare_features(preprocessor, data)
+
     # Get predictions
-    prediction = model.predict(X)[0]
-    probability = model.predict_proba(X)[0]
-    
+    predictions, probabilities = predict_with_threshold(model, X, threshold)
+
+    return format_prediction(predictions[0], probabilities[0])
+
+
+def predict_batch(model, preprocessor, records, threshold=None):
+    """
+    Predict credit scores for many applications with a single model call.
+
+    Args:
+        model: Trained ML model
+        preprocessor: Fitted preprocessor
+        records: List of dicts or DataFrame with feature values
+        threshold: Approval threshold, defaults to the model's own
+
+    Returns:
+        List of prediction result dictionaries, in input order
+    """
+    if not _is_dataframe(records):
+        records = list(records)
+    if len(records) == 0:
+        return []
+
+    # Preprocess all rows at once
+    X = prepare_features(preprocessor, records)
+
+    # One pass over the forest for every row
+    predictions, probabilities = predict_with_threshold(model, X, threshold)
+
+    return [
+        format_prediction(prediction, probability)
+        for prediction, probability in zip(predictions, probabilities)
+    ]
+
+
+def format_prediction(prediction, probability):
+    """
+    Build the prediction result dictionary for one application.
+
+    Args:
+        prediction: Predicted class (0 = rejected, 1 = approved)
+        probability: Class probabilities [rejected, approved]
+
+    Returns:
+        Dictionary with prediction results
+    """
     return {
         'prediction': int(prediction),
         'prediction_label': 'Approved' if prediction == 1 else 'Rejected',
@@ -60,47 +714,42 @@ def predict_score(model, preprocessor, data):
     }
 
 
-def explain_prediction(model, preprocessor, data, top_n=5):
+def can_explain(model):
+    """Return True if explain_prediction computes real SHAP values for model."""
+    if isinstance(model, FlatForest):
+        return treeshap_supported(model)
+    return SHAP_AVAILABLE or treeshap_supported(model)
+
+
+def explain_prediction(model, preprocessor, data, top_n=5, X=None):
     """
     Generate SHAP explanations for prediction.
-    
+
     Args:
         model: Trained ML model
         preprocessor: Fitted preprocessor
         data: Dict or DataFrame with feature values
         top_n: Number of top features to return
-    
+        X: Preprocessed features of data, if already computed
+
     Returns:
         Dictionary with SHAP explanation results
     """
-    if not SHAP_AVAILABLE:
+    if not can_explain(model):
         # Return feature importances from the model instead
-        return get_feature_importance_explanation(model, preprocessor, data, top_n)
-    
-    # Convert dict to DataFrame if needed
-    if isinstance(data, dict):
-        df = pd.DataFrame([data])
-    else:
-        df = data
-    
+        return get_feature_importance_explanation(model, preprocessor, data, top_n, X=X)
+
     # Preprocess data
-    X = preprocessor.transform(df)
-    if isinstance(X, tuple):
-        X = X[0]  # Handle tuple return from transform
-    
+    if X is None:
+        X = prepare_features(preprocessor, data)
+
     # Generate SHAP values
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X)
-    
-    # For binary classification, get values for positive class (approved)
-    if isinstance(shap_values, list):
-        shap_vals = shap_values[1][0]  # Class 1 (approved)
-    else:
-        shap_vals = shap_values[0]
-    
+    shap_matrix, base_value = explain_batch(model, X)
+    shap_vals = shap_matrix[0]
+
     # Get feature names
     feature_names = preprocessor.feature_columns
-    
+
     # Create feature importance list
     feature_importance = []
     for idx, (feature, shap_val) in enumerate(zip(feature_names, shap_vals)):
@@ -110,17 +759,13 @@ def explain_prediction(model, preprocessor, data, top_n=5):
             'impact': 'positive' if shap_val > 0 else 'negative',
             'abs_importance': float(abs(shap_val))
         })
-    
+
     # Sort by absolute importance
     feature_importance.sort(key=lambda x: x['abs_importance'], reverse=True)
-    
-    # Get base value (expected value)
-    base_value = float(explainer.expected_value[1] if isinstance(explainer.expected_value, list) 
-                      else explainer.expected_value)
-    
+
     # Calculate prediction value
     prediction_value = base_value + sum(shap_vals)
-    
+
     return {
         'shap_values': [float(v) for v in shap_vals],
         'feature_names': feature_names,
@@ -132,38 +777,58 @@ def explain_prediction(model, preprocessor, data, top_n=5):
     }
 
 
-def get_feature_importance_explanation(model, preprocessor, data, top_n=5):
+def explain_batch(model, X):
+    """
+    SHAP values of the approved class for every row of X.
+
+    Args:
+        model: Trained ML model (can_explain(model) must be True)
+        X: Preprocessed feature matrix
+
+    Returns:
+        shap values (n_samples x n_features array), base value (float)
+    """
+    explainer = explainer_cache.get(model)
+    with STAGE_SECONDS.time('explanation'):
+        shap_values = explainer.shap_values(X)
+
+    # For binary classification, get values for positive class (approved)
+    if isinstance(shap_values, list):
+        shap_values = shap_values[1]  # Class 1 (approved)
+    elif np.ndim(shap_values) == 3:
+        shap_values = shap_values[:, :, 1]  # (samples, features, classes)
+
+    base_value = float(explainer.expected_value[1] if np.ndim(explainer.expected_value) > 0
+                       else explainer.expected_value)
+    return np.asarray(shap_values), base_value
+
+
+def get_feature_importance_explanation(model, preprocessor, data, top_n=5, X=None):
     """
-    Fallback explanation using feature importances (when SHAP not available).
-    
+    Fallback explanation using feature importances (when SHAP values cannot be computed).
+
     Args:
         model: Trained ML model
         preprocessor: Fitted preprocessor
         data: Dict or DataFrame with feature values
         top_n: Number of top features to return
-    
+        X: Preprocessed features of data, if already computed
+
     Returns:
         Dictionary with feature importance explanation
     """
-    # Convert dict to DataFrame if needed
-    if isinstance(data, dict):
-        df = pd.DataFrame([data])
-    else:
-        df = data
-    
     # Preprocess data
-    X = preprocessor.transform(df)
-    if isinstance(X, tuple):
-        X = X[0]
-    
+    if X is None:
+        X = prepare_features(preprocessor, data)
+
     # Get feature importances from model
     if hasattr(model, 'feature_importances_'):
         importances = model.feature_importances_
     else:
         importances = np.ones(X.shape[1]) / X.shape[1]  # Equal weights if not available
-    
+
     feature_names = preprocessor.feature_columns
-    
+
     # Create feature importance list
     feature_importance = []
     for idx, (feature, importance) in enumerate(zip(feature_names, importances)):
@@ -173,10 +838,10 @@ def get_feature_importance_explanation(model, preprocessor, data, top_n=5):
             'impact': 'positive',  # Simplified
             'abs_importance': float(abs(importance))
         })
-    
+
     # Sort by importance
     feature_importance.sort(key=lambda x: x['abs_importance'], reverse=True)
-    
+
     return {
         'shap_values': [float(v) for v in importances],
         'feature_names': feature_names,
@@ -191,55 +856,102 @@ def get_feature_importance_explanation(model, preprocessor, data, top_n=5):
 def generate_explanation_summary(top_features):
     """
     Generate human-readable explanation from SHAP features.
-    
+
     Args:
         top_features: List of top feature importance dicts
-    
+
     Returns:
         String with explanation summary
     """
     if not top_features:
         return "No significant features identified."
-    
+
     summary_parts = []
-    
+
     for feature in top_features[:3]:  # Top 3 features
         feature_name = feature['feature']
         impact = feature['impact']
         strength = abs(feature['shap_value'])
-        
+
         if strength > 0.5:
             strength_word = "strongly"
         elif strength > 0.2:
             strength_word = "moderately"
         else:
             strength_word = "slightly"
-        
+
         direction = "increases" if impact == "positive" else "decreases"
-        
+
         summary_parts.append(
             f"{feature_name} {strength_word} {direction} approval probability"
         )
-    
+
     return ". ".join(summary_parts) + "."
 
 
-def predict_and_explain(model, preprocessor, data, top_n=5):
+def predict_and_explain(model, preprocessor, data, top_n=5, threshold=None):
     """
     Combined prediction and explanation.
-    
+
     Args:
         model: Trained ML model
         preprocessor: Fitted preprocessor
         data: Dict or DataFrame with feature values
         top_n: Number of top features to return
-    
+        threshold: Approval threshold, defaults to the model's own
+
+    Returns:
+        Dictionary with prediction and explanation
+    """
+    # Preprocess once and share the features between both steps
+    X = prepare_features(preprocessor, data)
+
+    predictions, probabilities = predict_with_threshold(model, X, threshold)
+    prediction_result = format_prediction(predictions[0], probabilities[0])
+    explanation_result = explain_prediction(model, preprocessor, data, top_n, X=X)
+
+    return {
+        'prediction': prediction_result,
+        'explanation': explanation_result
+    }
+
+
+def score_application(model, preprocessor, data, top_n=5, threshold=None):
+    """
+    Prediction and explanation for one application, as served by /score.
+
+    The prediction is computed once; if the explanation cannot be produced
+    because SHAP is missing, it is replaced by an empty explanation instead
+    of failing the request.
+
+    Args:
+        model: Trained ML model
+        preprocessor: Fitted preprocessor
+        data: Dict with feature values
+        top_n: Number of top features to return
+        threshold: Approval threshold, defaults to the model's own
+
     Returns:
         Dictionary with prediction and explanation
     """
-    prediction_result = predict_score(model, preprocessor, data)
-    explanation_result = explain_prediction(model, preprocessor, data, top_n)
-    
+    # Preprocess and predict once; the explanation reuses both
+    X = prepare_features(preprocessor, data)
+    predictions, probabilities = predict_with_threshold(model, X, threshold)
+    prediction_result = format_prediction(predictions[0], probabilities[0])
+
+    try:
+        explanation_result = explain_prediction(model, preprocessor, data, top_n, X=X)
+    except ImportError:
+        # SHAP not available - return prediction only
+        explanation_result = {
+            'shap_values': [],
+            'feature_names': getattr(preprocessor, 'feature_columns', None) or [],
+            'base_value': 0.0,
+            'prediction_value': 0.0,
+            'top_features': [],
+            'explanation_summary': "SHAP not installed. Install with: pip install shap"
+        }
+
     return {
         'prediction': prediction_result,
         'explanation': explanation_result
@@ -251,16 +963,16 @@ if __name__ == "__main__":
     print("=" * 60)
     print("TESTING CREDIT SCORING MODEL")
     print("=" * 60)
-    
+
     # Load model and preprocessor
     model = load_model()
     preprocessor = load_preprocessor()
-    
+
     # Test case 1: Good credit profile
     print("\n" + "-" * 60)
     print("Test Case 1: Good Credit Profile")
     print("-" * 60)
-    
+
     test_data_good = {
         'Age': 45,
         'Sex': 'male',
@@ -272,9 +984,9 @@ if __name__ == "__main__":
         'Duration': 12,
         'Purpose': 'car'
     }
-    
+
     result_good = predict_and_explain(model, preprocessor, test_data_good)
-    
+
     print(f"Prediction: {result_good['prediction']['prediction_label']}")
     print(f"Confidence: {result_good['prediction']['confidence']:.2%}")
     print(f"Risk Score: {result_good['prediction']['risk_score']:.2%}")
@@ -282,12 +994,12 @@ if __name__ == "__main__":
     for feat in result_good['explanation']['top_features']:
         print(f"  • {feat['feature']}: {feat['impact']} (SHAP: {feat['shap_value']:.4f})")
     print(f"\nExplanation: {result_good['explanation']['explanation_summary']}")
-    
+
     # Test case 2: Poor credit profile
     print("\n" + "-" * 60)
     print("Test Case 2: Risky Credit Profile")
     print("-" * 60)
-    
+
     test_data_poor = {
         'Age': 22,
         'Sex': 'female',
@@ -299,9 +1011,9 @@ if __name__ == "__main__":
         'Duration': 48,
         'Purpose': 'business'
     }
-    
+
     result_poor = predict_and_explain(model, preprocessor, test_data_poor)
-    
+
     print(f"Prediction: {result_poor['prediction']['prediction_label']}")
     print(f"Confidence: {result_poor['prediction']['confidence']:.2%}")
     print(f"Risk Score: {result_poor['prediction']['risk_score']:.2%}")
@@ -309,7 +1021,7 @@ if __name__ == "__main__":
     for feat in result_poor['explanation']['top_features']:
         print(f"  • {feat['feature']}: {feat['impact']} (SHAP: {feat['shap_value']:.4f})")
     print(f"\nExplanation: {result_poor['explanation']['explanation_summary']}")
-    
+
     print("\n" + "=" * 60)
     print("✓ MODEL TESTING COMPLETE")
     print("=" * 60)
@@ -0,0 +1,68 @@
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+
+# Longest line accepted by default; longer ones are reported, not buffered
+DEFAULT_MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_lines(chunks, max_line_bytes=DEFAULT_MAX_LINE_BYTES):
+    """
+    Split an async stream of byte chunks into newline-delimited JSON lines.
+
+    Only the current partial line is buffered, so memory does not grow with
+    the stream. Blank lines are skipped.
+
+    Args:
+        chunks: Async iterable of bytes (e.g. Request.stream())
+        max_line_bytes: Longest line to yield
+
+    Yields:
+        Each line without its newline, or None in place of a line longer
+        than max_line_bytes (whose bytes are discarded)
+    """
+    buffer = b''
+    skipping = False
+    async for chunk in chunks:
+        if skipping:
+            # Drop the rest of an over-long line
+            end = chunk.find(b'\n')
+            if end < 0:
+                continue
+            skipping = False
+            chunk = chunk[end + 1:]
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            if len(line) > max_line_bytes:
+                yield None
+            elif line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            yield None
+            buffer = b''
+            skipping = True
+    if buffer.strip() and not skipping:
+        yield buffer
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for bodies produced while the request is still read.
+
+    StreamingResponse normally listens for the client disconnecting by
+    calling receive() alongside the stream, which would swallow request
+    body messages the body iterator has not read yet. Here receive() is
+    left to the iterator: Request.stream() raises ClientDisconnect when the
+    client goes away, and the iterator stops there.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
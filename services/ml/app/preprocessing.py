@@ -1,27 +1,29 @@
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.impute import SimpleImputer
-import joblib
 
 
 class CreditDataPreprocessor:
-    """Preprocessor for credit scoring data with encoding, scaling, and imputation."""
-    
+    """
+    Preprocessor for credit scoring data with encoding and scaling.
+
+    sklearn is only imported to fit; a fitted preprocessor scores with
+    numpy alone (and pandas for DataFrame input).
+    """
+
     def __init__(self):
         self.label_encoders = {}
-        self.scaler = StandardScaler()
-        self.imputer = SimpleImputer(strategy='most_frequent')
+        self.scaler = None
         self.feature_columns = None
-        
+
     def fit(self, df):
         """Fit preprocessor on training data."""
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+
         df = df.copy()
-        
+
         # Remove index column if exists
         if 'Unnamed: 0' in df.columns:
             df = df.drop('Unnamed: 0', axis=1)
-        
+
         # Separate features and target
         if 'target' in df.columns:
             X = df.drop('target', axis=1)
@@ -29,14 +31,14 @@ class CreditDataPreprocessor:
         else:
             X = df
             y = None
-        
+
         # Store original feature columns
         self.feature_columns = X.columns.tolist()
-        
+
         # Identify categorical columns
         categorical_cols = X.select_dtypes(include=['object']).columns.tolist()
         numerical_cols = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        
+
         # Fit label encoders for categorical columns
         for col in categorical_cols:
             le = LabelEncoder()
@@ -44,21 +46,23 @@ class CreditDataPreprocessor:
             X[col] = X[col].fillna('NA')
             le.fit(X[col])
             self.label_encoders[col] = le
-        
+
         # Fit scaler on numerical columns
+        self.scaler = StandardScaler()
         if numerical_cols:
             self.scaler.fit(X[numerical_cols])
-        
+
+        self._compile()
         return self
-    
+
     def transform(self, df):
         """Transform data using fitted preprocessor."""
         df = df.copy()
-        
+
         # Remove index column if exists
         if 'Unnamed: 0' in df.columns:
             df = df.drop('Unnamed: 0', axis=1)
-        
+
         # Separate features and target if present
         has_target = 'target' in df.columns
         if has_target:
@@ -67,67 +71,188 @@ class CreditDataPreprocessor:
         else:
             X = df
             y = None
-        
+
         # Ensure all required columns are present
         for col in self.feature_columns:
             if col not in X.columns:
                 X[col] = np.nan
-        
+
         # Reorder columns to match training
         X = X[self.feature_columns]
-        
+
         # Transform categorical columns
         for col, le in self.label_encoders.items():
             if col in X.columns:
                 X[col] = X[col].fillna('NA')
                 # Handle unseen categories
-                X[col] = X[col].apply(lambda x: x if x in le.classes_ else le.classes_[0])
+                X[col] = X[col].where(X[col].isin(le.classes_), le.classes_[0])
                 X[col] = le.transform(X[col])
-        
+
         # Transform numerical columns using stored column names from fit
         if hasattr(self, 'numerical_cols') and self.numerical_cols:
             X[self.numerical_cols] = self.scaler.transform(X[self.numerical_cols])
-        
+
         if has_target:
             return X, y
         return X
-    
+
+    def transform_records(self, records):
+        """
+        Transform plain dict records without going through pandas.
+
+        Produces the same values as transform() on a DataFrame built from
+        the records, as a float64 array in feature_columns order.
+
+        Args:
+            records: Dict or list of dicts with feature values
+
+        Returns:
+            numpy array of shape (n_records, n_features)
+        """
+        if isinstance(records, dict):
+            records = [records]
+
+        plan, scaling = self._compiled
+        X = np.empty((len(records), len(plan)), dtype=np.float64)
+
+        for i, record in enumerate(records):
+            row = X[i]
+            for j, (col, codes) in enumerate(plan):
+                value = record.get(col)
+                missing = value is None or (isinstance(value, float) and value != value)
+                if codes is None:
+                    row[j] = np.nan if missing else float(value)
+                else:
+                    # Unseen categories map to classes_[0], i.e. code 0
+                    row[j] = codes.get('NA' if missing else value, 0)
+
+        if scaling is not None:
+            idx, mean, scale = scaling
+            Xs = X[:, idx]
+            if mean is not None:
+                Xs -= mean
+            if scale is not None:
+                Xs /= scale
+            X[:, idx] = Xs
+
+        return X
+
+    def _compile(self):
+        """Precompute the lookup tables used by transform_records."""
+        plan = []
+        for col in self.feature_columns or []:
+            le = self.label_encoders.get(col)
+            if le is None:
+                plan.append((col, None))
+            else:
+                plan.append((col, {cls: code for code, cls in enumerate(le.classes_.tolist())}))
+
+        scaling = None
+        if getattr(self, 'numerical_cols', None):
+            idx = [self.feature_columns.index(col) for col in self.numerical_cols]
+            scaling = (idx, self.scaler.mean_, self.scaler.scale_)
+
+        self._compiled = (plan, scaling)
+
+    def to_tables(self):
+        """
+        Export the fitted state as plain lists and arrays.
+
+        Returns:
+            Dict with feature_columns, categories (column -> classes_ array),
+            numerical_cols, mean and scale (None when nothing is scaled)
+        """
+        numerical_cols = getattr(self, 'numerical_cols', None) or None
+        return {
+            'feature_columns': list(self.feature_columns),
+            'categories': {col: le.classes_ for col, le in self.label_encoders.items()},
+            'numerical_cols': numerical_cols,
+            'mean': self.scaler.mean_ if numerical_cols else None,
+            'scale': self.scaler.scale_ if numerical_cols else None
+        }
+
+    @classmethod
+    def from_tables(cls, feature_columns, categories, numerical_cols=None, mean=None, scale=None):
+        """Rebuild a fitted preprocessor from the output of to_tables()."""
+        preprocessor = cls()
+        preprocessor.feature_columns = list(feature_columns)
+        for col, classes in categories.items():
+            preprocessor.label_encoders[col] = _CategoryCodes(classes)
+        if numerical_cols:
+            from sklearn.preprocessing import StandardScaler
+
+            preprocessor.numerical_cols = list(numerical_cols)
+            preprocessor.scaler = StandardScaler()
+            preprocessor.scaler.mean_ = np.asarray(mean)
+            preprocessor.scaler.scale_ = np.asarray(scale)
+            preprocessor.scaler.n_features_in_ = len(numerical_cols)
+        preprocessor._compile()
+        return preprocessor
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_compiled', None)
+        return state
+
+    def __setstate__(self, state):
+        # Older pickles carry a SimpleImputer that was never used
+        state.pop('imputer', None)
+        self.__dict__.update(state)
+        self._compile()
+
     def fit_transform(self, df):
         """Fit and transform in one step."""
         self.fit(df)
         return self.transform(df)
-    
+
     def save(self, filepath='models/preprocessor.joblib'):
         """Save preprocessor to file."""
+        import joblib
         joblib.dump(self, filepath)
         print(f"✓ Preprocessor saved to {filepath}")
-    
+
     @staticmethod
     def load(filepath='models/preprocessor.joblib'):
         """Load preprocessor from file."""
+        import joblib
         return joblib.load(filepath)
 
 
+class _CategoryCodes:
+    """
+    Fitted LabelEncoder stand-in rebuilt from its classes_ (see from_tables).
+
+    Encodes known categories exactly like LabelEncoder.transform without
+    importing sklearn.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def transform(self, values):
+        return np.searchsorted(self.classes_, np.asarray(values, dtype=object))
+
+
 def prepare_data(df, preprocessor=None, fit=True):
     """
     Prepare data for training or prediction.
-    
+
     Args:
         df: DataFrame with features (and optionally target)
         preprocessor: Existing preprocessor or None to create new
         fit: Whether to fit the preprocessor
-    
+
     Returns:
         X, y (if target exists), preprocessor
     """
     if preprocessor is None:
         preprocessor = CreditDataPreprocessor()
-    
+
     if fit:
         result = preprocessor.fit_transform(df)
     else:
         result = preprocessor.transform(df)
-    
+
     # Check if result is tuple (X, y) or just X
     if isinstance(result, tuple):
         return result[0], result[1], preprocessor
@@ -136,14 +261,16 @@ def prepare_data(df, preprocessor=None, fit=True):
 
 
 if __name__ == "__main__":
+    import pandas as pd
+
     # Test preprocessing
     df = pd.read_csv('dataset.csv')
     print(f"Original shape: {df.shape}")
     print(f"Columns: {df.columns.tolist()}")
-    
+
     preprocessor = CreditDataPreprocessor()
     X, y, _ = prepare_data(df, preprocessor, fit=True)
-    
+
     print(f"\nProcessed shape: {X.shape}")
     print(f"Target distribution: {y.value_counts().to_dict()}")
     print(f"Feature columns: {preprocessor.feature_columns}")
@@ -0,0 +1,261 @@
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# 'pstats': cProfile call counts and per-function times of sampled jobs
+# 'stacks': wall-clock stack samples, as collapsed stacks for flamegraphs
+PROFILE_MODES = ('pstats', 'stacks')
+
+PROFILE_FORMATS = ('text', 'pstats', 'collapsed')
+
+
+class RequestProfiler:
+    """
+    Opt-in profiler for a sampled fraction of inference jobs.
+
+    Jobs are wrapped by maybe_wrap() before being handed to the inference
+    pool; with sample_rate 0 (the default) that is one attribute check and
+    the job runs untouched. A sampled job runs either under cProfile
+    (mode 'pstats'), whose statistics are aggregated over all sampled jobs,
+    or while a background thread records its Python stack every interval
+    seconds (mode 'stacks'), counted as collapsed stacks for flamegraph
+    tools. Either way the preprocessing, predict_proba and explanation
+    stages show up as the functions implementing them.
+
+    At most one job is profiled at a time: a sampled job that finds another
+    one being profiled runs unprofiled. This bounds the overhead under load
+    and is required by cProfile, which allows one active profiler per
+    process on recent Python versions.
+    """
+
+    def __init__(self, sample_rate=0.0, mode='pstats', interval=0.005):
+        self.sample_rate = 0.0
+        self.mode = 'pstats'
+        self.interval = interval
+        self.sampled = 0
+        self.started = time.time()
+
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._stats = None
+        self._stacks = Counter()
+        # (thread id, frame of _profiled) of the job being stack-sampled
+        self._active = None
+        self._sampler = None
+        self._stop = threading.Event()
+
+        self.configure(sample_rate, mode, interval)
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def configure(self, sample_rate, mode=None, interval=None):
+        """
+        Change the sampling settings.
+
+        Starting (sample_rate > 0) discards the profile collected so far;
+        stopping keeps it available for download, in the mode it was
+        collected in, so mode and interval only take effect when starting.
+
+        Args:
+            sample_rate: Fraction of jobs to profile, 0 (off) to 1
+            mode: 'pstats' or 'stacks' (default: unchanged)
+            interval: Seconds between stack samples (default: unchanged)
+
+        Raises:
+            ValueError: on a rate outside [0, 1], unknown mode or interval <= 0
+        """
+        mode = mode or self.mode
+        interval = interval or self.interval
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+
+        self._stop_sampler()
+        self.sample_rate = 0.0
+        if sample_rate > 0:
+            self.reset()
+            self.mode = mode
+            self.interval = interval
+            if mode == 'stacks':
+                self._start_sampler()
+        self.sample_rate = sample_rate
+
+    def reset(self):
+        """Discard the profile collected so far."""
+        with self._lock:
+            self._stats = None
+            self._stacks = Counter()
+            self.sampled = 0
+            self.started = time.time()
+
+    def maybe_wrap(self, fn):
+        """Return fn, or fn wrapped to be profiled if this job is sampled."""
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return fn
+        return functools.partial(self._profiled, fn)
+
+    def _profiled(self, fn, *args, **kwargs):
+        if not self._busy.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            if self.mode == 'pstats':
+                profile = cProfile.Profile()
+                try:
+                    return profile.runcall(fn, *args, **kwargs)
+                finally:
+                    self._add_profile(profile)
+            self._active = (threading.get_ident(), sys._getframe())
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._active = None
+                with self._lock:
+                    self.sampled += 1
+        finally:
+            self._busy.release()
+
+    def _add_profile(self, profile):
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.sampled += 1
+
+    def _start_sampler(self):
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample_stacks, args=(self._stop,), name='profile-sampler', daemon=True
+        )
+        self._sampler.start()
+
+    def _stop_sampler(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample_stacks(self, stop):
+        while not stop.wait(self.interval):
+            active = self._active
+            if active is None:
+                continue
+            thread_id, root = active
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            # Up to (not including) _profiled: the pool's own frames are noise
+            while frame is not None and frame is not root:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frame is root and stack:
+                with self._lock:
+                    self._stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Stack samples as 'outer;...;inner count' lines (flamegraph.pl, speedscope)."""
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def pstats_bytes(self):
+        """Aggregated cProfile statistics in the pstats file format, or b'' if none."""
+        with self._lock:
+            if self._stats is None:
+                return b''
+            return marshal.dumps(self._stats.stats)
+
+    def text(self, sort='cumulative', limit=50):
+        """The top functions of the aggregated cProfile statistics, as printed by pstats."""
+        with self._lock:
+            if self._stats is None:
+                return ''
+            stream = io.StringIO()
+            self._stats.stream = stream
+            self._stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def render(self, fmt):
+        """
+        Return the current profile in one of PROFILE_FORMATS.
+
+        Raises:
+            ValueError: on an unknown format, one the current mode does not
+                produce, or when nothing has been profiled yet
+        """
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format: {fmt} (expected one of {PROFILE_FORMATS})")
+        if fmt == 'collapsed':
+            if self.mode != 'stacks':
+                raise ValueError("Collapsed stacks are recorded in 'stacks' mode only")
+            body = self.collapsed()
+        elif self.mode != 'pstats':
+            raise ValueError(f"The {fmt} format is recorded in 'pstats' mode only")
+        else:
+            body = self.pstats_bytes() if fmt == 'pstats' else self.text()
+        if not body:
+            raise ValueError("No profile collected yet")
+        return body
+
+    def dump(self, directory):
+        """
+        Write the current profile to directory.
+
+        Returns:
+            Path of the written file (.pstats or .collapsed), or None if
+            there is no profile data
+        """
+        if not self.sampled:
+            return None
+        if self.mode == 'pstats':
+            data, suffix = self.pstats_bytes(), 'pstats'
+        else:
+            data, suffix = self.collapsed().encode(), 'collapsed'
+        if not data:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(directory, f"profile-{stamp}-{os.getpid()}.{suffix}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'mode': self.mode,
+            'interval_ms': self.interval * 1000,
+            'sampled_jobs': self.sampled,
+            'since': self.started
+        }
+
+
+def profiler_from_env():
+    """
+    Build a RequestProfiler configured by environment variables.
+
+    ML_PROFILE_SAMPLE_RATE: fraction of inference jobs to profile
+        (default 0, profiling off; POST /admin/profile changes it at run time)
+    ML_PROFILE_MODE: 'pstats' (default) or 'stacks'
+    ML_PROFILE_INTERVAL_MS: stack sampling interval in 'stacks' mode (default 5)
+    """
+    return RequestProfiler(
+        sample_rate=float(os.environ.get('ML_PROFILE_SAMPLE_RATE', '0')),
+        mode=os.environ.get('ML_PROFILE_MODE', 'pstats'),
+        interval=float(os.environ.get('ML_PROFILE_INTERVAL_MS', '5')) / 1000
+    )
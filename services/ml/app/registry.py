@@ -0,0 +1,348 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from .model import (
+        load_model, load_preprocessor, artifact_version, predict_batch, predict_proba,
+        predict_and_explain, explainer_cache, forest_cache, can_explain, sklearn_predict_proba
+    )
+    from .manifest import load_manifest_pair
+except ImportError:
+    from model import (
+        load_model, load_preprocessor, artifact_version, predict_batch, predict_proba,
+        predict_and_explain, explainer_cache, forest_cache, can_explain, sklearn_predict_proba
+    )
+    from manifest import load_manifest_pair
+
+
+# Registry states, in start-up order; only 'ready' accepts traffic
+STATES = ('starting', 'loading', 'warming', 'ready', 'failed')
+
+# Scored once at load time so lazy allocations happen before real traffic
+WARMUP_APPLICATION = {
+    'Age': 35,
+    'Sex': 'male',
+    'Job': 2,
+    'Housing': 'own',
+    'Saving accounts': 'moderate',
+    'Checking account': 'little',
+    'Credit amount': 5000.0,
+    'Duration': 24,
+    'Purpose': 'car'
+}
+
+# The model pair being served and the content hash identifying it
+ModelBundle = namedtuple('ModelBundle', ['model', 'preprocessor', 'version'])
+
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when the model pair is not loaded and cannot be loaded now."""
+
+
+def load_pair(model_path, preprocessor_path, manifest_path=None):
+    """
+    Load a model pair and its version the way ModelRegistry serves it.
+
+    With manifest_path the pair is the one the manifest lists, verified
+    against its hashes and versioned by the manifest's hash; otherwise the
+    two paths are loaded and versioned by their contents.
+
+    Returns:
+        (model, preprocessor, version)
+    """
+    if manifest_path is not None:
+        model, preprocessor, version, _ = load_manifest_pair(manifest_path)
+        return model, preprocessor, version
+    version = artifact_version(model_path, preprocessor_path)
+    return load_model(model_path), load_preprocessor(preprocessor_path), version
+
+
+class ModelRegistry:
+    """
+    Single owner of the served model and preprocessor.
+
+    The pair is loaded exactly once, under a lock: concurrent callers of
+    get() during a cold start wait for the one load in progress instead of
+    each deserializing the artifacts. A load runs a warm-up inference (and
+    builds the SHAP explainer) before the bundle is published, so 'ready'
+    means the first real request pays no lazy start-up cost.
+
+    Readiness is distinct from liveness: the process is alive as soon as it
+    serves HTTP, but ready only once state is 'ready'. After a failed load
+    further attempts are made at most every retry_interval seconds.
+
+    reload() loads a new pair while the current one keeps serving, checks
+    it with a smoke prediction, warms it up and then swaps it in with a
+    single assignment; requests that already hold the old bundle finish
+    on it.
+
+    If manifest_path is given, the pair is the one the manifest lists,
+    verified against its hashes, and the bundle version is the manifest's
+    hash; model_path and preprocessor_path are then ignored. Otherwise they
+    are loaded directly.
+    """
+
+    def __init__(self, model_path, preprocessor_path, on_load=None, retry_interval=5.0,
+                 manifest_path=None):
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.manifest_path = manifest_path
+        self.on_load = on_load
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._bundle = None
+        self.state = 'starting'
+        self.error = None
+        self.loads = 0
+        self.reload_error = None
+        self.failed_at = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+
+    @property
+    def ready(self):
+        """True once a bundle is loaded and warmed up."""
+        return self._bundle is not None
+
+    @property
+    def bundle(self):
+        """The current bundle, or None if nothing is loaded yet."""
+        return self._bundle
+
+    def get(self):
+        """
+        Return the served bundle, loading it first if needed.
+
+        Raises:
+            ModelNotReadyError: if the load fails or failed too recently to retry
+        """
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+
+        with self._lock:
+            if self._bundle is None:
+                if self.failed_at is not None and time.monotonic() - self.failed_at < self.retry_interval:
+                    raise ModelNotReadyError(self.error)
+                self._load()
+            return self._bundle
+
+    def reload(self):
+        """
+        Load the pair from disk again and swap it in if its files changed.
+
+        The current bundle keeps serving until the new one has passed the
+        smoke test and been warmed up; if anything fails it stays in place.
+
+        Returns:
+            True if a new version was published, False if the files are unchanged
+
+        Raises:
+            ModelNotReadyError: if the new pair cannot be loaded or fails the smoke test
+        """
+        if self._bundle is None:
+            # Nothing served yet: this is a cold start, not a swap
+            self.get()
+            return True
+
+        with self._reload_lock:
+            try:
+                if self._bundle.version == self.current_file_version():
+                    return False
+                bundle = self._build()
+            except Exception as e:
+                self.reload_error = f"{type(e).__name__}: {e}"
+                raise ModelNotReadyError(self.reload_error) from e
+            with self._lock:
+                self._publish(bundle)
+            self.reload_error = None
+            return True
+
+    @property
+    def uses_manifest(self):
+        """True if the pair is loaded through a manifest."""
+        return self.manifest_path is not None
+
+    def watched_paths(self):
+        """Files whose change means a new version is on disk."""
+        if self.uses_manifest:
+            # Rewritten last by app.train and app.compact, after the pair it lists
+            return [self.manifest_path]
+        return [self.model_path, self.preprocessor_path]
+
+    def current_file_version(self):
+        """Content hash of the manifest, or of the artifact files without one."""
+        if self.uses_manifest:
+            return artifact_version(self.manifest_path)
+        return artifact_version(self.model_path, self.preprocessor_path)
+
+    def _build(self):
+        """Load, smoke-test and warm up a bundle from the artifact files."""
+        started = time.monotonic()
+        bundle = ModelBundle(*load_pair(self.model_path, self.preprocessor_path, self.manifest_path))
+        self.load_seconds = time.monotonic() - started
+
+        if self._bundle is None:
+            self.state = 'warming'
+        warmup_started = time.monotonic()
+        smoke_test(bundle)
+        warm_up(bundle)
+        self.warmup_seconds = time.monotonic() - warmup_started
+        return bundle
+
+    def _load(self):
+        """Load and publish the first bundle. Caller holds the lock."""
+        self.state = 'loading'
+        try:
+            bundle = self._build()
+        except Exception as e:
+            self.state = 'failed'
+            self.error = f"{type(e).__name__}: {e}"
+            self.failed_at = time.monotonic()
+            raise ModelNotReadyError(self.error) from e
+        self._publish(bundle)
+        return bundle
+
+    def _publish(self, bundle):
+        """Swap bundle in as the served one. Caller holds the lock."""
+        previous = self._bundle
+        if self.on_load is not None:
+            self.on_load(bundle)
+        self._bundle = bundle
+        if previous is not None:
+            explainer_cache.invalidate(previous.model)
+            forest_cache.invalidate(previous.model)
+        self.loads += 1
+        self.state = 'ready'
+        self.error = None
+        self.failed_at = None
+
+    def status(self):
+        """Return the readiness state and load timings."""
+        bundle = self._bundle
+        return {
+            'state': self.state,
+            'ready': bundle is not None,
+            'model_version': bundle.version if bundle is not None else None,
+            'manifest': self.manifest_path if self.uses_manifest else None,
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'error': self.error,
+            'reload_error': self.reload_error
+        }
+
+
+def smoke_test(bundle):
+    """
+    Check that a freshly loaded pair fits together and scores sanely.
+
+    Raises:
+        ValueError: if the preprocessor output does not match the model,
+            the predicted probabilities are invalid or the compiled forest
+            disagrees with the model
+    """
+    model, preprocessor = bundle.model, bundle.preprocessor
+    n_features = getattr(model, 'n_features_in_', None)
+    columns = getattr(preprocessor, 'feature_columns', None)
+    if n_features is not None and columns is not None and len(columns) != n_features:
+        raise ValueError(
+            f"Preprocessor produces {len(columns)} features, model expects {n_features}"
+        )
+
+    X = preprocessor.transform_records([WARMUP_APPLICATION])
+    probabilities = sklearn_predict_proba(model, X)
+    if probabilities.shape != (1, 2):
+        raise ValueError(f"Expected probabilities of 2 classes, got shape {probabilities.shape}")
+    if not (np.all(np.isfinite(probabilities)) and np.all(probabilities >= 0)
+            and abs(probabilities.sum() - 1.0) < 1e-6):
+        raise ValueError(f"Invalid probabilities from smoke prediction: {probabilities[0]}")
+    served = predict_proba(model, X)
+    if np.abs(served - probabilities).max() > 1e-9:
+        raise ValueError("Compiled forest disagrees with the model's predict_proba")
+
+
+def warm_up(bundle):
+    """Run one prediction (and explanation, if possible) through a bundle."""
+    predict_batch(bundle.model, bundle.preprocessor, [WARMUP_APPLICATION])
+    if can_explain(bundle.model):
+        # Builds and caches the explainer for this model
+        predict_and_explain(bundle.model, bundle.preprocessor, WARMUP_APPLICATION)
+
+
+class ModelFileWatcher:
+    """
+    Poll the artifact files and reload the registry when they change.
+
+    A change is acted on only once the files' size and modification time
+    have stayed the same for one more poll, so a pair that is still being
+    copied into place is not loaded half-written.
+    """
+
+    def __init__(self, registry, interval=5.0):
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = self._stat()
+
+    def _stat(self):
+        stats = []
+        for path in self.registry.watched_paths():
+            try:
+                st = os.stat(path)
+                stats.append((st.st_size, st.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+    def poll(self):
+        """Check the files once; return True if a new version was swapped in."""
+        current = self._stat()
+        if current == self._seen or None in current:
+            return False
+        time.sleep(min(self.interval, 1.0))
+        if self._stat() != current:
+            return False  # still being written; look again next poll
+        self._seen = current
+        try:
+            reloaded = self.registry.reload()
+        except ModelNotReadyError as e:
+            print(f"WARNING: Model reload failed, keeping current version: {e}")
+            return False
+        if reloaded:
+            print(f"OK: Reloaded models (version {self.registry.bundle.version})")
+        return reloaded
+
+    def start(self):
+        """Start polling in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        """Stop polling."""
+        self._stop.set()
+
+
+def watcher_from_env(registry):
+    """
+    Build the model file watcher configured by environment variables.
+
+    ML_MODEL_WATCH_INTERVAL: seconds between polls of the model files
+        (default 0: no watching, reload through the admin endpoint only)
+
+    Returns None when watching is disabled.
+    """
+    interval = float(os.environ.get('ML_MODEL_WATCH_INTERVAL', '0'))
+    if interval <= 0:
+        return None
+    return ModelFileWatcher(registry, interval)
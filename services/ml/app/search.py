@@ -0,0 +1,224 @@
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+try:
+    from .model import compile_forest
+    from .threads import limit_threads
+except ImportError:
+    from model import compile_forest
+    from threads import limit_threads
+
+
+# Default spaces of the model types of train_credit_scoring_model: lists
+# are searched as a grid, or sampled from (as are scipy.stats
+# distributions) when a number of candidates is given
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [6, 10, 14, None],
+        'min_samples_split': [2, 10, 20],
+        'min_samples_leaf': [1, 5, 10],
+        'max_features': ['sqrt', 0.5]
+    },
+    'logistic_regression': {
+        'C': [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0],
+        'class_weight': [None, 'balanced']
+    }
+}
+
+LEADERBOARD_COLUMNS = [
+    'rank', 'model', 'params', 'round', 'n_resources', 'mean_score', 'std_score',
+    'fit_seconds', 'latency_1_row_ms', 'latency_per_row_us'
+]
+
+# Shared training data of a worker process, memory-mapped by _init_worker
+_worker_data = None
+
+
+def candidate_params(space, n_candidates=None, random_state=None):
+    """All combinations of space, or n_candidates random draws from it."""
+    if n_candidates is None:
+        return list(ParameterGrid(space))
+    return list(ParameterSampler(space, n_candidates, random_state=random_state))
+
+
+def serving_latency(model, X, repeats=20):
+    """
+    Prediction latency of model as the service would run it.
+
+    Tree ensembles are timed as the FlatForest they are served as (see
+    app/model.py), other models through their own predict_proba.
+
+    Returns:
+        (median milliseconds for one row, microseconds per row for all of X)
+    """
+    predict = (compile_forest(model) or model).predict_proba
+    row = X[:1]
+    predict(row)
+    single = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    predict(X)
+    batch = time.perf_counter() - start
+    return float(np.median(single)) * 1e3, batch / len(X) * 1e6
+
+
+def _init_worker(x_path, y_path):
+    """Map the shared training data once in a worker process."""
+    global _worker_data
+    limit_threads(1)
+    _worker_data = (np.load(x_path, mmap_mode='r'), np.load(y_path, mmap_mode='r'))
+
+
+def round_folds(y, n_resources, cv, random_state):
+    """
+    Train/test row indices of the folds of a round on n_resources rows.
+
+    The subsample is a prefix of one seeded permutation, so each round's
+    rows include the previous round's.
+    """
+    rows = np.random.default_rng(random_state).permutation(len(y))
+    subset = np.sort(rows[:n_resources])
+    splitter = StratifiedKFold(cv, shuffle=True, random_state=random_state)
+    return [(subset[train], subset[test]) for train, test in splitter.split(subset, y[subset])]
+
+
+@lru_cache(maxsize=2)
+def _worker_folds(n_resources, cv, random_state):
+    return round_folds(_worker_data[1], n_resources, cv, random_state)
+
+
+def _fit_and_score(estimator, params, n_resources, fold, cv, random_state, scoring, latency_repeats):
+    """Fit one candidate on one fold; return score, fit time and, if asked, latency."""
+    X, y = _worker_data
+    # Derived here from the shared y, rather than pickling row indices into every task
+    train, test = _worker_folds(n_resources, cv, random_state)[fold]
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+    score = get_scorer(scoring)(model, X[test], y[test])
+    latency = serving_latency(model, X[test], latency_repeats) if latency_repeats else None
+    return score, fit_seconds, latency
+
+
+def successive_halving(estimator, space, X, y, n_candidates=None, factor=3, min_resources=None,
+                       cv=5, scoring='roc_auc', workers=None, random_state=42, latency_repeats=20):
+    """
+    Search hyperparameters of estimator by successive halving.
+
+    Every round cross-validates the remaining candidates on a subsample of
+    the rows, keeps the best 1/factor of them and multiplies the subsample
+    by factor; the last round uses all rows. All fits of a round (every
+    candidate on every fold) run in parallel on a process pool of
+    single-threaded workers. X and y are written once to .npy files that
+    the workers memory-map read-only, so they share one copy through the
+    page cache instead of each task pickling its own.
+
+    Args:
+        estimator: Unfitted estimator; candidates are clones with their params set
+        space: Parameter lists (or distributions) by name
+        X, y: Training data
+        n_candidates: Random candidates to draw from space (None: the full grid)
+        factor: Fraction of candidates kept (1/factor) and growth of the
+            subsample per round
+        min_resources: Rows of the first round (default: enough for the
+            rounds to end on all rows)
+        cv: Number of stratified folds
+        scoring: sklearn scorer name; higher is better
+        workers: Worker processes (default: CPU count)
+        random_state: Seed of the subsamples, folds and random candidates
+        latency_repeats: One-row predictions timed per candidate and round
+            (on its first fold); 0 skips the latency columns
+
+    Returns:
+        (best_params, leaderboard): the leaderboard has one row per
+        candidate, scored in the last round it reached, best first
+
+    Raises:
+        ValueError: on a factor below 2, or a space without candidates
+    """
+    if factor < 2:
+        raise ValueError(f"factor must be at least 2, got {factor}")
+    X = np.ascontiguousarray(X)
+    y = np.asarray(y)
+    candidates = candidate_params(space, n_candidates, random_state)
+    if not candidates:
+        raise ValueError("The search space has no candidates")
+
+    n_rounds = 1 + int(math.log(len(candidates), factor) + 1e-9) if len(candidates) > 1 else 1
+    if min_resources is None:
+        min_resources = max(2 * cv * len(np.unique(y)), len(y) // factor ** (n_rounds - 1))
+    results = {}
+    remaining = list(range(len(candidates)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_path, y_path = os.path.join(tmp, 'X.npy'), os.path.join(tmp, 'y.npy')
+        np.save(x_path, X)
+        np.save(y_path, y)
+        with ProcessPoolExecutor(
+            workers or os.cpu_count() or 1, initializer=_init_worker, initargs=(x_path, y_path)
+        ) as pool:
+            for round_index in range(n_rounds):
+                last = round_index == n_rounds - 1
+                n_resources = len(y) if last else min(len(y), min_resources * factor ** round_index)
+                jobs = {
+                    c: [
+                        pool.submit(
+                            _fit_and_score, estimator, candidates[c], n_resources, fold, cv,
+                            random_state, scoring, latency_repeats if fold == 0 else 0
+                        )
+                        for fold in range(cv)
+                    ]
+                    for c in remaining
+                }
+                for c, futures in jobs.items():
+                    scores, fit_seconds, latencies = zip(*(f.result() for f in futures))
+                    latency = latencies[0] or (None, None)
+                    results[c] = {
+                        'model': type(estimator).__name__,
+                        'params': json.dumps(candidates[c], sort_keys=True, default=str),
+                        'round': round_index,
+                        'n_resources': n_resources,
+                        'mean_score': float(np.mean(scores)),
+                        'std_score': float(np.std(scores)),
+                        'fit_seconds': float(np.mean(fit_seconds)),
+                        'latency_1_row_ms': latency[0],
+                        'latency_per_row_us': latency[1]
+                    }
+                print(f"   ✓ Round {round_index + 1}/{n_rounds}: {len(remaining)} candidate(s) "
+                      f"on {n_resources} rows, best {scoring} "
+                      f"{max(results[c]['mean_score'] for c in remaining):.4f}")
+
+                if not last:
+                    n_keep = max(1, math.ceil(len(remaining) / factor))
+                    remaining = sorted(remaining, key=lambda c: -results[c]['mean_score'])[:n_keep]
+
+    order = sorted(results, key=lambda c: (-results[c]['round'], -results[c]['mean_score']))
+    leaderboard = pd.DataFrame([results[c] for c in order])
+    leaderboard.insert(0, 'rank', range(1, len(order) + 1))
+    return candidates[order[0]], leaderboard[LEADERBOARD_COLUMNS]
+
+
+def write_leaderboard(leaderboard, path):
+    """Write the leaderboard to a CSV file, atomically."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, staging = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', newline='') as f:
+        leaderboard.to_csv(f, index=False)
+    os.replace(staging, path)
@@ -0,0 +1,124 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+try:
+    from .threads import limit_threads
+except ImportError:
+    from threads import limit_threads
+
+
+# Seconds to wait before replacing a worker that died
+RESTART_DELAY = 1.0
+
+
+def serve(app, registry, host='0.0.0.0', port=8000, workers=None, threads_per_worker=1):
+    """
+    Serve app from pre-forked worker processes sharing one listening socket.
+
+    The model pair is loaded and warmed up once, in this process, before
+    forking: workers start with it already in memory and share its pages
+    copy-on-write (or, for an artifact directory, through the page cache)
+    instead of each loading a copy. Each worker runs its own event loop
+    and inference pool, so Python-heavy preprocessing scales across cores
+    instead of being serialized by one interpreter's GIL; BLAS/OpenMP
+    threads are capped at threads_per_worker so workers do not
+    oversubscribe the cores.
+
+    A worker that dies is replaced; SIGTERM or SIGINT stops all of them.
+
+    Args:
+        app: The ASGI application
+        registry: Its ModelRegistry
+        host, port: Address to listen on
+        workers: Number of worker processes (default: CPU count)
+        threads_per_worker: BLAS/OpenMP threads per worker
+
+    Raises:
+        ModelNotReadyError: if the model pair cannot be loaded
+    """
+    import uvicorn
+
+    workers = workers or os.cpu_count() or 1
+    limit_threads(threads_per_worker)
+    bundle = registry.get()
+    print(f"OK: Models loaded (version {bundle.version}), starting {workers} workers")
+
+    # Objects allocated so far are never collected: without this, garbage
+    # collections in the workers write to them and un-share their pages
+    gc.collect()
+    gc.freeze()
+
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            server = uvicorn.Server(uvicorn.Config(app, log_level='info'))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"WARNING: Worker {pid} exited with status {status}, starting a new one")
+            time.sleep(RESTART_DELAY)
+            if not stopping:
+                spawn()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the ML service with pre-forked workers sharing one loaded model"
+    )
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('ML_SERVER_WORKERS', '0')) or None,
+                        help='worker processes (default: ML_SERVER_WORKERS, else CPU count)')
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                        help='BLAS/OpenMP threads per worker')
+    args = parser.parse_args()
+
+    # Before main imports NumPy, so its BLAS starts with the capped pool
+    limit_threads(args.threads_per_worker)
+    import main as service
+
+    serve(service.app, service.registry, args.host, args.port, args.workers, args.threads_per_worker)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import os
+
+
+# Thread pools of the numerical libraries, capped per worker process
+THREAD_LIMIT_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+)
+
+
+def limit_threads(n_threads=1):
+    """
+    Cap the BLAS/OpenMP threads of this process and of processes it forks.
+
+    The environment variables only take effect for libraries loaded after
+    they are set; threadpoolctl, when installed, also resizes the pools of
+    libraries that are already loaded.
+    """
+    for var in THREAD_LIMIT_VARS:
+        os.environ[var] = str(n_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(n_threads)
@@ -1,5 +1,8 @@
+import argparse
+import json
 import pandas as pd
 import numpy as np
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
@@ -10,45 +13,72 @@ from sklearn.metrics import (
 import joblib
 try:
     from .preprocessing import CreditDataPreprocessor, prepare_data
+    from .manifest import write_manifest
+    from .search import SEARCH_SPACES, successive_halving, write_leaderboard
 except ImportError:
     from preprocessing import CreditDataPreprocessor, prepare_data
+    from manifest import write_manifest
+    from search import SEARCH_SPACES, successive_halving, write_leaderboard
 import os
+import time
 
 
 def train_credit_scoring_model(
     data_path='dataset.csv',
     model_type='random_forest',
     test_size=0.2,
-    random_state=42
+    random_state=42,
+    decision_threshold=0.5,
+    legacy_encoder=None,
+    search=False,
+    search_space=None,
+    n_candidates=None,
+    search_factor=3,
+    search_workers=None,
+    leaderboard_path='models/leaderboard.csv'
 ):
     """
     Train credit scoring model with comprehensive evaluation.
-    
+
     Args:
         data_path: Path to dataset CSV
         model_type: 'random_forest' or 'logistic_regression'
         test_size: Proportion of data for testing
         random_state: Random seed for reproducibility
-    
+        decision_threshold: P(approved) above which an applicant is approved;
+            stored on the model as decision_threshold_ for serving
+        legacy_encoder: Also write models/encoder.joblib, a copy of the
+            preprocessor for old clients (default: ML_WRITE_LEGACY_ENCODER=1)
+        search: Choose the model's hyperparameters by a successive-halving
+            search on the training set (see app/search.py) instead of
+            using the fixed configuration
+        search_space: Parameter lists or distributions to search
+            (default: SEARCH_SPACES[model_type])
+        n_candidates: Random candidates to draw (default: the full grid)
+        search_factor: Candidates kept per round (1/factor) and growth of
+            the rows they are trained on
+        search_workers: Worker processes of the search (default: CPU count)
+        leaderboard_path: CSV file the search leaderboard is written to
+
     Returns:
         model, preprocessor, metrics
     """
     print("=" * 60)
     print("CREDIT SCORING MODEL TRAINING")
     print("=" * 60)
-    
+
     # Load data
     print(f"\n1. Loading data from {data_path}...")
     df = pd.read_csv(data_path)
     print(f"   ✓ Loaded {len(df)} records with {len(df.columns)} columns")
-    
+
     # Preprocess data
     print("\n2. Preprocessing data...")
     preprocessor = CreditDataPreprocessor()
     X, y, preprocessor = prepare_data(df, preprocessor, fit=True)
     print(f"   ✓ Preprocessed features shape: {X.shape}")
     print(f"   ✓ Target distribution: {dict(zip(*np.unique(y, return_counts=True)))}")
-    
+
     # Split data
     print("\n3. Splitting data...")
     X_train, X_test, y_train, y_test = train_test_split(
@@ -56,7 +86,7 @@ def train_credit_scoring_model(
     )
     print(f"   ✓ Training set: {len(X_train)} samples")
     print(f"   ✓ Test set: {len(X_test)} samples")
-    
+
     # Initialize model
     print(f"\n4. Training {model_type} model...")
     if model_type == 'random_forest':
@@ -76,21 +106,40 @@ def train_credit_scoring_model(
         )
     else:
         raise ValueError(f"Unknown model_type: {model_type}")
-    
+
+    if search:
+        print("   Searching hyperparameters (successive halving)...")
+        start = time.perf_counter()
+        best_params, leaderboard = successive_halving(
+            clone(model).set_params(n_jobs=1),
+            search_space or SEARCH_SPACES[model_type],
+            X_train, y_train,
+            n_candidates=n_candidates,
+            factor=search_factor,
+            workers=search_workers,
+            random_state=random_state
+        )
+        write_leaderboard(leaderboard, leaderboard_path)
+        print(f"   ✓ Searched {len(leaderboard)} candidates in {time.perf_counter() - start:.1f} s, "
+              f"leaderboard saved to {leaderboard_path}")
+        print(f"   ✓ Best parameters: {json.dumps(best_params, default=str)}")
+        model.set_params(**best_params)
+
     # Train model
     model.fit(X_train, y_train)
+    model.decision_threshold_ = decision_threshold
     print("   ✓ Model training complete")
-    
+
     # Cross-validation
     print("\n5. Cross-validation (5-fold)...")
     cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='roc_auc')
     print(f"   ✓ CV ROC-AUC: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
-    
+
     # Predictions
     print("\n6. Evaluating model...")
-    y_pred = model.predict(X_test)
     y_pred_proba = model.predict_proba(X_test)[:, 1]
-    
+    y_pred = (y_pred_proba > decision_threshold).astype(int)
+
     # Calculate metrics
     metrics = {
         'accuracy': accuracy_score(y_test, y_pred),
@@ -101,19 +150,19 @@ def train_credit_scoring_model(
         'cv_roc_auc_mean': cv_scores.mean(),
         'cv_roc_auc_std': cv_scores.std()
     }
-    
+
     # Print metrics
     print("\n" + "=" * 60)
     print("MODEL PERFORMANCE METRICS")
     print("=" * 60)
     for metric, value in metrics.items():
         print(f"   {metric.upper()}: {value:.4f}")
-    
+
     print("\n" + "-" * 60)
     print("CLASSIFICATION REPORT")
     print("-" * 60)
     print(classification_report(y_test, y_pred, target_names=['Rejected (0)', 'Approved (1)']))
-    
+
     print("-" * 60)
     print("CONFUSION MATRIX")
     print("-" * 60)
@@ -122,7 +171,7 @@ def train_credit_scoring_model(
     print(f"              Rej (0)  App (1)")
     print(f"Actual Rej (0)  {cm[0][0]:4d}    {cm[0][1]:4d}")
     print(f"       App (1)  {cm[1][0]:4d}    {cm[1][1]:4d}")
-    
+
     # Feature importance (for tree-based models)
     if hasattr(model, 'feature_importances_'):
         print("\n" + "-" * 60)
@@ -132,37 +181,75 @@ def train_credit_scoring_model(
             'feature': preprocessor.feature_columns,
             'importance': model.feature_importances_
         }).sort_values('importance', ascending=False)
-        
+
         for idx, row in feature_importance.head(5).iterrows():
             print(f"   {row['feature']:20s}: {row['importance']:.4f}")
-    
+
     # Save models
     print("\n7. Saving models...")
     os.makedirs('models', exist_ok=True)
-    
-    model_path = f'models/model.joblib'
-    preprocessor_path = f'models/preprocessor.joblib'
-    encoder_path = f'models/encoder.joblib'  # Legacy compatibility
-    
-    joblib.dump(model, model_path)
-    joblib.dump(preprocessor, preprocessor_path)
-    joblib.dump(preprocessor, encoder_path)  # Save as encoder for backward compatibility
-    
-    print(f"   ✓ Model saved to {model_path}")
-    print(f"   ✓ Preprocessor saved to {preprocessor_path}")
-    
+
+    if legacy_encoder is None:
+        legacy_encoder = os.environ.get('ML_WRITE_LEGACY_ENCODER') == '1'
+
+    artifacts = {'model': 'model.joblib', 'preprocessor': 'preprocessor.joblib'}
+    joblib.dump(model, 'models/model.joblib')
+    joblib.dump(preprocessor, 'models/preprocessor.joblib')
+    if legacy_encoder:
+        artifacts['encoder'] = 'encoder.joblib'
+        joblib.dump(preprocessor, 'models/encoder.joblib')
+
+    # Written last: it ties the pair together, so the service only picks
+    # up the new files once their hashes are recorded here
+    write_manifest('models', artifacts, preprocessor, model=model, metrics=metrics)
+
+    for role, name in artifacts.items():
+        print(f"   ✓ {role.capitalize()} saved to models/{name}")
+    print("   ✓ Manifest saved to models/manifest.json")
+
     print("\n" + "=" * 60)
     print("✓ TRAINING COMPLETE")
     print("=" * 60)
-    
+
     return model, preprocessor, metrics
 
 
-if __name__ == "__main__":
-    # Train Random Forest model
-    model, preprocessor, metrics = train_credit_scoring_model(
-        model_type='random_forest'
+def main():
+    parser = argparse.ArgumentParser(description="Train the credit scoring model")
+    parser.add_argument('--data', default='dataset.csv', help='training dataset CSV')
+    parser.add_argument('--model-type', default='random_forest',
+                        choices=['random_forest', 'logistic_regression'])
+    parser.add_argument('--search', action='store_true',
+                        help='choose hyperparameters by successive halving')
+    parser.add_argument('--space', default=None,
+                        help='JSON file of parameter lists to search (default: built-in space)')
+    parser.add_argument('--n-candidates', type=int, default=None,
+                        help='random candidates to draw (default: the full grid)')
+    parser.add_argument('--factor', type=int, default=3, help='halving factor (at least 2)')
+    parser.add_argument('--workers', type=int, default=None, help='search worker processes')
+    parser.add_argument('--leaderboard', default='models/leaderboard.csv')
+    args = parser.parse_args()
+
+    search_space = None
+    if args.space:
+        with open(args.space) as f:
+            search_space = json.load(f)
+
+    return train_credit_scoring_model(
+        data_path=args.data,
+        model_type=args.model_type,
+        search=args.search,
+        search_space=search_space,
+        n_candidates=args.n_candidates,
+        search_factor=args.factor,
+        search_workers=args.workers,
+        leaderboard_path=args.leaderboard
     )
-    
+
+
+if __name__ == "__main__":
+    # Train Random Forest model (or --model-type), optionally searching its hyperparameters
+    model, preprocessor, metrics = main()
+
     print("\n✓ All models trained and saved successfully!")
 
@@ -0,0 +1,220 @@
+import numpy as np
+
+
+# Upper bound on the size of the (rows, leaves, slots, nodes) work arrays
+CHUNK_BUDGET_BYTES = 8 * 1024 * 1024
+
+
+def is_supported(model):
+    """Return True if TreeShapExplainer can explain this model."""
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        return hasattr(model, 'tree_')
+    return (
+        isinstance(estimators, list)
+        and len(estimators) > 0
+        and all(hasattr(est, 'tree_') for est in estimators)
+    )
+
+
+class TreeShapExplainer:
+    """
+    Exact path-dependent TreeSHAP for scikit-learn tree ensembles.
+
+    Works directly on the fitted tree_ arrays (children, feature, threshold,
+    value, weighted_n_node_samples) of a RandomForest, ExtraTrees or single
+    decision tree, so shap is not needed. Every root-to-leaf path of every
+    tree is compiled once into padded arrays, grouped by the number of
+    distinct features on the path; explaining rows is then a fixed number of
+    NumPy operations per group over all leaves of the forest at once.
+
+    Mirrors the part of shap.TreeExplainer used by app.model:
+    expected_value and shap_values(X).
+    """
+
+    def __init__(self, model):
+        if not is_supported(model):
+            raise TypeError(f"TreeSHAP needs a tree-based model, got {type(model).__name__}")
+
+        estimators = getattr(model, 'estimators_', None) or [model]
+        is_classifier = hasattr(model, 'classes_')
+        self.n_features = int(getattr(model, 'n_features_in_', estimators[0].tree_.n_features))
+
+        # Split nodes of all trees, numbered consecutively tree after tree
+        trees = [estimator.tree_ for estimator in estimators]
+        self._node_feature = np.concatenate([np.maximum(tree.feature, 0) for tree in trees])
+        self._node_threshold = np.concatenate([tree.threshold for tree in trees])
+        self._node_missing_left = np.concatenate([tree.missing_go_to_left.astype(bool) for tree in trees])
+
+        paths = []
+        offset = 0
+        for tree in trees:
+            paths.extend(_leaf_paths(tree, offset, is_classifier, len(trees)))
+            offset += tree.node_count
+
+        # E[f(x)] = sum of leaf values weighted by the fraction of training
+        # samples reaching each leaf
+        expected = sum(p['value'] * np.prod(p['slot_zero']) for p in paths)
+        self.expected_value = expected if is_classifier else float(expected[0])
+        self.n_outputs = len(paths[0]['value'])
+
+        by_width = {}
+        for path in paths:
+            if path['slot_feature']:
+                by_width.setdefault(len(path['slot_feature']), []).append(path)
+        self._groups = [_PathGroup(group, self.n_features) for _, group in sorted(by_width.items())]
+
+    def shap_values(self, X):
+        """
+        Compute SHAP values for rows of X.
+
+        Args:
+            X: Feature matrix (numpy array or DataFrame), n_samples x n_features
+
+        Returns:
+            Array of shape (n_samples, n_features, n_classes) for classifiers,
+            (n_samples, n_features) for regressors
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        values = np.zeros((X.shape[0], self.n_features, self.n_outputs))
+        row_bytes = max([group.row_bytes for group in self._groups], default=1)
+        chunk = max(1, CHUNK_BUDGET_BYTES // row_bytes)
+        for start in range(0, X.shape[0], chunk):
+            rows = X[start:start + chunk]
+            # Evaluate every split once; groups look their edges up here
+            x = rows[:, self._node_feature]
+            goes_left = np.where(np.isnan(x), self._node_missing_left, x <= self._node_threshold)
+            for group in self._groups:
+                values[start:start + chunk] += group.shap_values(goes_left)
+
+        if isinstance(self.expected_value, float):
+            return values[:, :, 0]
+        return values
+
+
+class _PathGroup:
+    """
+    Leaf paths with the same number D of distinct features, as arrays.
+
+    Arrays keep the leaf axis last so that every NumPy operation runs its
+    inner loop over all leaves of the group rather than over a handful of
+    slots. Edges are sorted by (slot, leaf) so the edges of each slot of
+    each leaf form one contiguous segment.
+    """
+
+    def __init__(self, paths, n_features):
+        n_leaves = len(paths)
+        D = len(paths[0]['slot_feature'])
+
+        edges = sorted(
+            (slot, leaf, node, left)
+            for leaf, path in enumerate(paths)
+            for node, left, slot in path['edges']
+        )
+        self.edge_node = np.array([edge[2] for edge in edges], dtype=np.intp)
+        self.edge_left = np.array([edge[3] for edge in edges], dtype=bool)
+        segment = np.array([edge[0] * n_leaves + edge[1] for edge in edges])
+        self.segment_start = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+
+        slot_feature = np.array([p['slot_feature'] for p in paths]).T
+        self.zero = np.array([p['slot_zero'] for p in paths]).T[:, None, :]
+        value = np.stack([p['value'] for p in paths])
+
+        # Shapley weights |S|! (D - |S| - 1)! / D! equal the integral over
+        # [0, 1] of t^|S| (1 - t)^(D - |S| - 1), so a slot's weighted sum over
+        # coalitions is the integral of a degree D - 1 polynomial in t, which
+        # Gauss-Legendre quadrature with ceil(D / 2) nodes computes exactly
+        nodes, weights = np.polynomial.legendre.leggauss((D + 1) // 2)
+        self.nodes = (nodes + 1.0) / 2.0
+        self.weights = weights / 2.0
+        # Factor of slot j at node t: z_j (1 - t) if the row leaves the path
+        # at j (o_j = 0), z_j (1 - t) + t if it follows it (o_j = 1)
+        self.factor_off = [self.zero * (1.0 - t) for t in self.nodes]
+
+        # Maps each slot's per-leaf contributions to (feature, output),
+        # scaled by the leaf values
+        n_outputs = value.shape[1]
+        scatter = np.zeros((D, n_leaves, n_features, n_outputs))
+        leaves = np.arange(n_leaves)
+        for d in range(D):
+            scatter[d, leaves, slot_feature[d]] = value
+        self.scatter = scatter.reshape(D, n_leaves, n_features * n_outputs)
+        self.n_features = n_features
+        self.n_outputs = n_outputs
+
+        self.row_bytes = 8 * (len(edges) + 4 * D * n_leaves)
+
+    def shap_values(self, goes_left):
+        n_rows = goes_left.shape[0]
+        D = self.zero.shape[0]
+
+        # o[j, r, l] = True if row r follows every edge of slot j on leaf l's path
+        off_path = goes_left[:, self.edge_node] != self.edge_left
+        off_path = np.logical_or.reduceat(off_path, self.segment_start, axis=1)
+        o = ~off_path.reshape(n_rows, D, -1).transpose(1, 0, 2)
+
+        # phi_j = (o_j - z_j) * integral over [0, 1] of the product of the
+        # other slots' factors, evaluated at each quadrature node as the
+        # full product divided by factor j (factors are > 0 inside (0, 1)
+        # because every zero fraction is positive)
+        integral = np.zeros(o.shape)
+        factors = np.empty(o.shape)
+        for t, weight, factor_off in zip(self.nodes, self.weights, self.factor_off):
+            np.multiply(o, t, out=factors)
+            factors += factor_off
+            product = factors.prod(axis=0)
+            product *= weight
+            np.divide(product, factors, out=factors)
+            integral += factors
+        contributions = (o - self.zero) * integral
+
+        values = np.matmul(contributions, self.scatter).sum(axis=0)
+        return values.reshape(n_rows, self.n_features, self.n_outputs)
+
+
+def _leaf_paths(tree, node_offset, is_classifier, n_trees):
+    """
+    Walk a fitted sklearn tree_ and describe the path to every leaf.
+
+    Each path lists its edges as (split node, goes_left, slot), with split
+    nodes numbered from node_offset and repeated splits on the same feature
+    sharing one slot, plus per-slot features and zero fractions (the share
+    of training weight that follows the path when the feature is unknown).
+    """
+    left = tree.children_left
+    right = tree.children_right
+    weight = tree.weighted_n_node_samples
+    value = tree.value[:, 0, :]
+    if is_classifier:
+        value = value / value.sum(axis=1, keepdims=True)
+    value = value / n_trees
+
+    paths = []
+    stack = [(0, [])]
+    while stack:
+        node, edges = stack.pop()
+        if left[node] == right[node]:
+            slot_of = {}
+            slot_zero = []
+            compiled = []
+            for parent, child, goes_left in edges:
+                feature = int(tree.feature[parent])
+                if feature not in slot_of:
+                    slot_of[feature] = len(slot_of)
+                    slot_zero.append(1.0)
+                slot = slot_of[feature]
+                slot_zero[slot] *= weight[child] / weight[parent]
+                compiled.append((node_offset + parent, goes_left, slot))
+            paths.append({
+                'edges': compiled,
+                'slot_feature': list(slot_of),
+                'slot_zero': slot_zero,
+                'value': value[node]
+            })
+            continue
+        stack.append((right[node], edges + [(node, right[node], False)]))
+        stack.append((left[node], edges + [(node, left[node], True)]))
+    return paths
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold vs warm /explain latency
+Cold requests rebuild the SHAP explainer (cache invalidated before
+each call, as every request did before the cache); warm requests reuse
+the cached explainer.
+
+Run from services/ml:  python benchmarks/bench_explain_cache.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main as service
+from app.model import can_explain, explainer_cache
+
+N_REQUESTS = 100
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+def time_explain(client, cold):
+    timings = []
+    for _ in range(N_REQUESTS):
+        if cold:
+            explainer_cache.invalidate()
+        start = time.perf_counter()
+        response = client.post("/explain", json=APPLICATION)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return np.array(timings) * 1e3
+
+
+def report(name, timings):
+    print(f"  {name:6s} mean {timings.mean():7.2f} ms   "
+          f"p50 {np.percentile(timings, 50):7.2f} ms   p99 {np.percentile(timings, 99):7.2f} ms")
+
+
+def main():
+    client = TestClient(service.app)
+    client.get("/health")
+    if not can_explain(service.model):
+        print("Model has no SHAP explainer: /explain uses feature importances, nothing to compare.")
+        return
+
+    print("=" * 70)
+    print(f"/explain latency over {N_REQUESTS} requests")
+    print("=" * 70)
+
+    cold = time_explain(client, cold=True)
+    warm = time_explain(client, cold=False)
+    report("cold", cold)
+    report("warm", warm)
+    print(f"\n  Speed-up: {cold.mean() / warm.mean():.1f}x   cache: {explainer_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
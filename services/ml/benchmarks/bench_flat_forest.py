@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: FlatForest vs RandomForestClassifier.predict_proba
+Times both engines on batches of 1, 64, 4096 and 1,000,000 rows drawn
+from dataset.csv and checks that their probabilities agree.
+
+Run from services/ml:  python benchmarks/bench_flat_forest.py [--max-rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+from app.model import load_model, load_preprocessor, FlatForest
+
+BATCH_SIZES = (1, 64, 4096, 1_000_000)
+
+
+def best_time(fn, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--max-rows', type=int, default=max(BATCH_SIZES),
+                        help='skip batch sizes above this')
+    args = parser.parse_args()
+
+    model = load_model('models/model.joblib')
+    preprocessor = load_preprocessor('models/preprocessor.joblib')
+    df = pd.read_csv('app/dataset.csv').drop(columns=['Unnamed: 0', 'target'])
+    X_all = preprocessor.transform_records(df.to_dict('records'))
+
+    start = time.perf_counter()
+    forest = FlatForest.from_model(model)
+    export_ms = (time.perf_counter() - start) * 1e3
+
+    print("=" * 70)
+    print(f"Forest inference: {model.n_estimators} trees, max depth {forest.max_depth}, "
+          f"{len(forest.threshold)} nodes (export {export_ms:.1f} ms)")
+    print(f"sklearn n_jobs={model.n_jobs}")
+    print("=" * 70)
+    print(f"  {'rows':>9s} {'sklearn':>12s} {'FlatForest':>12s} {'speed-up':>9s} {'max |diff|':>11s}")
+
+    rng = np.random.default_rng(0)
+    for n_rows in BATCH_SIZES:
+        if n_rows > args.max_rows:
+            continue
+        X = X_all[rng.integers(0, len(X_all), n_rows)]
+        repeats = 20 if n_rows <= 64 else 3 if n_rows <= 4096 else 1
+
+        # Warm up both engines
+        model.predict_proba(X[:1])
+        forest.predict_proba(X[:1])
+
+        sklearn_s = best_time(model.predict_proba, X, repeats)
+        flat_s = best_time(forest.predict_proba, X, repeats)
+        diff = np.abs(model.predict_proba(X) - forest.predict_proba(X)).max()
+
+        def fmt(seconds):
+            return f"{seconds * 1e3:9.2f} ms" if seconds < 10 else f"{seconds:10.2f} s"
+
+        print(f"  {n_rows:9d} {fmt(sklearn_s)} {fmt(flat_s)} {sklearn_s / flat_s:8.1f}x {diff:11.1e}")
+
+
+if __name__ == "__main__":
+    main()
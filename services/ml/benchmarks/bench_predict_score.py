@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-request latency of predict_score
+Compares the former predict() + predict_proba() pair against the
+single predict_proba() pass with a decision threshold.
+
+Run from services/ml:  python benchmarks/bench_predict_score.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+from app.model import load_model, load_preprocessor, prepare_features, predict_score
+
+N_REQUESTS = 300
+
+
+def predict_score_two_pass(model, preprocessor, data):
+    """Former implementation: the forest is walked twice per request."""
+    X = prepare_features(preprocessor, data)
+    prediction = model.predict(X)[0]
+    probability = model.predict_proba(X)[0]
+    return prediction, probability
+
+
+def time_requests(fn, model, preprocessor, records):
+    timings = []
+    for record in records:
+        start = time.perf_counter()
+        fn(model, preprocessor, record)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1e3
+
+
+def report(name, timings):
+    print(f"  {name:28s} mean {timings.mean():7.3f} ms   "
+          f"p50 {np.percentile(timings, 50):7.3f} ms   p99 {np.percentile(timings, 99):7.3f} ms")
+
+
+def main():
+    model = load_model('models/model.joblib')
+    preprocessor = load_preprocessor('models/preprocessor.joblib')
+    df = pd.read_csv('app/dataset.csv').drop(columns=['Unnamed: 0', 'target'])
+    records = df.sample(N_REQUESTS, replace=True, random_state=0).to_dict('records')
+
+    print("=" * 70)
+    print(f"predict_score latency over {N_REQUESTS} single-row requests "
+          f"(n_estimators={model.n_estimators}, n_jobs={model.n_jobs})")
+    print("=" * 70)
+
+    # Warm up both code paths
+    time_requests(predict_score_two_pass, model, preprocessor, records[:20])
+    time_requests(predict_score, model, preprocessor, records[:20])
+
+    before = time_requests(predict_score_two_pass, model, preprocessor, records)
+    after = time_requests(predict_score, model, preprocessor, records)
+
+    report("predict + predict_proba", before)
+    report("single predict_proba", after)
+    print(f"\n  Mean latency drop: {before.mean() - after.mean():.3f} ms "
+          f"({(1 - after.mean() / before.mean()):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: pre-forked server with 1 to N worker processes
+Starts python -m app.server with each worker count, drives /predict/batch
+from 2 * N concurrent keep-alive clients for a fixed time and reports requests
+and rows per second, with the speed-up over one worker.
+
+The clients run on the same machine and take CPU from the server, so on
+small machines the speed-up flattens early.
+
+Run from services/ml:  python benchmarks/bench_prefork.py [--max-workers N]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.registry import WARMUP_APPLICATION
+
+PORT = 8799
+
+
+def wait_ready(timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=2)
+            connection.request('GET', '/health/ready')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def client(args):
+    duration, body = args
+    connection = http.client.HTTPConnection('127.0.0.1', PORT)
+    headers = {'Content-Type': 'application/json'}
+    requests = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        connection.request('POST', '/predict/batch', body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status == 200:
+            requests += 1
+    return requests
+
+
+def measure(workers, clients, duration, body):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'app.server', '--workers', str(workers), '--port', str(PORT)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready()
+        with Pool(clients) as pool:
+            pool.map(client, [(0.5, body)] * clients)  # warm every worker
+            requests = sum(pool.map(client, [(duration, body)] * clients))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return requests / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--rows', type=int, default=32, help='applications per request')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per worker count')
+    args = parser.parse_args()
+
+    application = dict(WARMUP_APPLICATION)
+    application['Credit_amount'] = application.pop('Credit amount')
+    body = json.dumps([application] * args.rows)
+
+    print("=" * 70)
+    print(f"Pre-forked server: /predict/batch with {args.rows} rows, {args.duration:.0f} s per run, "
+          f"{os.cpu_count()} CPUs")
+    print("=" * 70)
+    print(f"  {'workers':>7s} {'clients':>7s} {'req/s':>9s} {'rows/s':>10s} {'speed-up':>9s}")
+
+    # 1, 2, 4, ... workers, and max_workers itself
+    counts = sorted({2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers}
+                    | {args.max_workers})
+    # The same offered load for every worker count
+    clients = max(2, 2 * args.max_workers)
+    baseline = None
+    for workers in counts:
+        rate = measure(workers, clients, args.duration, body)
+        baseline = baseline or rate
+        print(f"  {workers:7d} {clients:7d} {rate:9.1f} {rate * args.rows:10.0f} {rate / baseline:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: joblib files vs memory-mapped artifact directory
+Each run starts a fresh interpreter, loads the model pair, scores one
+application and reports the load time, time to first prediction and the
+process's private vs shared resident memory (from /proc, Linux only).
+
+Run from services/ml:  python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from app.artifacts import convert
+
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, '.')
+from app.model import load_model, load_preprocessor, predict_batch
+from app.registry import WARMUP_APPLICATION
+
+start = time.perf_counter()
+model = load_model(sys.argv[1])
+preprocessor = load_preprocessor(sys.argv[2])
+loaded = time.perf_counter()
+predict_batch(model, preprocessor, [WARMUP_APPLICATION])
+scored = time.perf_counter()
+
+memory = {}
+try:
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Private_Clean', 'Private_Dirty', 'Shared_Clean', 'Shared_Dirty'):
+                memory[key] = int(value.split()[0])
+except OSError:
+    pass
+print(json.dumps({'load_ms': (loaded - start) * 1e3, 'first_ms': (scored - start) * 1e3, 'memory': memory}))
+"""
+
+
+def run(model_path, preprocessor_path, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, model_path, preprocessor_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def report(name, results):
+    load = np.median([r['load_ms'] for r in results])
+    first = np.median([r['first_ms'] for r in results])
+    memory = results[-1]['memory']
+    line = f"  {name:10s} load {load:8.2f} ms   first prediction {first:8.2f} ms"
+    if memory:
+        private = memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)
+        line += f"   RSS {memory['Rss'] / 1024:6.1f} MiB (private {private / 1024:6.1f} MiB)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = os.path.join(tmp, 'model.artifact')
+        convert('models/model.joblib', 'models/preprocessor.joblib', artifact)
+
+        print("=" * 70)
+        print(f"Model startup, median of {args.runs} fresh processes (imports excluded)")
+        print("=" * 70)
+        report('joblib', run('models/model.joblib', 'models/preprocessor.joblib', args.runs))
+        report('artifact', run(artifact, artifact, args.runs))
+        print("\n  Artifact arrays are mapped read-only from the page cache, so")
+        print("  worker processes share them instead of each holding a copy.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Load test: /predict throughput with and without micro-batching
+Fires concurrent single-application /predict requests and reports
+successful requests per second, latency percentiles and 503s, first with coalescing
+disabled (max batch size 1, the former per-request path), then with the
+configured micro-batcher.
+
+By default the service is driven in-process through its ASGI app; pass
+--url to load-test a running server instead (the batching configuration
+is then whatever that server was started with).
+
+Run from services/ml:
+    python benchmarks/load_test_predict.py [--requests 2000] [--concurrency 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import numpy as np
+import pandas as pd
+
+
+def load_applications(n):
+    df = pd.read_csv('app/dataset.csv').drop(columns=['Unnamed: 0', 'target'])
+    df = df.rename(columns={'Credit amount': 'Credit_amount'}).fillna('NA')
+    return df.sample(n, replace=True, random_state=0).to_dict('records')
+
+
+async def run_load(client, applications, concurrency):
+    queue = asyncio.Queue()
+    for application in applications:
+        queue.put_nowait(application)
+    latencies = []
+    statuses = []
+
+    async def worker():
+        while not queue.empty():
+            application = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post('/predict', json=application)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    statuses = np.array(statuses)
+    return (statuses == 200).sum() / elapsed, np.array(latencies) * 1e3, statuses
+
+
+def report(name, throughput, latencies, statuses):
+    print(f"  {name:24s} {throughput:7.0f} ok/s   p50 {np.percentile(latencies, 50):7.1f} ms   "
+          f"p99 {np.percentile(latencies, 99):7.1f} ms   503s {(statuses == 503).sum():5d}   "
+          f"other errors {((statuses != 200) & (statuses != 503)).sum()}")
+
+
+async def main(args):
+    applications = load_applications(args.requests)
+    print("=" * 78)
+    print(f"/predict load test: {args.requests} requests, {args.concurrency} concurrent clients")
+    print("=" * 78)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            report("server", *await run_load(client, applications, args.concurrency))
+        return
+
+    import main as service
+    transport = httpx.ASGITransport(app=service.app)
+    configured = service.predict_batcher.max_batch_size
+    async with httpx.AsyncClient(transport=transport, base_url='http://ml', timeout=60) as client:
+        await run_load(client, applications[:50], 10)  # warm-up
+
+        service.predict_batcher.max_batch_size = 1
+        report("per-request", *await run_load(client, applications, args.concurrency))
+
+        service.predict_batcher.max_batch_size = configured
+        batches_before = service.predict_batcher.batches
+        report(f"micro-batched (<={configured})", *await run_load(client, applications, args.concurrency))
+        batches = service.predict_batcher.batches - batches_before
+    print(f"\n  Micro-batched run: {batches} model calls, "
+          f"{len(applications) / max(batches, 1):.1f} requests per call on average")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--url', help="Base URL of a running ML service")
+    asyncio.run(main(parser.parse_args()))
@@ -1,27 +1,73 @@
 # main.py - Credit Scoring ML Service API
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
-import joblib
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Any, Dict, List, Optional
+import asyncio
+import hmac
+import json
 import os
 import sys
-import numpy as np
-import pandas as pd
 
 # Add app directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
-from app.model import load_model, load_preprocessor, predict_score, predict_and_explain
-from app.preprocessing import CreditDataPreprocessor
+from app.model import (
+    predict_score, predict_batch, predict_and_explain, score_application, explainer_cache
+)
+from app.executor import ModelVersionMismatchError, PoolSaturatedError, pool_from_env
+from app.batching import batcher_from_env
+from app.cache import caches_from_env, canonical_key
+from app.registry import ModelNotReadyError, ModelRegistry, watcher_from_env
+from app.ndjson import NDJSONStreamingResponse, iter_lines
+from app.profiling import PROFILE_MODES, profiler_from_env
+from app.fairness_monitor import monitor_from_env
+from app.metrics import (
+    CONTENT_TYPE, REGISTRY, BATCH_SIZE, STAGE_SECONDS, CallbackMetric, MetricsMiddleware
+)
 
 # ----------------------------
 # FASTAPI APP SETUP
 # ----------------------------
+@asynccontextmanager
+async def lifespan(app):
+    # Load in the background: the process answers liveness probes at once
+    # and reports ready when the model is warm
+    loading = asyncio.create_task(asyncio.to_thread(load_models))
+    if model_watcher is not None:
+        model_watcher.start()
+    if fairness_monitor is not None:
+        fairness_monitor.start()
+    yield
+    loading.cancel()
+    if model_watcher is not None:
+        model_watcher.stop()
+    if fairness_monitor is not None:
+        fairness_monitor.stop()
+    inference_pool.shutdown(wait=False)
+    if PROFILE_DIR:
+        path = profiler.dump(PROFILE_DIR)
+        if path is not None:
+            print(f"OK: Profile of {profiler.sampled} sampled jobs written to {path}")
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse recording the time spent encoding its body."""
+
+    def render(self, content):
+        with STAGE_SECONDS.time('serialization'):
+            return super().render(content)
+
+
 app = FastAPI(
     title="CreditXAI ML Service",
     description="Credit Scoring API with Explainable AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # Add CORS middleware
@@ -32,22 +78,154 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Request counts and latency per route, served by /metrics
+app.add_middleware(MetricsMiddleware)
 
 # ----------------------------
 # LOAD MODELS ON STARTUP
 # ----------------------------
-MODEL_PATH = "models/model.joblib"
-PREPROCESSOR_PATH = "models/preprocessor.joblib"
-
-try:
-    model = load_model(MODEL_PATH)
-    preprocessor = load_preprocessor(PREPROCESSOR_PATH)
-    print("OK: Models loaded successfully")
-except Exception as e:
-    print(f"WARNING: Could not load models: {e}")
-    print("  Models will be loaded on first request")
-    model = None
-    preprocessor = None
+# Either joblib files or one memory-mapped artifact directory for both
+# (python -m app.artifacts converts the former into the latter)
+MODEL_PATH = os.environ.get("ML_MODEL_PATH", "models/model.joblib")
+PREPROCESSOR_PATH = os.environ.get("ML_PREPROCESSOR_PATH", "models/preprocessor.joblib")
+# When set, the pair listed (and hashed) in this manifest is served instead
+# (written by app.train, or python -m app.manifest for existing files)
+MANIFEST_PATH = os.environ.get("ML_MODEL_MANIFEST")
+MAX_BATCH_SIZE = int(os.environ.get("ML_MAX_BATCH_SIZE", "10000"))
+# /predict/stream scores this many rows per model call, and rejects longer lines
+STREAM_CHUNK_ROWS = int(os.environ.get("ML_STREAM_CHUNK_ROWS", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.environ.get("ML_STREAM_MAX_LINE_BYTES", "65536"))
+# Longest a stream chunk waits for room in a saturated inference pool before failing
+STREAM_MAX_WAIT_MS = float(os.environ.get("ML_STREAM_MAX_WAIT_MS", "5000"))
+# Required in X-Admin-Token by the admin endpoints, which are disabled without it
+ADMIN_TOKEN = os.environ.get("ML_ADMIN_TOKEN")
+# The request profile, if any, is written here at shutdown
+PROFILE_DIR = os.environ.get("ML_PROFILE_DIR")
+
+# Prediction and explanation results, keyed by input payload + model version
+prediction_cache, explanation_cache = caches_from_env()
+
+
+def on_model_load(bundle):
+    """Drop results of the previous version and have process workers load this one."""
+    prediction_cache.clear()
+    explanation_cache.clear()
+    inference_pool.restart_workers(bundle.version)
+
+
+# Owns loading and hot reloading of the model pair (see app/registry.py)
+registry = ModelRegistry(
+    MODEL_PATH, PREPROCESSOR_PATH, on_load=on_model_load, manifest_path=MANIFEST_PATH
+)
+# Reloads the pair when the model files change (ML_MODEL_WATCH_INTERVAL)
+model_watcher = watcher_from_env(registry)
+# Rolling approval rates per Sex and age group of served decisions, for /fairness/live
+fairness_monitor = monitor_from_env()
+
+
+def load_models():
+    """Load and warm up the model pair at start-up."""
+    try:
+        bundle = registry.get()
+        print(f"OK: Models loaded successfully (version {bundle.version})")
+    except ModelNotReadyError as e:
+        print(f"WARNING: Could not load models: {e}")
+        print("  Models will be loaded on first request")
+
+
+async def get_bundle():
+    """Return the served model bundle; 503 while it cannot be loaded."""
+    bundle = registry.bundle
+    if bundle is not None:
+        return bundle
+    try:
+        # Loading blocks, so wait for it off the event loop
+        return await asyncio.to_thread(registry.get)
+    except ModelNotReadyError as e:
+        raise HTTPException(
+            status_code=503, detail=f"Model not ready: {e}", headers={"Retry-After": "5"}
+        )
+
+# CPU-bound inference runs on a dedicated, bounded pool (see app/executor.py)
+# Process workers load the pair from the same source as the registry
+inference_pool = pool_from_env((MODEL_PATH, PREPROCESSOR_PATH, MANIFEST_PATH))
+# Profiles a sampled fraction of inference jobs (off by default, see app/profiling.py)
+profiler = profiler_from_env()
+
+
+def profiled(fn):
+    """fn, wrapped by the profiler when sampled; process-pool jobs are never profiled."""
+    if inference_pool.kind != 'thread':
+        return fn
+    return profiler.maybe_wrap(fn)
+
+
+async def run_inference(bundle, fn, *args):
+    """Run fn(model, preprocessor, *args) on the inference pool; 503 when saturated."""
+    try:
+        return await inference_pool.run(profiled(fn), bundle.model, bundle.preprocessor, *args)
+    except (PoolSaturatedError, ModelVersionMismatchError) as e:
+        # A version mismatch only lasts until the restarted workers are up
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def predict_rows(items):
+    """
+    Score (bundle, input dict) pairs with one vectorized call per bundle.
+
+    A batch only spans two bundles while a reload is being swapped in;
+    each request is scored by the version it was accepted with.
+    """
+    groups = {}
+    for index, (bundle, record) in enumerate(items):
+        groups.setdefault(bundle.version, (bundle, [], []))
+        groups[bundle.version][1].append(index)
+        groups[bundle.version][2].append(record)
+
+    results = [None] * len(items)
+    for bundle, indices, records in groups.values():
+        BATCH_SIZE.observe(len(records), 'predict')
+        for index, result in zip(indices, await run_inference(bundle, predict_batch, records)):
+            results[index] = result
+    return results
+
+
+# Concurrent /predict requests are coalesced into predict_batch calls; a
+# rejection by the pool fails the whole batch, only data errors are retried per item
+predict_batcher = batcher_from_env(predict_rows, batch_errors=(HTTPException, PoolSaturatedError))
+
+# State the service already keeps, read when /metrics is scraped
+CallbackMetric(
+    'ml_model_info', 'Served model version (value 1)', 'gauge',
+    lambda: {(registry.bundle.version,): 1} if registry.ready else {}, ('version',)
+)
+CallbackMetric('ml_model_ready', 'Whether a model is loaded and warm', 'gauge', lambda: registry.ready)
+CallbackMetric('ml_model_loads_total', 'Model versions loaded', 'counter', lambda: registry.loads)
+CallbackMetric(
+    'ml_cache_lookups_total', 'Cache lookups by cache and result', 'counter',
+    lambda: {
+        (name, result): stats[key]
+        for name, stats in (
+            ('prediction', prediction_cache.stats()),
+            ('explanation', explanation_cache.stats()),
+            ('explainer', explainer_cache.stats())
+        )
+        for result, key in (('hit', 'hits'), ('miss', 'misses'))
+    },
+    ('cache', 'result')
+)
+CallbackMetric(
+    'ml_inference_queue_depth', 'Inference jobs waiting for a worker', 'gauge',
+    lambda: inference_pool.stats()['queue_depth']
+)
+CallbackMetric(
+    'ml_inference_in_flight', 'Inference jobs running or waiting', 'gauge',
+    lambda: inference_pool.stats()['in_flight']
+)
+CallbackMetric(
+    'ml_inference_rejected_total', 'Inference jobs rejected by a full pool', 'counter',
+    lambda: inference_pool.stats()['rejected']
+)
 
 # ----------------------------
 # REQUEST/RESPONSE MODELS
@@ -63,7 +241,13 @@ class CreditApplicationInput(BaseModel):
     Credit_amount: float = Field(..., gt=0, description="Requested credit amount")
     Duration: int = Field(..., gt=0, description="Loan duration in months")
     Purpose: str = Field(..., description="Loan purpose: car, furniture/equipment, radio/TV, education, business, etc.")
-    
+
+    @model_validator(mode='wrap')
+    @classmethod
+    def _timed(cls, data, handler):
+        with STAGE_SECONDS.time('validation'):
+            return handler(data)
+
     class Config:
         populate_by_name = True
         json_schema_extra = {
@@ -91,6 +275,20 @@ class PredictionResponse(BaseModel):
     risk_score: float
 
 
+class BatchPredictionItem(BaseModel):
+    """Result for one application of a batch: a prediction or its validation errors."""
+    index: int
+    prediction: Optional[PredictionResponse] = None
+    errors: Optional[List[Dict]] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response from batch credit scoring."""
+    results: List[BatchPredictionItem]
+    n_succeeded: int
+    n_failed: int
+
+
 class ExplanationResponse(BaseModel):
     """Response with SHAP explanation (simplified without actual SHAP)."""
     shap_values: List[float]
@@ -108,6 +306,107 @@ class FullPredictionResponse(BaseModel):
     request_data: Dict
 
 
+class ExplainerCacheStats(BaseModel):
+    """Hit/miss counters of the SHAP explainer cache."""
+    hits: int
+    misses: int
+    size: int
+
+
+class InferencePoolStats(BaseModel):
+    """Queue depth and wait-time metrics of the inference pool."""
+    kind: str
+    max_workers: int
+    max_queue: int
+    in_flight: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    wait_time_avg_ms: float
+    wait_time_max_ms: float
+
+
+class MicroBatchStats(BaseModel):
+    """Request coalescing statistics of /predict."""
+    max_batch_size: int
+    max_delay_ms: float
+    batches: int
+    items: int
+    avg_batch_size: float
+
+
+class ResultCacheStats(BaseModel):
+    """Statistics of one result cache."""
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+
+
+class CacheStatsResponse(BaseModel):
+    """Statistics of the prediction, explanation and explainer caches."""
+    model_version: Optional[str]
+    prediction: ResultCacheStats
+    explanation: ResultCacheStats
+    explainer: ExplainerCacheStats
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness state of the model registry."""
+    state: str
+    ready: bool
+    model_version: Optional[str]
+    manifest: Optional[str]
+    loads: int
+    load_seconds: Optional[float]
+    warmup_seconds: Optional[float]
+    error: Optional[str]
+
+
+class ProfileConfig(BaseModel):
+    """Request profiler settings; sample_rate 0 turns profiling off."""
+    sample_rate: float = Field(..., ge=0, le=1)
+    mode: Optional[str] = Field(None, description=f"One of {PROFILE_MODES} (default: unchanged)")
+    interval_ms: Optional[float] = Field(None, gt=0, description="Stack sampling interval ('stacks' mode)")
+
+
+class ProfileStatus(BaseModel):
+    """Request profiler settings and the profile collected so far."""
+    enabled: bool
+    sample_rate: float
+    mode: str
+    interval_ms: float
+    sampled_jobs: int
+    since: float
+
+
+class LiveFairnessWindow(BaseModel):
+    """Group approval rates and disparate impact of the decisions in one window."""
+    window_seconds: int
+    decisions: int
+    approval_rate: Optional[float]
+    group_analysis: Dict[str, Dict[str, Any]]
+    bias_summary: Dict[str, Any]
+
+
+class LiveFairnessResponse(BaseModel):
+    """Rolling fairness of served decisions, per window."""
+    bucket_seconds: int
+    dropped: int = Field(..., description="Decisions dropped because folding fell behind")
+    windows: List[LiveFairnessWindow]
+
+
+class ReloadResponse(BaseModel):
+    """Outcome of a model reload."""
+    reloaded: bool
+    previous_version: Optional[str]
+    model_version: Optional[str]
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
@@ -121,36 +420,33 @@ class HealthResponse(BaseModel):
 # ENDPOINTS
 # ----------------------------
 @app.get("/", response_model=HealthResponse)
-def root():
+async def root():
     """Root endpoint - API health check."""
     return {
         "status": "healthy",
         "message": "CreditXAI ML Service is running!",
-        "models_loaded": model is not None and preprocessor is not None,
+        "models_loaded": registry.ready,
         "model_path": MODEL_PATH,
         "preprocessor_path": PREPROCESSOR_PATH
     }
 
 
 @app.get("/health", response_model=HealthResponse)
-def health_check():
+async def health_check():
     """Health check endpoint."""
-    global model, preprocessor
-    
     # Try to load models if not loaded
-    if model is None or preprocessor is None:
+    if not registry.ready:
         try:
-            model = load_model(MODEL_PATH)
-            preprocessor = load_preprocessor(PREPROCESSOR_PATH)
-        except Exception as e:
+            await get_bundle()
+        except HTTPException as e:
             return {
                 "status": "unhealthy",
-                "message": f"Models not loaded: {str(e)}",
+                "message": f"Models not loaded: {e.detail}",
                 "models_loaded": False,
                 "model_path": MODEL_PATH,
                 "preprocessor_path": PREPROCESSOR_PATH
             }
-    
+
     return {
         "status": "healthy",
         "message": "All systems operational",
@@ -160,63 +456,361 @@ def health_check():
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving HTTP."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", response_model=ReadinessResponse)
+async def readiness():
+    """Readiness probe: 200 once the model is loaded and warm, 503 before."""
+    status = registry.status()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Admit only requests carrying ML_ADMIN_TOKEN in X-Admin-Token.
+
+    The admin endpoints do not exist (404) while no token is configured.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/reload", response_model=ReloadResponse, dependencies=[Depends(require_admin)])
+async def reload_models():
+    """
+    Load the model files again and swap them in if they changed.
+
+    Requests keep being served by the current version while the new pair
+    is loaded, smoke-tested and warmed up; on failure it stays in place.
+    """
+    previous = registry.bundle
+    try:
+        reloaded = await asyncio.to_thread(registry.reload)
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=422, detail=f"Model reload failed: {e}")
+
+    return {
+        'reloaded': reloaded,
+        'previous_version': previous.version if previous is not None else None,
+        'model_version': registry.bundle.version
+    }
+
+
+@app.get("/admin/profile/status", response_model=ProfileStatus, dependencies=[Depends(require_admin)])
+async def profile_status():
+    """Request profiler settings and number of jobs profiled."""
+    return profiler.status()
+
+
+@app.post("/admin/profile", response_model=ProfileStatus, dependencies=[Depends(require_admin)])
+async def configure_profile(config: ProfileConfig):
+    """
+    Start profiling a fraction of inference jobs, or stop with sample_rate 0.
+
+    Starting discards the previous profile; stopping keeps it for GET /admin/profile.
+    """
+    if config.sample_rate > 0 and inference_pool.kind != 'thread':
+        raise HTTPException(
+            status_code=409, detail="Profiling requires the thread inference pool (ML_INFERENCE_EXECUTOR=thread)"
+        )
+
+    interval = config.interval_ms / 1000 if config.interval_ms else None
+    try:
+        await asyncio.to_thread(profiler.configure, config.sample_rate, config.mode, interval)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return profiler.status()
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def get_profile(format: str = "text"):
+    """
+    Aggregated profile of the sampled inference jobs.
+
+    format=text is the pstats report sorted by cumulative time, pstats a
+    file for pstats/snakeviz ('pstats' mode); collapsed the stack samples
+    for flamegraph.pl or speedscope ('stacks' mode).
+    """
+    try:
+        body = await asyncio.to_thread(profiler.render, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format == 'pstats':
+        return Response(
+            body, media_type='application/octet-stream',
+            headers={'Content-Disposition': 'attachment; filename="profile.pstats"'}
+        )
+    return Response(body, media_type='text/plain; charset=utf-8')
+
+
+@app.get("/explain/cache", response_model=ExplainerCacheStats)
+async def explainer_cache_stats():
+    """SHAP explainer cache statistics."""
+    return explainer_cache.stats()
+
+
+@app.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    """Result cache statistics."""
+    return {
+        'model_version': registry.bundle.version if registry.ready else None,
+        'prediction': prediction_cache.stats(),
+        'explanation': explanation_cache.stats(),
+        'explainer': explainer_cache.stats()
+    }
+
+
+@app.get("/inference/stats", response_model=InferencePoolStats)
+async def inference_pool_stats():
+    """Inference pool queue depth and wait-time metrics."""
+    return inference_pool.stats()
+
+
+@app.get("/inference/batching", response_model=MicroBatchStats)
+async def micro_batch_stats():
+    """Request coalescing statistics of /predict."""
+    return predict_batcher.stats()
+
+
+@app.get("/fairness/live", response_model=LiveFairnessResponse)
+async def live_fairness():
+    """
+    Rolling approval rates and disparate impact of served decisions.
+
+    Decisions of /predict, /predict/batch, /predict/stream and /score are
+    grouped by Sex and age group over sliding windows; bias levels use the
+    thresholds of the offline fairness report (app/fairness.py).
+    """
+    if fairness_monitor is None:
+        raise HTTPException(status_code=404, detail="Live fairness monitoring is disabled")
+    return fairness_monitor.report()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics of this process (text exposition format)."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict(data: CreditApplicationInput):
+async def predict(data: CreditApplicationInput, response: Response):
     """
     Predict credit score for given applicant data.
-    
-    Returns prediction with probabilities and risk score.
+
+    Concurrent requests are scored together in micro-batches.
+    Returns prediction with probabilities and risk score; the
+    X-Model-Version header names the model version used.
     """
-    global model, preprocessor
-    
-    # Ensure models are loaded
-    if model is None or preprocessor is None:
-        try:
-            model = load_model(MODEL_PATH)
-            preprocessor = load_preprocessor(PREPROCESSOR_PATH)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model loading failed: {str(e)}")
-    
+    # Ensure models are loaded; the response reports the version used
+    bundle = await get_bundle()
+    response.headers["X-Model-Version"] = bundle.version
+
     try:
         # Convert input to dict
         input_dict = data.model_dump(by_alias=True)
-        
-        # Get prediction
-        result = predict_score(model, preprocessor, input_dict)
-        
+
+        # Get prediction, reusing the result for an identical earlier request
+        key = canonical_key(input_dict, bundle.version)
+        result = prediction_cache.get(key)
+        if result is None:
+            result = await predict_batcher.submit((bundle, input_dict))
+            prediction_cache.put(key, result)
+
+        if fairness_monitor is not None:
+            fairness_monitor.record(input_dict, result)
         return result
-    
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@app.post("/explain")
-def explain(data: CreditApplicationInput):
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch_endpoint(applications: List[Dict[str, Any]], response: Response):
     """
-    Get SHAP explanation for prediction.
-    
-    Note: SHAP library not installed. This returns mock explanation.
-    Install shap library for full functionality.
+    Predict credit scores for a list of applicants in one model call.
+
+    Each application is validated on its own: invalid rows are reported
+    with their validation errors and do not fail the rest of the batch.
     """
-    global model, preprocessor
-    
-    # Ensure models are loaded
-    if model is None or preprocessor is None:
+    if len(applications) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(applications)} applications (max {MAX_BATCH_SIZE})"
+        )
+
+    # Ensure models are loaded; the response reports the version used
+    bundle = await get_bundle()
+    response.headers["X-Model-Version"] = bundle.version
+
+    # Validate every row, keeping track of the valid ones
+    results = []
+    valid_indices = []
+    valid_records = []
+    for index, raw in enumerate(applications):
         try:
-            model = load_model(MODEL_PATH)
-            preprocessor = load_preprocessor(PREPROCESSOR_PATH)
+            data = CreditApplicationInput.model_validate(raw)
+        except ValidationError as e:
+            results.append({
+                'index': index,
+                'errors': e.errors(include_url=False, include_context=False)
+            })
+            continue
+        results.append({'index': index})
+        valid_indices.append(index)
+        valid_records.append(data.model_dump(by_alias=True))
+
+    BATCH_SIZE.observe(len(valid_records), 'batch')
+    try:
+        predictions = await run_inference(bundle, predict_batch, valid_records)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+    for index, prediction in zip(valid_indices, predictions):
+        results[index]['prediction'] = prediction
+    if fairness_monitor is not None:
+        fairness_monitor.record_many(valid_records, predictions)
+
+    return {
+        'results': results,
+        'n_succeeded': len(valid_records),
+        'n_failed': len(applications) - len(valid_records)
+    }
+
+
+def parse_stream_line(line):
+    """Validate one NDJSON line: (input dict, None), or (None, validation errors)."""
+    if line is None:
+        return None, [{
+            'type': 'line_too_long',
+            'loc': [],
+            'msg': f"Line longer than {STREAM_MAX_LINE_BYTES} bytes"
+        }]
+    try:
+        data = CreditApplicationInput.model_validate_json(line.decode('utf-8', errors='replace'))
+    except ValidationError as e:
+        return None, e.errors(include_url=False, include_context=False)
+    return data.model_dump(by_alias=True), None
+
+
+async def score_stream_chunk(bundle, items):
+    """Score the valid rows of (index, record, errors) items; return their NDJSON lines."""
+    indices = [index for index, _, errors in items if errors is None]
+    records = [record for _, record, errors in items if errors is None]
+    predictions = {}
+    failure = None
+    if records:
+        BATCH_SIZE.observe(len(records), 'stream')
+    deadline = asyncio.get_running_loop().time() + STREAM_MAX_WAIT_MS / 1000
+    backoff = 0.01
+    while records:
+        try:
+            results = await inference_pool.run(
+                profiled(predict_batch), bundle.model, bundle.preprocessor, records
+            )
+        except PoolSaturatedError as e:
+            # Mid-stream there is no status code left to shed load with:
+            # wait for room instead, which also slows down reading the body,
+            # and fail the chunk's rows once the wait runs out
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                failure = [{'type': 'prediction_failed', 'loc': [], 'msg': str(e)}]
+                break
+            await asyncio.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, 0.5)
+            continue
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model loading failed: {str(e)}")
-    
+            failure = [{'type': 'prediction_failed', 'loc': [], 'msg': str(e)}]
+            break
+        predictions = dict(zip(indices, results))
+        if fairness_monitor is not None:
+            fairness_monitor.record_many(records, results)
+        break
+
+    lines = []
+    with STAGE_SECONDS.time('serialization'):
+        for index, _, errors in items:
+            if errors is None and failure is None:
+                lines.append(json.dumps({'index': index, 'prediction': predictions[index]}))
+            else:
+                lines.append(json.dumps({'index': index, 'errors': errors or failure}))
+    return '\n'.join(lines) + '\n'
+
+
+async def stream_predictions(request, bundle):
+    """Read, score and yield NDJSON results chunk by chunk until the body or client ends."""
+    items = []
+    index = 0
+    try:
+        async for line in iter_lines(request.stream(), STREAM_MAX_LINE_BYTES):
+            items.append((index, *parse_stream_line(line)))
+            index += 1
+            if len(items) >= STREAM_CHUNK_ROWS:
+                yield await score_stream_chunk(bundle, items)
+                items = []
+    except ClientDisconnect:
+        return
+    if items and not await request.is_disconnected():
+        yield await score_stream_chunk(bundle, items)
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Score newline-delimited JSON applications as a stream.
+
+    The body is read incrementally and scored STREAM_CHUNK_ROWS rows at a
+    time; one NDJSON line per application is streamed back in input order
+    as soon as its chunk is scored, with the fields of a /predict/batch
+    result (index and prediction, or index and errors). At most one chunk
+    is held whatever the payload size, and reading and scoring stop when
+    the client disconnects. The whole stream is scored by one model
+    version, reported in X-Model-Version.
+    """
+    bundle = await get_bundle()
+    return NDJSONStreamingResponse(
+        stream_predictions(request, bundle), headers={"X-Model-Version": bundle.version}
+    )
+
+
+@app.post("/explain")
+async def explain(data: CreditApplicationInput, response: Response):
+    """
+    Get SHAP explanation for prediction.
+
+    Uses the shap library when installed and the built-in TreeSHAP
+    implementation otherwise.
+    """
+    # Ensure models are loaded; the response reports the version used
+    bundle = await get_bundle()
+    response.headers["X-Model-Version"] = bundle.version
+
     try:
         # Convert input to dict
         input_dict = data.model_dump(by_alias=True)
-        
-        # Get full prediction with explanation
-        result = predict_and_explain(model, preprocessor, input_dict)
-        
-        return result['explanation']
-    
+
+        # Get full prediction with explanation, unless already cached
+        key = canonical_key(input_dict, bundle.version)
+        explanation = explanation_cache.get(key)
+        if explanation is None:
+            result = await run_inference(bundle, predict_and_explain, input_dict)
+            explanation = result['explanation']
+            prediction_cache.put(key, result['prediction'])
+            explanation_cache.put(key, explanation)
+
+        return explanation
+
+    except HTTPException:
+        raise
     except ImportError:
         # SHAP not installed - return feature importances instead
         raise HTTPException(
@@ -228,49 +822,42 @@ def explain(data: CreditApplicationInput):
 
 
 @app.post("/score", response_model=FullPredictionResponse)
-def score(data: CreditApplicationInput):
+async def score(data: CreditApplicationInput, response: Response):
     """
     Complete credit scoring with prediction and explanation.
-    
+
     Returns both the prediction result and SHAP explanation.
     """
-    global model, preprocessor
-    
-    # Ensure models are loaded
-    if model is None or preprocessor is None:
-        try:
-            model = load_model(MODEL_PATH)
-            preprocessor = load_preprocessor(PREPROCESSOR_PATH)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Model loading failed: {str(e)}")
-    
+    # Ensure models are loaded; the response reports the version used
+    bundle = await get_bundle()
+    response.headers["X-Model-Version"] = bundle.version
+
     try:
         # Convert input to dict
         input_dict = data.model_dump(by_alias=True)
-        
-        # Get full result
-        result = predict_and_explain(model, preprocessor, input_dict)
-        
+
+        # Get full result (prediction only if SHAP is unavailable),
+        # unless both parts are already cached
+        key = canonical_key(input_dict, bundle.version)
+        prediction = prediction_cache.get(key)
+        explanation = explanation_cache.get(key) if prediction is not None else None
+        if explanation is None:
+            result = await run_inference(bundle, score_application, input_dict)
+            prediction, explanation = result['prediction'], result['explanation']
+            prediction_cache.put(key, prediction)
+            explanation_cache.put(key, explanation)
+
+        if fairness_monitor is not None:
+            fairness_monitor.record(input_dict, prediction)
         # Add request data for reference
-        result['request_data'] = input_dict
-        
-        return result
-    
-    except ImportError:
-        # SHAP not available - return prediction only
-        result = {
-            'prediction': predict_score(model, preprocessor, data.model_dump(by_alias=True)),
-            'explanation': {
-                'shap_values': [],
-                'feature_names': preprocessor.feature_columns if hasattr(preprocessor, 'feature_columns') else [],
-                'base_value': 0.0,
-                'prediction_value': 0.0,
-                'top_features': [],
-                'explanation_summary': "SHAP not installed. Install with: pip install shap"
-            },
-            'request_data': data.model_dump(by_alias=True)
+        return {
+            'prediction': prediction,
+            'explanation': explanation,
+            'request_data': input_dict
         }
-        return result
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
 
@@ -279,7 +866,14 @@ def score(data: CreditApplicationInput):
 # MAIN
 # ----------------------------
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # ML_SERVER_WORKERS > 1 pre-forks workers sharing the loaded model
+    # (see app/server.py, also runnable as python -m app.server)
+    workers = int(os.environ.get("ML_SERVER_WORKERS", "1"))
+    if workers > 1:
+        from app.server import serve
+        serve(app, registry, host="0.0.0.0", port=8000, workers=workers)
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8000)
 
 
@@ -0,0 +1,46 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.artifacts import FORMAT_FILE, convert, load_artifact
+from app.model import explain_prediction, load_model, load_preprocessor, predict_batch
+from app.registry import ModelRegistry
+
+
+def test_artifact_scores_like_joblib_pair(tmp_path):
+    directory = str(tmp_path / "model.artifact")
+    convert("models/model.joblib", "models/preprocessor.joblib", directory)
+    forest, preprocessor = load_artifact(directory)
+    assert isinstance(forest.threshold, np.memmap)
+
+    model = load_model("models/model.joblib")
+    reference = load_preprocessor("models/preprocessor.joblib")
+    df = pd.read_csv("app/dataset.csv").drop(columns=["Unnamed: 0", "target"])
+    records = df.to_dict("records")
+    assert predict_batch(forest, preprocessor, records) == predict_batch(model, reference, records)
+
+    ours = explain_prediction(forest, preprocessor, records[0])
+    theirs = explain_prediction(model, reference, records[0])
+    np.testing.assert_allclose(ours["shap_values"], theirs["shap_values"], atol=1e-12)
+    # The per-tree views are built once, not on every explanation
+    assert forest.estimators_ is forest.estimators_
+
+    # The serving path loads the same directory for both halves of the pair
+    bundle = ModelRegistry(directory, directory).get()
+    assert bundle.model.n_estimators == model.n_estimators
+
+
+def test_newer_format_version_is_rejected(tmp_path):
+    directory = str(tmp_path / "model.artifact")
+    convert("models/model.joblib", "models/preprocessor.joblib", directory)
+    path = os.path.join(directory, FORMAT_FILE)
+    with open(path) as f:
+        metadata = json.load(f)
+    metadata["format_version"] += 1
+    with open(path, "w") as f:
+        json.dump(metadata, f)
+    with pytest.raises(ValueError, match="format version"):
+        load_artifact(directory)
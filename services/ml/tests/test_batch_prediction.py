@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+def test_batch_matches_single_predictions():
+    other = dict(APPLICATION, Age=22, Housing="rent", Duration=48)
+    response = client.post("/predict/batch", json=[APPLICATION, other])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_succeeded"] == 2 and body["n_failed"] == 0
+    for item, application in zip(body["results"], [APPLICATION, other]):
+        single = client.post("/predict", json=application).json()
+        assert item["prediction"] == single
+
+
+def test_batch_reports_invalid_rows_without_failing():
+    invalid = dict(APPLICATION, Age=12)
+    response = client.post("/predict/batch", json=[invalid, APPLICATION])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_succeeded"] == 1 and body["n_failed"] == 1
+    assert body["results"][0]["prediction"] is None
+    assert body["results"][0]["errors"][0]["loc"] == ["Age"]
+    assert body["results"][1]["prediction"] is not None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bulk import score_file
+from app.model import load_model, load_preprocessor, predict_batch
+
+
+def test_chunked_file_scores_match_predict_batch(tmp_path):
+    output = tmp_path / "scored.csv"
+    rows = score_file("app/dataset.csv", str(output), chunk_rows=128)
+    scored = pd.read_csv(output)
+    assert rows == len(scored) == 1000
+
+    model = load_model("models/model.joblib")
+    preprocessor = load_preprocessor("models/preprocessor.joblib")
+    records = pd.read_csv("app/dataset.csv").drop(columns=["Unnamed: 0", "target"]).to_dict("records")
+    expected = pd.DataFrame(predict_batch(model, preprocessor, records))
+    assert list(scored["prediction_label"]) == list(expected["prediction_label"])
+    np.testing.assert_allclose(scored["probability_approved"], expected["probability_approved"], atol=1e-12)
+
+
+def test_workers_and_explanations(tmp_path):
+    single = tmp_path / "single.csv"
+    pooled = tmp_path / "pooled.csv"
+    score_file("app/dataset.csv", str(single), chunk_rows=300)
+    score_file("app/dataset.csv", str(pooled), chunk_rows=300, workers=2, explain=True)
+    single, pooled = pd.read_csv(single), pd.read_csv(pooled)
+    pd.testing.assert_frame_equal(single, pooled[single.columns])
+
+    # SHAP values add up to the approval probability
+    shap = pooled.filter(like="shap_").drop(columns="shap_base_value")
+    assert len(shap.columns) == 9
+    np.testing.assert_allclose(
+        pooled["shap_base_value"] + shap.sum(axis=1), pooled["probability_approved"], atol=1e-9
+    )
+
+
+def test_failed_run_leaves_no_output(tmp_path):
+    output = tmp_path / "scored.csv"
+    with pytest.raises(FileNotFoundError):
+        score_file("missing.csv", str(output))
+    assert list(tmp_path.iterdir()) == []
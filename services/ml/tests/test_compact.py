@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from app.artifacts import save_artifact
+from app.compact import compact_model, compaction_report
+from app.manifest import write_manifest
+from app.model import FlatForest, load_model, load_preprocessor
+from app.registry import ModelRegistry
+
+
+def test_float32_thresholds_keep_every_decision():
+    model = load_model("models/model.joblib")
+    forest = FlatForest.from_model(model)
+    compact = forest.compact(value_dtype=np.float16)
+
+    # Inputs at, just below and just above every threshold, as float32
+    splits = forest.left >= 0
+    at = forest.threshold[splits].astype(np.float32)
+    values = np.concatenate([at, np.nextafter(at, np.float32(-np.inf)), np.nextafter(at, np.float32(np.inf))])
+    rng = np.random.default_rng(0)
+    X = rng.choice(values, size=(4000, forest.n_features_in_))
+    X[rng.random(X.shape) < 0.05] = np.nan
+
+    np.testing.assert_array_equal(compact.apply(X), forest.apply(X))
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=5e-4)
+    assert compact.footprint()["nodes"] < forest.footprint()["nodes"]
+
+
+def test_compact_model_is_a_drop_in(tmp_path):
+    model = load_model("models/model.joblib")
+    preprocessor = load_preprocessor("models/preprocessor.joblib")
+    df = pd.read_csv("app/dataset.csv").drop(columns=["Unnamed: 0", "target"])
+    X = preprocessor.transform_records(df.to_dict("records"))
+
+    compact = compact_model(model, np.float16, tables=False)
+    report = compaction_report(model, compact, X)
+    assert report["rows_changed_leaves"] == 0
+    assert report["max_deviation"] < 5e-4
+    assert report["table_bytes_after"] < 100
+
+    directory = tmp_path / "model.compact"
+    save_artifact(compact, preprocessor, str(directory))
+    write_manifest(str(directory), {"model": ".", "preprocessor": "."}, preprocessor)
+    bundle = ModelRegistry(
+        "models/model.joblib", "models/preprocessor.joblib",
+        manifest_path=str(directory / "manifest.json")
+    ).get()
+    assert bundle.model.value.dtype == np.float16
+    np.testing.assert_allclose(bundle.model.predict_proba(X), model.predict_proba(X), atol=5e-4)
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from app.model import load_model, load_preprocessor, predict_batch, predict_with_threshold
+
+model = load_model("models/model.joblib")
+preprocessor = load_preprocessor("models/preprocessor.joblib")
+records = pd.read_csv("app/dataset.csv").drop(columns=["target"]).to_dict("records")
+
+
+def test_default_threshold_matches_model_predict():
+    X = preprocessor.transform_records(records)
+    predictions, _ = predict_with_threshold(model, X)
+    assert np.array_equal(predictions, model.predict(X))
+
+
+def test_threshold_is_read_from_model_metadata():
+    model.decision_threshold_ = 0.99
+    try:
+        results = predict_batch(model, preprocessor, records)
+    finally:
+        del model.decision_threshold_
+    for result in results:
+        assert result["prediction"] == int(result["probability_approved"] > 0.99)
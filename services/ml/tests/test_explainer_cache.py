@@ -0,0 +1,13 @@
+from app.model import ExplainerCache, load_model
+
+
+def test_explainer_is_built_once_per_model():
+    cache = ExplainerCache()
+    model = load_model("models/model.joblib")
+    first = cache.get(model)
+    assert cache.get(model) is first
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    cache.invalidate(model)
+    assert cache.get(model) is not first
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+
+from app.fairness import FairnessAnalyzer, bootstrap_approval_rates, group_confusion_counts
+
+
+class ColumnPreprocessor:
+    def transform(self, df):
+        return df[['score']], df['target']
+
+
+class ThresholdModel:
+    """Approves a score above its decision threshold, as the service does."""
+
+    def __init__(self, decision_threshold=0.5):
+        self.decision_threshold_ = decision_threshold
+
+    def predict_proba(self, X):
+        score = X['score'].to_numpy()
+        return np.column_stack([1 - score, score])
+
+    def predict(self, X):
+        return (X['score'].to_numpy() > self.decision_threshold_).astype(int)
+
+
+def audit_frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Sex': rng.choice(['male', 'female', None], n, p=[0.6, 0.35, 0.05]),
+        'Age': rng.integers(18, 110, n),
+        'Housing': rng.choice(['own', 'rent', 'free'], n),
+        'score': rng.random(n)
+    })
+    df['target'] = (rng.random(n) < df['score'] * 0.8 + 0.1).astype(int)
+    # A group with no approvals: precision and recall are 0 by convention
+    df.loc[df['Housing'] == 'free', 'score'] = 0.0
+    return df
+
+
+def test_group_confusion_counts_skip_rows_without_group():
+    counts = group_confusion_counts(np.array([0, 1, -1, 1, 0]), np.array([3, 0, 3, 1, 2]), 2)
+    assert counts.tolist() == [[0, 0, 1, 1], [1, 1, 0, 0]]
+
+
+def test_group_metrics_match_sklearn():
+    df = audit_frame()
+    report = FairnessAnalyzer(['Sex', 'Housing']).analyze_fairness(
+        ThresholdModel(), ColumnPreprocessor(), df
+    )
+    y_pred = ThresholdModel().predict(df)
+
+    assert report['overall_metrics']['accuracy'] == accuracy_score(df['target'], y_pred)
+    for feature in ('Sex', 'Housing'):
+        groups = report['group_analysis'][feature]['groups']
+        assert list(groups) == [str(g) for g in df[feature].dropna().unique()]
+        for group, metrics in groups.items():
+            mask = (df[feature] == group).to_numpy()
+            y_true, y_hat = df['target'][mask], y_pred[mask]
+            assert metrics['count'] == mask.sum()
+            assert metrics['accuracy'] == accuracy_score(y_true, y_hat)
+            assert metrics['precision'] == precision_score(y_true, y_hat, zero_division=0)
+            assert metrics['recall'] == recall_score(y_true, y_hat, zero_division=0)
+            assert metrics['approval_rate'] == np.mean(y_hat)
+            assert metrics['true_approval_rate'] == np.mean(y_true)
+
+    age_groups = report['group_analysis']['AgeGroup']['groups']
+    assert list(age_groups) == ['18-25', '26-35', '36-50', '50+']
+    # Ages above 100 fall outside the bins
+    assert age_groups['50+']['count'] == ((df['Age'] > 50) & (df['Age'] <= 100)).sum()
+
+
+def test_decisions_use_the_model_threshold():
+    df = audit_frame()
+    model = ThresholdModel(decision_threshold=0.7)
+    report = FairnessAnalyzer(['Sex']).analyze_fairness(model, ColumnPreprocessor(), df)
+
+    approved = df['score'] > 0.7
+    assert report['overall_metrics']['approval_rate'] == approved.mean()
+    for group, metrics in report['group_analysis']['Sex']['groups'].items():
+        assert metrics['approval_rate'] == approved[df['Sex'] == group].mean()
+
+
+def test_non_binary_labels_are_rejected():
+    # Unlike the sklearn metrics used before, confusion counts need 0/1 targets
+    df = audit_frame(100)
+    df.loc[0, 'target'] = 2
+    with pytest.raises(ValueError, match="y_true must be binary"):
+        FairnessAnalyzer().analyze_fairness(ThresholdModel(), ColumnPreprocessor(), df)
+    df['target'] = df['target'].clip(upper=1).astype(bool)
+    FairnessAnalyzer().analyze_fairness(ThresholdModel(), ColumnPreprocessor(), df)
+
+
+def chunks_of(df, rows):
+    return (df.iloc[start:start + rows] for start in range(0, len(df), rows))
+
+
+def test_chunked_analysis_matches_whole_frame(capsys):
+    df = audit_frame()
+    analyzer = FairnessAnalyzer(['Sex', 'Housing', 'Missing'])
+    whole = analyzer.analyze_fairness(ThresholdModel(), ColumnPreprocessor(), df)
+    printed = capsys.readouterr().out
+
+    for workers in (1, 2):
+        report = analyzer.analyze_fairness_chunks(
+            ThresholdModel(), ColumnPreprocessor(), chunks_of(df, 333), workers=workers
+        )
+        assert report == whole
+        assert capsys.readouterr().out == printed
+        assert analyzer.get_bias_summary(report) == analyzer.get_bias_summary(whole)
+
+
+def test_bootstrap_intervals_cover_point_estimates():
+    df = audit_frame()
+    analyzer = FairnessAnalyzer(['Sex'], n_bootstrap=500, random_state=0)
+    report = analyzer.analyze_fairness(ThresholdModel(), ColumnPreprocessor(), df)
+
+    for analysis in report['group_analysis'].values():
+        low, high = analysis['disparate_impact_ci']
+        assert low <= analysis['disparate_impact'] <= high
+        assert 0 <= analysis['high_bias_probability'] <= 1
+        for metrics in analysis['groups'].values():
+            low, high = metrics['approval_rate_ci']
+            assert low <= metrics['approval_rate'] <= high
+    # Seeded: the same intervals again, and in the bias summary
+    again = analyzer.analyze_fairness(ThresholdModel(), ColumnPreprocessor(), df)
+    assert again == report
+    for finding in analyzer.get_bias_summary(report)['biased_features']:
+        assert finding['disparate_impact_ci'] == report['group_analysis'][finding['feature']]['disparate_impact_ci']
+
+
+def test_bootstrap_in_workers():
+    rates, disparate_impact = bootstrap_approval_rates([100, 50], [70, 20], 1001, seed=0, workers=2)
+    assert rates.shape == (1001, 2) and disparate_impact.shape == (1001,)
+    assert abs(rates[:, 0].mean() - 0.7) < 0.01
+    assert np.all(disparate_impact <= 1)
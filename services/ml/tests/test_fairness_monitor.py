@@ -0,0 +1,93 @@
+from fastapi.testclient import TestClient
+
+from app.fairness_monitor import MAX_GROUPS, OTHER_GROUP, LiveFairnessMonitor
+from main import app
+
+client = TestClient(app)
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(monitor, sex, age, approved, n):
+    for _ in range(n):
+        monitor.record({"Sex": sex, "Age": age}, {"prediction": int(approved)})
+
+
+def test_windows_report_approval_rates_and_bias():
+    clock = FakeClock()
+    monitor = LiveFairnessMonitor(windows=(60, 600), bucket_seconds=10, min_group_size=5, clock=clock)
+    # Ten minutes ago: equal approval rates
+    record(monitor, "male", 30, True, 10)
+    record(monitor, "female", 30, True, 10)
+    clock.now += 300
+    # Now: women approved at half the rate of men
+    record(monitor, "male", 22, True, 10)
+    record(monitor, "female", 60, True, 5)
+    record(monitor, "female", 60, False, 5)
+    record(monitor, "female", 45, False, 2)  # too few to count
+
+    short, long = monitor.report()["windows"]
+    assert short["decisions"] == 22
+    sex = short["group_analysis"]["Sex"]
+    assert sex["groups"]["female"] == {"count": 12, "approved": 5, "approval_rate": 5 / 12}
+    assert sex["disparate_impact"] == 5 / 12 and sex["bias_level"] == "HIGH"
+    ages = short["group_analysis"]["AgeGroup"]
+    assert ages["groups"]["36-50"]["count"] == 2
+    assert ages["disparate_impact"] == 0.5
+    assert short["bias_summary"]["has_bias"]
+
+    assert long["decisions"] == 42
+    assert long["group_analysis"]["Sex"]["disparate_impact"] == (15 / 22) / 1.0
+
+    # Decisions older than the longest window are dropped
+    clock.now += 600
+    monitor.fold()
+    assert all(window["decisions"] == 0 for window in monitor.report()["windows"])
+
+
+def test_group_count_is_bounded():
+    monitor = LiveFairnessMonitor(min_group_size=1)
+    for i in range(MAX_GROUPS + 5):
+        record(monitor, f"value-{i}", 30, True, 1)
+    groups = monitor.report()["windows"][0]["group_analysis"]["Sex"]["groups"]
+    assert len(groups) == MAX_GROUPS + 1
+    assert groups[OTHER_GROUP]["count"] == 5
+
+
+def test_served_decisions_reach_live_report():
+    def decisions():
+        return client.get("/fairness/live").json()["windows"][0]["decisions"]
+
+    before = decisions()
+    assert client.post("/predict", json=APPLICATION).status_code == 200
+    assert client.post("/predict/batch", json=[APPLICATION, dict(APPLICATION, Sex="female")]).status_code == 200
+    assert decisions() == before + 3
+
+
+def test_pending_decisions_are_bounded():
+    monitor = LiveFairnessMonitor(min_group_size=1, max_pending=10)
+    record(monitor, "male", 30, True, 15)
+    monitor.record_many([{"Sex": "female", "Age": 30}] * 4, [{"prediction": 0}] * 4)
+    assert len(monitor._pending) == 10
+
+    report = monitor.report()
+    assert report["dropped"] == 9
+    assert report["windows"][0]["decisions"] == 10
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from app.model import FlatForest, load_model, load_preprocessor, predict_proba
+
+
+def load_features():
+    preprocessor = load_preprocessor("models/preprocessor.joblib")
+    df = pd.read_csv("app/dataset.csv")
+    X = preprocessor.transform_records(df.drop(columns=["Unnamed: 0", "target"]).to_dict("records"))
+    return X, df["target"].values
+
+
+def test_matches_served_model_with_missing_values():
+    model = load_model("models/model.joblib")
+    X, _ = load_features()
+    rng = np.random.default_rng(0)
+    X[rng.random(X.shape) < 0.2] = np.nan
+
+    forest = FlatForest.from_model(model)
+    assert np.abs(forest.predict_proba(X) - model.predict_proba(X)).max() < 1e-12
+    assert np.abs(predict_proba(model, X[:1]) - model.predict_proba(X[:1])).max() < 1e-12
+    np.testing.assert_array_equal(forest.apply(X) - forest.roots, model.apply(X))
+
+
+def test_deep_multiclass_forests_trained_with_missing_values():
+    X, y = load_features()
+    rng = np.random.default_rng(1)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = np.where(rng.random(len(y)) < 0.3, 2, y)
+
+    # Unlimited depth: trees with several 64-leaf words
+    for model in (RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y),
+                  ExtraTreesClassifier(n_estimators=5, random_state=0).fit(X, y)):
+        forest = FlatForest.from_model(model)
+        assert np.abs(forest.predict_proba(X) - model.predict_proba(X)).max() < 1e-12
+        np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+        forest.TABLE_BUDGET_BYTES = 0
+        forest._bind(forest._compile())
+        assert forest._tables is None
+        assert np.abs(forest.predict_proba(X) - model.predict_proba(X)).max() < 1e-12
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Needed to train or explain with shap, not to serve predictions
+HEAVY_MODULES = ("sklearn", "scipy", "shap", "numba", "pandas", "joblib")
+
+# Cumulative import time allowed for main (about 0.5 s on a laptop,
+# 2.5 s before imports were trimmed)
+IMPORT_BUDGET_MS = float(os.environ.get("ML_IMPORT_BUDGET_MS", "1500"))
+
+
+def import_times(module):
+    """Cumulative import time in microseconds of every module loaded by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_serving_imports_stay_light():
+    times = import_times("main")
+    heavy = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert heavy == [], f"main imports training/explanation modules: {heavy[:10]}"
+    assert times["main"] / 1e3 < IMPORT_BUDGET_MS
@@ -0,0 +1,75 @@
+import asyncio
+import shutil
+import threading
+
+import pytest
+
+from app.executor import InferencePool, ModelVersionMismatchError, PoolSaturatedError
+from app.manifest import write_manifest
+from app.metrics import STAGE_SECONDS
+from app.model import load_model, load_preprocessor, predict_score
+from app.registry import ModelRegistry
+
+APPLICATION = {"Age": 35, "Sex": "male", "Job": 2, "Housing": "own", "Duration": 24}
+
+
+def test_saturated_pool_rejects_fast():
+    release = threading.Event()
+
+    def blocking_job(model, preprocessor):
+        release.wait(5)
+        return "done"
+
+    async def scenario(pool):
+        first = asyncio.ensure_future(pool.run(blocking_job, None, None))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(blocking_job, None, None)
+        release.set()
+        return await first
+
+    pool = InferencePool(kind="thread", max_workers=1, max_queue=0)
+    try:
+        assert asyncio.run(scenario(pool)) == "done"
+        stats = pool.stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 1 and stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_scores_with_worker_models():
+    paths = ("models/model.joblib", "models/preprocessor.joblib")
+    expected = predict_score(load_model(paths[0]), load_preprocessor(paths[1]), APPLICATION)
+    before = {stage: STAGE_SECONDS.count(stage) for stage in ("preprocessing", "predict_proba")}
+    pool = InferencePool(kind="process", max_workers=1, model_paths=paths)
+    try:
+        result = asyncio.run(pool.run(predict_score, None, None, APPLICATION))
+    finally:
+        pool.shutdown()
+    assert result == expected
+    # Stage timings recorded in the worker reach this process's metrics
+    for stage, count in before.items():
+        assert STAGE_SECONDS.count(stage) == count + 1
+
+
+def test_process_workers_load_the_manifest_pair(tmp_path):
+    shutil.copy("models/model.joblib", tmp_path / "model.joblib")
+    shutil.copy("models/preprocessor.joblib", tmp_path / "preprocessor.joblib")
+    write_manifest(
+        str(tmp_path), {"model": "model.joblib", "preprocessor": "preprocessor.joblib"},
+        load_preprocessor("models/preprocessor.joblib")
+    )
+    source = ("missing.joblib", "missing.joblib", str(tmp_path / "manifest.json"))
+    bundle = ModelRegistry(*source[:2], manifest_path=source[2]).get()
+
+    pool = InferencePool(kind="process", max_workers=1, model_paths=source)
+    try:
+        pool.restart_workers(bundle.version)
+        result = asyncio.run(pool.run(predict_score, None, None, APPLICATION))
+        assert result == predict_score(bundle.model, bundle.preprocessor, APPLICATION)
+
+        pool.restart_workers("another-version")
+        with pytest.raises(ModelVersionMismatchError):
+            asyncio.run(pool.run(predict_score, None, None, APPLICATION))
+    finally:
+        pool.shutdown()
@@ -0,0 +1,63 @@
+import shutil
+
+import pytest
+
+from app.manifest import ManifestError, load_manifest_pair, write_manifest
+from app.model import artifact_version, load_model, load_preprocessor
+from app.registry import ModelNotReadyError, ModelRegistry
+
+
+def write_pair(directory):
+    shutil.copy("models/model.joblib", directory / "model.joblib")
+    shutil.copy("models/preprocessor.joblib", directory / "preprocessor.joblib")
+    write_manifest(
+        str(directory), {"model": "model.joblib", "preprocessor": "preprocessor.joblib"},
+        load_preprocessor("models/preprocessor.joblib"),
+        model=load_model("models/model.joblib"), metrics={"roc_auc": 0.8}
+    )
+    return str(directory / "manifest.json")
+
+
+def test_manifest_pair_loads_with_manifest_version(tmp_path):
+    manifest_path = write_pair(tmp_path)
+    model, preprocessor, version, manifest = load_manifest_pair(manifest_path)
+    assert version == artifact_version(manifest_path)
+    assert model.n_features_in_ == manifest["feature_schema"]["n_features"]
+    assert manifest["metrics"] == {"roc_auc": 0.8}
+
+    registry = ModelRegistry(
+        str(tmp_path / "model.joblib"), str(tmp_path / "preprocessor.joblib"),
+        manifest_path=manifest_path
+    )
+    assert registry.get().version == version
+    assert registry.status()["manifest"] == manifest_path
+
+
+def test_mismatched_pair_is_refused(tmp_path):
+    manifest_path = write_pair(tmp_path)
+    # A preprocessor from another run, swapped in without a new manifest
+    with open(tmp_path / "preprocessor.joblib", "ab") as f:
+        f.write(b"\0")
+
+    with pytest.raises(ManifestError, match="preprocessor"):
+        load_manifest_pair(manifest_path)
+    registry = ModelRegistry(
+        str(tmp_path / "model.joblib"), str(tmp_path / "preprocessor.joblib"),
+        manifest_path=manifest_path
+    )
+    with pytest.raises(ModelNotReadyError, match="manifest hash"):
+        registry.get()
+
+
+def test_paths_are_served_without_explicit_manifest(tmp_path):
+    manifest_path = write_pair(tmp_path)
+    # A manifest next to the pair is not picked up unless it is asked for
+    registry = ModelRegistry(str(tmp_path / "model.joblib"), str(tmp_path / "preprocessor.joblib"))
+    assert registry.get().version == artifact_version(
+        str(tmp_path / "model.joblib"), str(tmp_path / "preprocessor.joblib")
+    )
+    assert registry.status()["manifest"] is None
+
+    registry = ModelRegistry("missing.joblib", "missing.joblib", manifest_path=manifest_path)
+    assert registry.watched_paths() == [manifest_path]
+    assert registry.get().version == artifact_version(manifest_path)
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from app.metrics import Counter, Histogram, MetricsRegistry
+from main import app
+
+client = TestClient(app)
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+def test_text_format():
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests", ("path",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    requests.inc('/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{path="/a\\"b"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_metrics_endpoint_reports_stages_and_model():
+    assert client.post("/explain", json=APPLICATION).status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    for stage in ("validation", "preprocessing", "predict_proba", "explanation", "serialization"):
+        assert f'ml_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'ml_requests_total{endpoint="/explain",status="200"}' in text
+    assert "ml_model_ready 1" in text
+    assert 'ml_cache_lookups_total{cache="explanation",result="miss"}' in text
+    assert "ml_inference_queue_depth 0" in text
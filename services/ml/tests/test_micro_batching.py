@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.batching import MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced_and_routed_back():
+    calls = []
+
+    async def run_batch(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_delay_ms=20)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+
+    assert asyncio.run(scenario()) == [i * 10 for i in range(20)]
+    assert [len(batch) for batch in calls] == [8, 8, 4]
+
+
+def test_failing_item_does_not_fail_its_batch():
+    async def run_batch(items):
+        if "bad" in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=3, max_delay_ms=20)
+        return await asyncio.gather(
+            *(batcher.submit(item) for item in ["a", "bad", "c"]), return_exceptions=True
+        )
+
+    ok_a, failed, ok_c = asyncio.run(scenario())
+    assert (ok_a, ok_c) == ("A", "C")
+    assert isinstance(failed, ValueError)
+
+
+def test_batch_errors_are_not_retried_per_item():
+    calls = []
+
+    class Saturated(RuntimeError):
+        pass
+
+    async def run_batch(items):
+        calls.append(list(items))
+        raise Saturated("queue full")
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=3, max_delay_ms=20, batch_errors=(Saturated,))
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, Saturated) for result in asyncio.run(scenario()))
+    assert calls == [[0, 1, 2]]
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.registry import ModelNotReadyError, ModelRegistry
+from main import app
+
+client = TestClient(app)
+
+MODEL_PATH = "models/model.joblib"
+PREPROCESSOR_PATH = "models/preprocessor.joblib"
+
+
+def test_concurrent_callers_share_one_load():
+    registry = ModelRegistry(MODEL_PATH, PREPROCESSOR_PATH)
+    assert not registry.ready and registry.state == "starting"
+
+    with ThreadPoolExecutor(8) as pool:
+        bundles = list(pool.map(lambda _: registry.get(), range(32)))
+
+    assert registry.loads == 1
+    assert all(bundle is bundles[0] for bundle in bundles)
+    status = registry.status()
+    assert status["state"] == "ready" and status["model_version"] == bundles[0].version
+    assert status["warmup_seconds"] is not None
+
+
+def test_failed_load_is_not_retried_immediately():
+    registry = ModelRegistry("models/missing.joblib", PREPROCESSOR_PATH, retry_interval=60)
+    with pytest.raises(ModelNotReadyError):
+        registry.get()
+    failed_at = registry.failed_at
+    with pytest.raises(ModelNotReadyError):
+        registry.get()
+    assert registry.failed_at == failed_at
+    assert registry.status()["state"] == "failed" and not registry.ready
+
+
+def test_liveness_and_readiness_probes():
+    assert client.get("/health/live").json() == {"status": "alive"}
+    client.get("/health")
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["state"] == "ready"
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.registry import ModelFileWatcher, ModelNotReadyError, ModelRegistry
+from main import app
+
+
+@pytest.fixture
+def registry(tmp_path):
+    model_path = tmp_path / "model.joblib"
+    preprocessor_path = tmp_path / "preprocessor.joblib"
+    shutil.copy("models/model.joblib", model_path)
+    shutil.copy("models/preprocessor.joblib", preprocessor_path)
+    registry = ModelRegistry(str(model_path), str(preprocessor_path))
+    registry.get()
+    return registry
+
+
+def replace_model(registry, **attributes):
+    model = joblib.load(registry.model_path)
+    for name, value in attributes.items():
+        setattr(model, name, value)
+    joblib.dump(model, registry.model_path)
+
+
+def test_reload_swaps_only_changed_files(registry):
+    old = registry.bundle
+    assert registry.reload() is False
+
+    replace_model(registry, decision_threshold_=0.7)
+    assert registry.reload() is True
+    assert registry.bundle.version != old.version
+    assert registry.bundle.model.decision_threshold_ == 0.7
+    # Holders of the old bundle keep a working pair
+    assert old.model.predict_proba(old.preprocessor.transform_records([{}])).shape == (1, 2)
+
+
+def test_failed_reload_keeps_serving_version(registry):
+    old = registry.bundle
+    with open(registry.model_path, "wb") as f:
+        f.write(b"not a model")
+    with pytest.raises(ModelNotReadyError):
+        registry.reload()
+    assert registry.bundle is old
+    assert registry.status()["state"] == "ready"
+    assert registry.status()["reload_error"] is not None
+
+
+def test_watcher_reloads_on_file_change(registry):
+    watcher = ModelFileWatcher(registry, interval=0.01)
+    assert watcher.poll() is False
+
+    old_version = registry.bundle.version
+    replace_model(registry, decision_threshold_=0.6)
+    stat = os.stat(registry.model_path)
+    os.utime(registry.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert watcher.poll() is True
+    assert registry.bundle.version != old_version
+
+
+def test_admin_reload_and_version_header(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    client = TestClient(app)
+    application = {
+        "Age": 35, "Sex": "male", "Job": 2, "Housing": "own",
+        "Saving accounts": "moderate", "Checking account": "little",
+        "Credit_amount": 5000, "Duration": 24, "Purpose": "car"
+    }
+    version = client.post("/predict", json=application).headers["X-Model-Version"]
+    body = client.post("/admin/reload", headers={"X-Admin-Token": "test-token"}).json()
+    assert body == {"reloaded": False, "previous_version": version, "model_version": version}
+
+
+def test_admin_endpoints_fail_closed(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post("/admin/reload").status_code == 404
+    assert client.post("/admin/profile", json={"sample_rate": 1.0}).status_code == 404
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    assert client.post("/admin/reload").status_code == 403
+    assert client.get("/admin/profile/status", headers={"X-Admin-Token": "wrong"}).status_code == 403
@@ -0,0 +1,53 @@
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import time
+
+from app.model import load_model
+from app.registry import WARMUP_APPLICATION
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request(method, path, body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_served_model_is_single_threaded():
+    assert load_model("models/model.joblib").n_jobs == 1
+
+
+def test_prefork_workers_serve_and_stop():
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                status, body = request(port, "GET", "/health/ready")
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.2)
+        assert status == 200 and body["ready"]
+
+        application = dict(WARMUP_APPLICATION)
+        application["Credit_amount"] = application.pop("Credit amount")
+        for _ in range(4):
+            status, body = request(port, "POST", "/predict", json.dumps(application))
+            assert status == 200 and body["prediction_label"] in ("Approved", "Rejected")
+    finally:
+        server.terminate()
+        assert server.wait(timeout=30) == 0
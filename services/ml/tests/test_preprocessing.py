@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from app.model import load_preprocessor
+from app.preprocessing import CreditDataPreprocessor
+
+DATASET_PATH = "app/dataset.csv"
+
+
+def test_transform_records_matches_transform_on_dataset():
+    preprocessor = load_preprocessor("models/preprocessor.joblib")
+    df = pd.read_csv(DATASET_PATH)
+    expected, _ = preprocessor.transform(df)
+    expected = expected.to_numpy(dtype=np.float64)
+
+    records = df.drop(columns=["target"]).to_dict("records")
+    actual = preprocessor.transform_records(records)
+
+    assert actual.dtype == np.float64
+    assert np.array_equal(actual, expected, equal_nan=True)
+    for record, row in zip(records, expected):
+        assert np.array_equal(preprocessor.transform_records(record)[0], row, equal_nan=True)
+
+
+def test_transform_records_handles_missing_and_unseen_values():
+    preprocessor = CreditDataPreprocessor().fit(pd.read_csv(DATASET_PATH))
+    records = [
+        {"Age": 30, "Sex": "unknown", "Purpose": None},
+        {"Credit amount": 1000.0, "Housing": float("nan"), "Extra": "ignored"},
+    ]
+    expected = preprocessor.transform(pd.DataFrame(records)).to_numpy(dtype=np.float64)
+    assert np.array_equal(preprocessor.transform_records(records), expected, equal_nan=True)
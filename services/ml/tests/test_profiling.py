@@ -0,0 +1,92 @@
+import marshal
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.profiling import RequestProfiler
+from main import app
+
+client = TestClient(app)
+admin = TestClient(app, headers={"X-Admin-Token": "test-token"})
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+def job(x):
+    return sum(i * x for i in range(20000))
+
+
+def run_until_sampled(profiler, min_jobs=20, timeout=10.0):
+    """Run profiled jobs until the sampler thread has caught a stack; return the job count."""
+    deadline = time.monotonic() + timeout
+    jobs = 0
+    while jobs < min_jobs or (not profiler.collapsed() and time.monotonic() < deadline):
+        assert profiler.maybe_wrap(job)(2) == job(2)
+        jobs += 1
+    return jobs
+
+
+def test_disabled_profiler_returns_job_unwrapped():
+    profiler = RequestProfiler()
+    assert not profiler.enabled
+    assert profiler.maybe_wrap(job) is job
+
+
+def test_stack_samples_are_collapsed():
+    profiler = RequestProfiler(sample_rate=1.0, mode="stacks", interval=0.0005)
+    try:
+        jobs = run_until_sampled(profiler)
+    finally:
+        profiler.configure(0)
+    assert profiler.sampled == jobs
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith("test_profiling.py:job") for line in lines)
+
+
+def test_admin_profile_collects_scoring_stages(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "test-token")
+    response = admin.post("/admin/profile", json={"sample_rate": 1.0})
+    assert response.status_code == 200
+    try:
+        for age in range(30, 33):
+            assert client.post("/score", json=dict(APPLICATION, Age=age)).status_code == 200
+        status = admin.get("/admin/profile/status").json()
+        assert status["enabled"] and status["sampled_jobs"] == 3
+
+        report = admin.get("/admin/profile").text
+        for function in ("prepare_features", "predict_proba", "explain_batch"):
+            assert function in report
+        stats = marshal.loads(admin.get("/admin/profile", params={"format": "pstats"}).content)
+        assert any(name == "score_application" for _, _, name in stats)
+        assert admin.get("/admin/profile", params={"format": "collapsed"}).status_code == 400
+    finally:
+        admin.post("/admin/profile", json={"sample_rate": 0})
+    assert admin.post("/admin/profile", json={"sample_rate": 1.5}).status_code == 422
+
+
+def test_stopping_keeps_the_collected_mode(tmp_path):
+    profiler = RequestProfiler(sample_rate=1.0, mode="stacks", interval=0.0005)
+    run_until_sampled(profiler)
+    profiler.configure(0, "pstats")
+    assert profiler.mode == "stacks"
+    assert profiler.render("collapsed") == profiler.collapsed()
+    assert profiler.dump(str(tmp_path)).endswith(".collapsed")
+
+    # Nothing to export: no empty file, and a clear error
+    profiler.configure(1.0, "pstats")
+    profiler.configure(0)
+    assert profiler.dump(str(tmp_path / "empty")) is None
+    with pytest.raises(ValueError, match="No profile"):
+        profiler.render("text")
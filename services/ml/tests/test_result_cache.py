@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+from app.cache import ResultCache, canonical_key
+from main import app
+
+client = TestClient(app)
+
+APPLICATION = {
+    "Age": 41,
+    "Sex": "female",
+    "Job": 1,
+    "Housing": "rent",
+    "Saving accounts": "little",
+    "Checking account": "moderate",
+    "Credit_amount": 2500,
+    "Duration": 12,
+    "Purpose": "radio/TV"
+}
+
+
+def test_key_ignores_field_order_but_not_version():
+    reordered = dict(reversed(list(APPLICATION.items())))
+    assert canonical_key(APPLICATION, "v1") == canonical_key(reordered, "v1")
+    assert canonical_key(APPLICATION, "v1") != canonical_key(APPLICATION, "v2")
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResultCache(maxsize=2, ttl=3600)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    expired = ResultCache(maxsize=2, ttl=-1)
+    expired.put("a", 1)
+    assert expired.get("a") is None
+    assert expired.stats()["expirations"] == 1
+
+
+def test_repeated_request_is_served_from_cache():
+    before = client.get("/cache/stats").json()["prediction"]["hits"]
+    first = client.post("/predict", json=APPLICATION).json()
+    second = client.post("/predict", json=APPLICATION).json()
+    assert first == second
+    assert client.get("/cache/stats").json()["prediction"]["hits"] == before + 1
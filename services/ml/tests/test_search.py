@@ -0,0 +1,43 @@
+import json
+
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+
+from app.search import LEADERBOARD_COLUMNS, candidate_params, successive_halving, write_leaderboard
+
+
+def test_random_candidates_are_drawn_from_space():
+    space = {'C': [0.1, 1.0, 10.0], 'class_weight': [None, 'balanced']}
+    assert len(candidate_params(space)) == 6
+    drawn = candidate_params(space, n_candidates=4, random_state=0)
+    assert len(drawn) == 4 and all(c['C'] in space['C'] for c in drawn)
+
+
+def test_successive_halving_ranks_survivors_first(tmp_path):
+    X, y = make_classification(n_samples=600, n_features=8, random_state=0)
+    space = {'C': [0.0001, 0.001, 0.1, 1.0]}
+    best, leaderboard = successive_halving(
+        LogisticRegression(max_iter=500), space, X, y, factor=2, cv=3, workers=2, latency_repeats=3
+    )
+
+    assert list(leaderboard.columns) == LEADERBOARD_COLUMNS
+    assert len(leaderboard) == 4
+    # 4 candidates halved twice: 2 rounds on subsamples, the last on all rows
+    assert leaderboard['round'].tolist() == [2, 1, 0, 0]
+    assert leaderboard['n_resources'].iloc[0] == len(y)
+    assert json.loads(leaderboard['params'].iloc[0]) == best
+    assert best['C'] >= 0.1
+    assert (leaderboard['latency_1_row_ms'] > 0).all() and (leaderboard['fit_seconds'] > 0).all()
+
+    path = tmp_path / "leaderboard.csv"
+    write_leaderboard(leaderboard, str(path))
+    assert pd.read_csv(path)['rank'].tolist() == [1, 2, 3, 4]
+
+
+def test_factor_below_two_is_rejected():
+    X, y = make_classification(n_samples=50, random_state=0)
+    for factor in (1, 0.5):
+        with pytest.raises(ValueError, match="factor"):
+            successive_halving(LogisticRegression(), {"C": [0.1, 1.0]}, X, y, factor=factor)
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from app.executor import PoolSaturatedError
+from app.ndjson import iter_lines
+from main import app
+
+client = TestClient(app)
+
+APPLICATION = {
+    "Age": 35,
+    "Sex": "male",
+    "Job": 2,
+    "Housing": "own",
+    "Saving accounts": "moderate",
+    "Checking account": "little",
+    "Credit_amount": 5000,
+    "Duration": 24,
+    "Purpose": "car"
+}
+
+
+def body_in_pieces(lines, piece=7):
+    payload = "".join(line + "\n" for line in lines).encode()
+    for start in range(0, len(payload), piece):
+        yield payload[start:start + piece]
+
+
+def test_stream_scores_every_line_in_order(monkeypatch):
+    monkeypatch.setattr(main, "STREAM_CHUNK_ROWS", 4)
+    applications = [dict(APPLICATION, Age=20 + i, Duration=6 + i) for i in range(10)]
+    lines = [json.dumps(application) for application in applications]
+    lines[3] = json.dumps(dict(APPLICATION, Age=12))
+    lines[7] = "{not json"
+
+    response = client.post("/predict/stream", content=body_in_pieces(lines))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["index"] for item in results] == list(range(10))
+
+    batch = client.post("/predict/batch", json=applications).json()["results"]
+    for index, item in enumerate(results):
+        if index == 3:
+            assert item["errors"][0]["loc"] == ["Age"]
+        elif index == 7:
+            assert item["errors"][0]["type"] == "json_invalid"
+        else:
+            assert item["prediction"] == batch[index]["prediction"]
+
+
+def test_over_long_lines_are_reported_not_buffered():
+    async def chunks():
+        yield b'{"Age": 35' + b" " * 300
+        yield b" " * 300 + b"}\n" + json.dumps(APPLICATION).encode()
+
+    async def collect():
+        return [line async for line in iter_lines(chunks(), max_line_bytes=256)]
+
+    lines = asyncio.run(collect())
+    assert lines[0] is None
+    assert json.loads(lines[1]) == APPLICATION
+
+
+def test_saturated_pool_fails_chunk_after_max_wait(monkeypatch):
+    async def saturated(*args):
+        raise PoolSaturatedError("Inference queue full")
+
+    monkeypatch.setattr(main, "STREAM_MAX_WAIT_MS", 50)
+    monkeypatch.setattr(main.inference_pool, "run", saturated)
+    response = client.post("/predict/stream", content=json.dumps(APPLICATION) + "\n")
+    assert response.status_code == 200
+    (item,) = [json.loads(line) for line in response.text.splitlines()]
+    assert item["errors"] == [{"type": "prediction_failed", "loc": [], "msg": "Inference queue full"}]
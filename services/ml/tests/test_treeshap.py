@@ -0,0 +1,69 @@
+from itertools import combinations
+from math import factorial
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from app.model import load_model, load_preprocessor
+from app.treeshap import TreeShapExplainer
+
+model = load_model("models/model.joblib")
+preprocessor = load_preprocessor("models/preprocessor.joblib")
+records = pd.read_csv("app/dataset.csv").drop(columns=["target"]).to_dict("records")
+X = preprocessor.transform_records(records)
+
+
+def path_dependent_value(tree, x, subset, node=0):
+    """E[f(x) | x_S] as defined by path-dependent TreeSHAP (recursive form)."""
+    left, right = tree.children_left[node], tree.children_right[node]
+    if left == right:
+        value = tree.value[node, 0]
+        return value / value.sum()
+    feature = tree.feature[node]
+    if feature in subset:
+        child = left if x[feature] <= tree.threshold[node] else right
+        return path_dependent_value(tree, x, subset, child)
+    weight = tree.weighted_n_node_samples
+    return (weight[left] * path_dependent_value(tree, x, subset, left)
+            + weight[right] * path_dependent_value(tree, x, subset, right)) / weight[node]
+
+
+def test_matches_brute_force_shapley_values():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(200, 4))
+    target = (data[:, 0] + data[:, 1] * data[:, 2] > 0).astype(int)
+    tree_model = DecisionTreeClassifier(max_depth=5, random_state=0).fit(data, target)
+    tree = tree_model.tree_
+    explainer = TreeShapExplainer(tree_model)
+
+    x = data[0].astype(np.float32).astype(np.float64)
+    n = data.shape[1]
+    expected = np.zeros((n, 2))
+    for i in range(n):
+        others = [j for j in range(n) if j != i]
+        for size in range(n):
+            weight = factorial(size) * factorial(n - size - 1) / factorial(n)
+            for subset in combinations(others, size):
+                expected[i] += weight * (path_dependent_value(tree, x, set(subset) | {i})
+                                         - path_dependent_value(tree, x, set(subset)))
+
+    assert np.allclose(explainer.shap_values(x[None, :])[0], expected, atol=1e-12)
+
+
+def test_values_add_up_to_model_probabilities():
+    explainer = TreeShapExplainer(model)
+    rows = X[:200].copy()
+    rows[:20, 6] = np.nan  # missing values follow the trees' missing_go_to_left
+    values = explainer.shap_values(rows)
+    reconstructed = explainer.expected_value + values.sum(axis=1)
+    assert np.allclose(reconstructed, model.predict_proba(rows), atol=1e-12)
+
+
+def test_matches_shap_tree_explainer():
+    shap = pytest.importorskip("shap")
+    reference = shap.TreeExplainer(model)
+    explainer = TreeShapExplainer(model)
+    assert np.allclose(explainer.expected_value, reference.expected_value, atol=1e-12)
+    assert np.allclose(explainer.shap_values(X), reference.shap_values(X), atol=1e-12)